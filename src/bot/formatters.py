@@ -1,7 +1,10 @@
 """Formatação de mensagens do bot."""
 
+from dataclasses import asdict
 from datetime import datetime
 
+from src.bot.validators import escape_html
+
 
 def format_product_message(product: dict, short_link: str) -> str:
     """Formata mensagem de produto individual.
@@ -69,6 +72,38 @@ def format_consolidated_message(products: list, context: dict) -> str:
     return header + "".join(items) + footer
 
 
+def format_uptime(seconds: float) -> str:
+    """Formata uma duração como "2d 3h 15m".
+
+    Args:
+        seconds: Duração em segundos
+
+    Returns:
+        Duração legível
+    """
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+# Rótulos das etapas gravadas em run_stages (ver RunProfiler)
+STAGE_LABELS = {
+    "fetch": "Busca",
+    "normalize": "Normalização",
+    "filter": "Filtro",
+    "rank": "Ranking",
+    "dedup": "Deduplicação",
+    "link_gen": "Links",
+    "upsert": "Persistência",
+    "send": "Envio",
+}
+
+
 def format_status_message(stats: dict) -> str:
     """Formata mensagem de status do sistema.
 
@@ -92,6 +127,25 @@ def format_status_message(stats: dict) -> str:
         success_rate = last_run.get("success_rate", 100)
         last_run_text += f"\n• Taxa sucesso: {success_rate}%"
 
+    stages = last_run.get("stages") if last_run else None
+    stages_text = ""
+    if stages:
+        lines = []
+        for stage in stages:
+            label = STAGE_LABELS.get(stage["stage"], stage["stage"])
+            line = f"• {label}: {stage['wall_ms']:,.0f}ms"
+            details = []
+            if stage.get("api_calls"):
+                details.append(f"{stage['api_calls']} req")
+            if stage.get("api_retries"):
+                details.append(f"{stage['api_retries']} retries")
+            if stage.get("db_queries"):
+                details.append(f"{stage['db_queries']} op. banco")
+            if details:
+                line += f" ({', '.join(details)})"
+            lines.append(line)
+        stages_text = "⏱️ <b>Etapas da Última Curadoria</b>\n" + "\n".join(lines) + "\n\n"
+
     next_run = stats.get("next_run", {})
     next_run_text = "Agendamento configurado"
     if next_run:
@@ -112,6 +166,7 @@ def format_status_message(stats: dict) -> str:
         f"🕐 Uptime: {stats.get('uptime', 'N/A')}\n\n"
         f"📦 <b>Última Curadoria</b>\n"
         f"{last_run_text}\n\n"
+        f"{stages_text}"
         f"⏭️ <b>Próxima Execução</b>\n"
         f"• Agendada para: {next_run_text}\n"
         f"• Tipo: Curadoria automática\n\n"
@@ -135,11 +190,13 @@ def format_help_message() -> str:
         "<b>Comandos disponíveis:</b>\n"
         "/start ou /menu - Abre o menu principal\n"
         "/status - Mostra status do sistema\n"
-        "/converter - Converte link Shopee manualmente\n\n"
+        "/converter - Converte link Shopee manualmente\n"
+        "/perfil - Mostra ou altera o perfil de curadoria\n\n"
         "<b>Menu:</b>\n"
         "🤖 <b>Curadoria Agora</b> - Executa curadoria imediata\n"
         "🔗 <b>Converter Link</b> - Gera link rastreável\n"
         "📊 <b>Status</b> - Mostra estatísticas\n"
+        "🎛️ <b>Perfil</b> - Keywords, pesos e filtros da curadoria\n"
         "⚙️ <b>Ajuda</b> - Esta mensagem\n\n"
         "<b>Funcionalidades:</b>\n"
         "• Curadoria automática a cada 12h\n"
@@ -149,6 +206,61 @@ def format_help_message() -> str:
     )
 
 
+def format_profile_message(profile) -> str:
+    """Formata o perfil de curadoria.
+
+    Args:
+        profile: CurationProfile em uso
+
+    Returns:
+        Mensagem formatada em HTML
+    """
+    categories = ", ".join(str(c) for c in profile.categories) if profile.categories else "todas"
+    max_requests = len(profile.keywords) * profile.max_pages
+
+    def _section(values: dict) -> str:
+        return "\n".join(f"• {name}: {value}" for name, value in values.items())
+
+    return (
+        f"🎛️ <b>Perfil de Curadoria</b>\n\n"
+        f"🔎 <b>Busca</b>\n"
+        f"• keywords: {escape_html(', '.join(profile.keywords))}\n"
+        f"• categories: {categories}\n"
+        f"• max_pages: {profile.max_pages} (até {max_requests} req por execução)\n"
+        f"• page_limit: {profile.page_limit}\n"
+        f"• top_n: {profile.top_n}\n\n"
+        f"⚖️ <b>Pesos</b> (weights.*)\n"
+        f"{_section(asdict(profile.weights))}\n\n"
+        f"🚦 <b>Filtros</b> (thresholds.*)\n"
+        f"{_section(asdict(profile.thresholds))}\n\n"
+        f"Altere com <code>/perfil campo valor</code>, ex:\n"
+        f"<code>/perfil top_n 15</code>\n"
+        f"<code>/perfil keywords fone bluetooth, smartwatch</code>\n"
+        f"<code>/perfil weights.commission 1.5</code>\n"
+        f"<code>/perfil recarregar</code> relê o perfil salvo no banco"
+    )
+
+
+def format_curation_progress(stage: str | None, pages: int, elapsed: float) -> str:
+    """Formata o progresso de uma curadoria manual (texto simples).
+
+    Args:
+        stage: Etapa em andamento (ver RunProfiler.current_stage)
+        pages: Páginas buscadas até agora
+        elapsed: Segundos desde o início
+
+    Returns:
+        Mensagem de progresso
+    """
+    label = STAGE_LABELS.get(stage, stage) if stage else "Aguardando"
+    return (
+        f"⚙️ Executando curadoria...\n\n"
+        f"📄 Páginas buscadas: {pages}\n"
+        f"▶️ Etapa: {label}\n"
+        f"⏱️ {int(elapsed)}s"
+    )
+
+
 def format_report_message(report_data: dict, period_days: int) -> str:
     """Formata mensagem de relatório de comissões.
 
@@ -1,34 +1,72 @@
 """Handlers para comandos e callbacks do bot."""
 
+import asyncio
+import functools
+import time
 import zoneinfo
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
+from src import config
 from src.bot.formatters import (
     format_consolidated_message,
+    format_curation_progress,
     format_help_message,
+    format_profile_message,
     format_report_message,
     format_status_message,
+    format_uptime,
 )
 from src.bot.keyboards import (
     back_to_menu_keyboard,
+    curation_progress_keyboard,
     main_menu_keyboard,
     status_keyboard,
 )
 from src.bot.validators import escape_html, is_valid_shopee_url, normalize_shopee_url
-from src.core import Curator
+from src.core import CurationProfile, Curator, ProfileStore, RunCoordinator, RunProfiler
 from src.database import Database
 from src.shopee import ShopeeClient
-from src.utils.logger import get_logger
-from src import config
+from src.utils.logger import LogContext, get_logger
+from src.utils.metrics import RECENT_ERRORS, REGISTRY, uptime_seconds
 
 logger = get_logger("mariabicobot", "bot")
 
+HANDLER_SECONDS = REGISTRY.histogram(
+    "telegram_handler_duration_seconds", "Duração dos handlers do Telegram", ("handler",)
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "telegram_handler_errors_total", "Exceções não tratadas nos handlers", ("handler",)
+)
+
 # Estados da conversação de conversão de link
 AWAITING_LINK = 1
 
+# Intervalo entre edições da mensagem de progresso (o Telegram limita edições)
+PROGRESS_INTERVAL = 3.0
+
+
+def _tracked(handler):
+    """Registra duração e exceções do handler nas métricas; os logs levam o update_id."""
+    name = handler.__name__
+
+    @functools.wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        started = time.perf_counter()
+        try:
+            with LogContext(update_id=getattr(update, "update_id", None)):
+                return await handler(update, context)
+        except Exception:
+            HANDLER_ERRORS.inc(handler=name)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - started, handler=name)
+
+    return wrapper
+
 
 def is_authorized(user_id: int) -> bool:
     """Verifica se o usuário é o administrador."""
@@ -40,6 +78,7 @@ def is_authorized(user_id: int) -> bool:
     return False
 
 
+@_tracked
 async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para comando /start e /menu.
 
@@ -65,6 +104,7 @@ async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     logger.info(f"Usuário {update.effective_user.id} abriu o menu")
 
 
+@_tracked
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para comando /help.
 
@@ -82,6 +122,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     )
 
 
+@_tracked
 async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Callback para botão do menu.
 
@@ -104,6 +145,7 @@ async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     )
 
 
+@_tracked
 async def status_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Callback para botão de status.
 
@@ -134,19 +176,33 @@ async def status_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             "items_approved": last_run.items_approved,
             "items_sent": last_run.items_sent,
             "success_rate": 100 if last_run.success else 0,
+            "stages": [
+                {
+                    "stage": stage.stage,
+                    "wall_ms": stage.wall_ms,
+                    "api_calls": stage.api_calls,
+                    "api_retries": stage.api_retries,
+                    "db_queries": stage.db_queries,
+                }
+                for stage in db.get_run_stages(last_run.id)
+            ],
         }
 
     # Estatísticas do banco
     db_stats = db.get_stats()
 
+    # Cota da API: tentativas HTTP na última hora
+    shopee: ShopeeClient | None = context.bot_data.get("shopee")
+    recent_requests = getattr(shopee, "recent_requests", None)
+
     stats = {
         "is_healthy": True,
-        "uptime": "Calculando...",  # TODO: implementar uptime real
+        "uptime": format_uptime(uptime_seconds()),
         "last_run": last_run_data,
         "next_run": {"scheduled_at": "Configurado no cron"},
-        "rate_limit_used": 0,  # TODO: implementar rate limit tracking
+        "rate_limit_used": recent_requests.total() if recent_requests else 0,
         "db_stats": db_stats,
-        "errors_24h": 0,  # TODO: implementar error tracking
+        "errors_24h": RECENT_ERRORS.total(),
     }
 
     text = format_status_message(stats)
@@ -158,9 +214,175 @@ async def status_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     )
 
 
+@dataclass
+class ManualCuration:
+    """Curadoria manual rodando em segundo plano (``bot_data["manual_curation"]``)."""
+
+    profiler: RunProfiler
+    started: float = field(default_factory=time.monotonic)
+    # Com o envio iniciado a curadoria não pode mais ser cancelada
+    sending: bool = False
+    task: asyncio.Task | None = None
+
+    @property
+    def active(self) -> bool:
+        """Indica se a curadoria ainda não terminou."""
+        return self.task is None or not self.task.done()
+
+
+async def _manual_curation(
+    context: ContextTypes.DEFAULT_TYPE,
+    db: Database,
+    curator: Curator,
+    profile: CurationProfile,
+    group_id: str,
+    state: ManualCuration | None = None,
+) -> dict:
+    """Executa a curadoria manual, envia no grupo e registra o run.
+
+    Args:
+        state: Acompanhamento da execução (profiler e marcação do envio)
+
+    Returns:
+        ``fetched`` e ``groups`` (group_id -> resultado de ``curate``), o
+        mesmo formato da curadoria agendada
+    """
+    run_id = db.start_run("manual")
+    batch_id = datetime.now().strftime("%Y%m%d_%H%M_manual")
+    profiler = state.profiler if state else RunProfiler(curator.shopee, db)
+
+    with LogContext(run_id=run_id, batch_id=batch_id):
+        try:
+            result = await curator.curate(profile.keywords, profile.categories, profiler=profiler)
+
+            # Envia resultado no grupo
+            if result["products"]:
+                message = format_consolidated_message(
+                    result["products"],
+                    {
+                        "fetched": result["fetched"],
+                        "approved": result["approved"],
+                    },
+                )
+
+                if state:
+                    state.sending = True
+                with profiler.stage("send"):
+                    await context.bot.send_message(
+                        chat_id=group_id,
+                        text=message,
+                        parse_mode="HTML",
+                        disable_web_page_preview=True,
+                    )
+
+            # Marca produtos como enviados e finaliza run na mesma transação
+            with db.transaction():
+                curator.deduplicator.mark_sent_batch(result["products"], group_id, batch_id)
+                db.record_run_stages(run_id, profiler.rows())
+                db.end_run(
+                    run_id,
+                    items_fetched=result["fetched"],
+                    items_approved=result["approved"],
+                    items_sent=result["final"],
+                    success=True,
+                )
+        except (Exception, asyncio.CancelledError) as e:
+            db.record_run_stages(run_id, profiler.rows())
+            db.end_run(
+                run_id,
+                items_fetched=0,
+                items_approved=0,
+                items_sent=0,
+                error_summary="cancelada" if isinstance(e, asyncio.CancelledError) else str(e),
+                success=False,
+            )
+            raise
+
+    return {"fetched": result["fetched"], "groups": {group_id: result}}
+
+
+async def _report_progress(query, state: ManualCuration) -> None:
+    """Edita a mensagem do admin com a etapa atual até ser cancelada."""
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL)
+        profiler = state.profiler
+        text = format_curation_progress(
+            profiler.current_stage, profiler.entries("fetch"), time.monotonic() - state.started
+        )
+        try:
+            await query.edit_message_text(
+                text, reply_markup=None if state.sending else curation_progress_keyboard()
+            )
+        except Exception as e:
+            logger.debug("Falha ao atualizar progresso da curadoria: %s", e)
+
+
+async def _run_manual_curation(
+    query,
+    context: ContextTypes.DEFAULT_TYPE,
+    state: ManualCuration,
+    db: Database,
+    curator: Curator,
+    profile: CurationProfile,
+    group_id: str,
+) -> None:
+    """Corpo da task de segundo plano da curadoria manual."""
+    # Uma execução por grupo: durante a curadoria agendada, aguarda o resultado dela
+    runs: RunCoordinator = context.bot_data.setdefault("runs", RunCoordinator())
+    ticker = asyncio.create_task(_report_progress(query, state))
+    try:
+        outcome = await runs.run(
+            [group_id],
+            lambda: _manual_curation(context, db, curator, profile, group_id, state),
+            kind="manual",
+        )
+    except asyncio.CancelledError:
+        logger.info("Curadoria manual cancelada")
+        await query.edit_message_text(
+            "🛑 Curadoria cancelada.", reply_markup=back_to_menu_keyboard()
+        )
+        return
+    except Exception as e:
+        logger.error(f"Erro na curadoria: {e}")
+        await query.edit_message_text(
+            f"❌ Erro na curadoria: {escape_html(str(e))}",
+            reply_markup=back_to_menu_keyboard(),
+        )
+        return
+    finally:
+        ticker.cancel()
+        if context.bot_data.get("manual_curation") is state:
+            del context.bot_data["manual_curation"]
+
+    result = outcome.result["groups"][group_id]
+    header = "ℹ️ Resultado da curadoria que já estava em andamento.\n\n" if outcome.coalesced else ""
+
+    if result["products"]:
+        await query.edit_message_text(
+            f"{header}✅ Curadoria concluída!\n\n"
+            f"📦 Avaliados: {result['fetched']}\n"
+            f"✅ Aprovados: {result['approved']}\n"
+            f"📤 Enviados: {result['final']}\n\n"
+            f"Verifique o grupo!",
+            reply_markup=back_to_menu_keyboard(),
+        )
+    else:
+        await query.edit_message_text(
+            f"{header}⚠️ Nenhum produto aprovado.\n\n"
+            f"Avaliados: {result['fetched']}\n"
+            f"Aprovados: {result['approved']}",
+            reply_markup=back_to_menu_keyboard(),
+        )
+
+
+@_tracked
 async def curate_now_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Callback para botão de curadoria imediata.
 
+    A curadoria roda numa task de segundo plano que edita a mensagem com o
+    progresso e pode ser interrompida pelo botão Cancelar; o handler retorna
+    logo após iniciá-la.
+
     Args:
         update: Update do Telegram
         context: Contexto do bot
@@ -171,77 +393,71 @@ async def curate_now_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
 
     await query.answer()
 
-    # Envia mensagem de processamento
-    await query.edit_message_text("⚙️ Executando curadoria...")
+    settings = config.get_settings()
+    db: Database = context.bot_data.get("db")
+    curator: Curator = context.bot_data.get("curator")
 
-    # Executa curadoria
-    try:
-        settings = config.get_settings()
-        db: Database = context.bot_data.get("db")
-        curator: Curator = context.bot_data.get("curator")
+    if not all([db, curator]):
+        await query.edit_message_text("⚠️ Sistema não disponível")
+        return
 
-        if not all([db, curator]):
-            await query.edit_message_text("⚠️ Sistema não disponível")
-            return
+    running: ManualCuration | None = context.bot_data.get("manual_curation")
+    if running is not None and running.active:
+        await query.edit_message_text(
+            "⏳ Curadoria já em andamento...", reply_markup=curation_progress_keyboard()
+        )
+        return
 
-        # Configurações padrão (TODO: carregar do banco)
-        keywords = ["fone bluetooth", "smartwatch", "carregador rápido"]
-        categories = None
+    # Perfil atual (editável com /perfil)
+    profiles: ProfileStore | None = context.bot_data.get("profiles")
+    profile = profiles.get() if profiles else CurationProfile()
 
-        # Executa curadoria
-        result = await curator.curate(keywords, categories)
+    # A task nasce antes de qualquer edição: uma falha ao editar a mensagem
+    # não pode deixar um estado sem task marcado como ativo para sempre
+    state = ManualCuration(RunProfiler(curator.shopee, db))
+    state.task = asyncio.create_task(
+        _run_manual_curation(
+            query, context, state, db, curator, profile, str(settings.target_group_id)
+        )
+    )
+    context.bot_data["manual_curation"] = state
+    try:
+        await query.edit_message_text(
+            format_curation_progress(None, 0, 0), reply_markup=curation_progress_keyboard()
+        )
+    except Exception as e:
+        # O progresso periódico volta a tentar editar a mensagem
+        logger.warning("Falha ao exibir início da curadoria: %s", e)
 
-        # Envia resultado no grupo
-        if result["products"]:
-            message = format_consolidated_message(
-                result["products"],
-                {
-                    "fetched": result["fetched"],
-                    "approved": result["approved"],
-                },
-            )
 
-            await context.bot.send_message(
-                chat_id=settings.target_group_id,
-                text=message,
-                parse_mode="HTML",
-                disable_web_page_preview=True,
-            )
+@_tracked
+async def cancel_curation_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Callback do botão Cancelar da curadoria manual.
 
-            # Marca produtos como enviados
-            batch_id = datetime.now().strftime("%Y%m%d_%H%M_manual")
-            for product in result["products"]:
-                item_id = product.get("itemId")
-                short_link = product.get("shortLink", "")
-                if item_id and short_link:
-                    curator.deduplicator.mark_sent(
-                        item_id, settings.target_group_id, short_link, batch_id
-                    )
+    Args:
+        update: Update do Telegram
+        context: Contexto do bot
+    """
+    query = update.callback_query
+    if not query or not is_authorized(query.from_user.id):
+        return
 
-            await query.edit_message_text(
-                f"✅ Curadoria concluída!\n\n"
-                f"📦 Avaliados: {result['fetched']}\n"
-                f"✅ Aprovados: {result['approved']}\n"
-                f"📤 Enviados: {result['final']}\n\n"
-                f"Verifique o grupo!",
-                reply_markup=back_to_menu_keyboard(),
-            )
-        else:
-            await query.edit_message_text(
-                f"⚠️ Nenhum produto aprovado.\n\n"
-                f"Avaliados: {result['fetched']}\n"
-                f"Aprovados: {result['approved']}",
-                reply_markup=back_to_menu_keyboard(),
-            )
+    state: ManualCuration | None = context.bot_data.get("manual_curation")
+    if state is None or state.task is None or state.task.done():
+        await query.answer("Nenhuma curadoria em andamento")
+        return
+    if state.sending:
+        await query.answer("Envio em andamento, não é mais possível cancelar")
+        return
 
-    except Exception as e:
-        logger.error(f"Erro na curadoria: {e}")
-        await query.edit_message_text(
-            f"❌ Erro na curadoria: {escape_html(str(e))}",
-            reply_markup=back_to_menu_keyboard(),
-        )
+    await query.answer("Cancelando...")
+    runs: RunCoordinator | None = context.bot_data.get("runs")
+    if runs is not None:
+        runs.cancel(str(config.get_settings().target_group_id), kind="manual")
+    state.task.cancel()
 
 
+@_tracked
 async def convert_link_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Inicia conversação de conversão de link.
 
@@ -268,6 +484,7 @@ async def convert_link_start(update: Update, context: ContextTypes.DEFAULT_TYPE)
     return AWAITING_LINK
 
 
+@_tracked
 async def convert_link_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Processa link enviado pelo usuário.
 
@@ -345,6 +562,7 @@ async def convert_link_message(update: Update, context: ContextTypes.DEFAULT_TYP
     return ConversationHandler.END
 
 
+@_tracked
 async def convert_link_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handler para timeout da conversação.
 
@@ -363,6 +581,7 @@ async def convert_link_timeout(update: Update, context: ContextTypes.DEFAULT_TYP
     return ConversationHandler.END
 
 
+@_tracked
 async def report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler para comando /relatorio.
 
@@ -377,6 +596,7 @@ async def report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     await _generate_report(msg, context, is_callback=False)
 
 
+@_tracked
 async def report_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Callback para botão de relatório.
 
@@ -490,6 +710,7 @@ async def _generate_report(
         )
 
 
+@_tracked
 async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Callback para botão de ajuda.
 
@@ -508,3 +729,72 @@ async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         reply_markup=main_menu_keyboard(),
         parse_mode="HTML",
     )
+
+
+@_tracked
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler para comando /perfil.
+
+    Sem argumentos mostra o perfil; ``/perfil campo valor`` altera um campo e
+    vale a partir da próxima curadoria. ``/perfil recarregar`` relê o perfil
+    do banco (ex: editado direto na tabela settings) e o reaplica.
+
+    Args:
+        update: Update do Telegram
+        context: Contexto do bot
+    """
+    if not update.message or not is_authorized(update.effective_user.id):
+        return
+
+    profiles: ProfileStore | None = context.bot_data.get("profiles")
+    if not profiles:
+        await update.message.reply_text("⚠️ Sistema não disponível")
+        return
+
+    args = context.args or []
+    if not args:
+        profile = profiles.get()
+    elif args == ["recarregar"]:
+        profile = profiles.reload()
+        logger.info("Perfil recarregado do banco")
+    elif len(args) < 2:
+        await update.message.reply_text("Uso: <code>/perfil campo valor</code>", parse_mode="HTML")
+        return
+    else:
+        try:
+            profile = profiles.set_field(args[0], " ".join(args[1:]))
+        except ValueError as e:
+            await update.message.reply_text(
+                f"❌ Valor inválido: {escape_html(str(e))}", parse_mode="HTML"
+            )
+            return
+        logger.info("Perfil alterado: %s", args[0])
+
+    await update.message.reply_text(
+        format_profile_message(profile),
+        reply_markup=back_to_menu_keyboard(),
+        parse_mode="HTML",
+    )
+
+
+@_tracked
+async def profile_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Callback para botão de perfil.
+
+    Args:
+        update: Update do Telegram
+        context: Contexto do bot
+    """
+    query = update.callback_query
+    if not query or not is_authorized(query.from_user.id):
+        return
+
+    await query.answer()
+
+    profiles: ProfileStore | None = context.bot_data.get("profiles")
+    profile = profiles.get() if profiles else CurationProfile()
+    await query.edit_message_text(
+        format_profile_message(profile),
+        reply_markup=back_to_menu_keyboard(),
+        parse_mode="HTML",
+    )
@@ -13,6 +13,8 @@ class CallbackData:
     REPORT = "report"
     STATUS = "status"
     HELP = "help"
+    PROFILE = "profile"
+    CANCEL_CURATION = "curate_cancel"
 
 
 def main_menu_keyboard() -> InlineKeyboardMarkup:
@@ -27,6 +29,7 @@ def main_menu_keyboard() -> InlineKeyboardMarkup:
             InlineKeyboardButton("💸 Relatório", callback_data=CallbackData.REPORT),
         ],
         [
+            InlineKeyboardButton("🎛️ Perfil", callback_data=CallbackData.PROFILE),
             InlineKeyboardButton("⚙️ Ajuda", callback_data=CallbackData.HELP),
         ],
     ]
@@ -39,6 +42,12 @@ def back_to_menu_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+def curation_progress_keyboard() -> InlineKeyboardMarkup:
+    """Retorna teclado da curadoria em andamento."""
+    keyboard = [[InlineKeyboardButton("🛑 Cancelar", callback_data=CallbackData.CANCEL_CURATION)]]
+    return InlineKeyboardMarkup(keyboard)
+
+
 def status_keyboard() -> InlineKeyboardMarkup:
     """Retorna teclado da tela de status."""
     keyboard = [
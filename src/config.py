@@ -9,6 +9,41 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _int_env(name: str, default: int) -> int:
+    """Lê uma variável de ambiente inteira opcional."""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} deve ser um número inteiro válido: '{value}'") from None
+
+
+def _int_list_env(name: str) -> tuple[int, ...]:
+    """Lê uma lista opcional de inteiros separados por vírgula."""
+    value = os.getenv(name, "")
+    try:
+        return tuple(int(part) for part in value.split(",") if part.strip())
+    except ValueError:
+        raise ValueError(
+            f"{name} deve ser uma lista de inteiros separados por vírgula: '{value}'"
+        ) from None
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    """Lê uma variável de ambiente booleana opcional (1/0, true/false, yes/no)."""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    normalized = value.strip().lower()
+    if normalized in ("1", "true", "yes", "on"):
+        return True
+    if normalized in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{name} deve ser booleano (true/false): '{value}'")
+
+
 @dataclass(frozen=True)
 class Settings:
     """Configurações da aplicação."""
@@ -30,6 +65,37 @@ class Settings:
     # Scheduler
     schedule_cron: str
 
+    # Atraso aleatório máximo (s) em cada disparo e tolerância (s) para rodar
+    # um disparo perdido após reinício (disparos acumulados rodam uma vez)
+    schedule_jitter: int = 120
+    schedule_misfire_grace: int = 3600
+
+    # Retenção
+    retention_cron: str = "30 4 * * *"
+    retention_raw_json_days: int = 30
+    retention_link_days: int = 30
+    retention_sent_factor: int = 4
+    retention_price_history_days: int = 90
+
+    # Grupos adicionais da curadoria agendada (mesma busca, seleção por grupo)
+    extra_group_ids: tuple[int, ...] = ()
+
+    # Armazenamento
+    raw_json_compression: bool = True
+
+    # Cache de buscas na API (TTL 0 desliga; STALE serve respostas vencidas
+    # enquanto atualiza em segundo plano)
+    search_cache_ttl: int = 600
+    search_cache_stale: int = 1800
+
+    # Pré-aquecimento N minutos antes de cada SCHEDULE_CRON (0 desliga); deve
+    # caber em SEARCH_CACHE_TTL para a curadoria reaproveitar as buscas
+    prewarm_minutes: int = 5
+
+    # Métricas (porta 0 desliga o endpoint)
+    metrics_port: int = 0
+    metrics_host: str = "127.0.0.1"
+
     @classmethod
     def from_env(cls) -> "Settings":
         """Carrega configurações das variáveis de ambiente."""
@@ -78,6 +144,20 @@ class Settings:
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             db_path=os.getenv("DB_PATH", "/data/mariabico.db"),
             schedule_cron=os.getenv("SCHEDULE_CRON", "0 */12 * * *"),
+            schedule_jitter=_int_env("SCHEDULE_JITTER", 120),
+            schedule_misfire_grace=_int_env("SCHEDULE_MISFIRE_GRACE", 3600),
+            retention_cron=os.getenv("RETENTION_CRON", "30 4 * * *"),
+            retention_raw_json_days=_int_env("RETENTION_RAW_JSON_DAYS", 30),
+            retention_link_days=_int_env("RETENTION_LINK_DAYS", 30),
+            retention_sent_factor=_int_env("RETENTION_SENT_FACTOR", 4),
+            retention_price_history_days=_int_env("RETENTION_PRICE_HISTORY_DAYS", 90),
+            extra_group_ids=_int_list_env("EXTRA_GROUP_IDS"),
+            raw_json_compression=_bool_env("RAW_JSON_COMPRESSION", True),
+            search_cache_ttl=_int_env("SEARCH_CACHE_TTL", 600),
+            search_cache_stale=_int_env("SEARCH_CACHE_STALE", 1800),
+            prewarm_minutes=_int_env("PREWARM_MINUTES", 5),
+            metrics_port=_int_env("METRICS_PORT", 0),
+            metrics_host=os.getenv("METRICS_HOST", "127.0.0.1"),
         )
 
     def validate(self) -> None:
@@ -104,6 +184,15 @@ class Settings:
         if self.target_group_id >= 0:
             raise ValueError("TARGET_GROUP_ID deve ser negativo (grupo)")
 
+        if any(group_id >= 0 for group_id in self.extra_group_ids):
+            raise ValueError("EXTRA_GROUP_IDS deve conter apenas IDs negativos (grupos)")
+
+        if self.schedule_jitter < 0 or self.schedule_misfire_grace < 0:
+            raise ValueError("SCHEDULE_JITTER e SCHEDULE_MISFIRE_GRACE não podem ser negativos")
+
+        if self.prewarm_minutes < 0:
+            raise ValueError("PREWARM_MINUTES não pode ser negativo")
+
         if not self.shopee_app_id.isdigit():
             raise ValueError("SHOPEE_APP_ID deve ser numérico")
 
@@ -1,18 +1,54 @@
 """Lógica de negócio do MariaBicoBot."""
 
-from .curator import Curator
+from .coordinator import RunCoordinator, RunOutcome
+from .curator import Curator, GroupConfig
 from .deduplicator import Deduplicator
-from .link_gen import LinkGenerator, build_sub_ids
-from .scoring import FilterThresholds, ScoreWeights, calculate_score, passes_filters, rank_products
+from .link_gen import LinkGenerator, build_sub_ids, group_hash_for
+from .profiler import RunProfiler, StageStats
+from .profiles import CurationProfile, ProfileStore
+from .scoring import (
+    CompiledPipeline,
+    FilterThresholds,
+    RejectReason,
+    ScoreWeights,
+    calculate_score,
+    check_filters,
+    compile_filter,
+    compile_pipeline,
+    compile_scorer,
+    passes_filters,
+    rank_products,
+    real_discount_pct,
+)
+from .sent_index import BloomFilter, RecentSendsIndex
+from .topk import TopK
 
 __all__ = [
+    "RunCoordinator",
+    "RunOutcome",
     "Curator",
+    "GroupConfig",
     "Deduplicator",
     "LinkGenerator",
     "build_sub_ids",
+    "group_hash_for",
+    "RunProfiler",
+    "StageStats",
+    "CurationProfile",
+    "ProfileStore",
+    "CompiledPipeline",
     "FilterThresholds",
+    "RejectReason",
     "ScoreWeights",
     "calculate_score",
+    "check_filters",
+    "compile_filter",
+    "compile_pipeline",
+    "compile_scorer",
     "passes_filters",
     "rank_products",
+    "real_discount_pct",
+    "BloomFilter",
+    "RecentSendsIndex",
+    "TopK",
 ]
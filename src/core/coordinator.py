@@ -0,0 +1,123 @@
+"""Coordenação de execuções de curadoria concorrentes."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from src.utils.logger import get_logger
+from src.utils.metrics import REGISTRY
+
+logger = get_logger("mariabicobot", "curator")
+
+CURATION_RUNS = REGISTRY.counter(
+    "curation_runs_total", "Pedidos de curadoria por desfecho na coordenação", ("outcome",)
+)
+
+
+@dataclass
+class RunOutcome:
+    """Resultado de um pedido de execução."""
+
+    result: Any
+    coalesced: bool = False  # True quando reaproveitou a execução de outro chamador
+
+
+class RunCoordinator:
+    """Serializa e agrupa execuções de curadoria por grupo.
+
+    Um pedido cujos grupos já estão todos cobertos por uma execução em
+    andamento aguarda o resultado dela em vez de iniciar outra (ex: botão
+    "curar agora" tocado duas vezes, ou durante a curadoria agendada). Se a
+    sobreposição for parcial, o pedido espera as execuções em andamento
+    terminarem e então roda, já vendo os envios marcados por elas.
+
+    A execução roda numa task própria: cancelar quem espera não interrompe
+    uma curadoria que já pode ter enviado mensagens. Se a execução
+    reaproveitada for cancelada (``cancel``), quem a aguardava sem ter sido
+    cancelado inicia a própria execução.
+    """
+
+    def __init__(self):
+        # group_id -> (task da execução, grupos cobertos por ela, tipo)
+        self._runs: dict[str, tuple[asyncio.Task, frozenset[str], str]] = {}
+
+    def running(self, group_id: str) -> bool:
+        """Indica se há execução em andamento para o grupo."""
+        return group_id in self._runs
+
+    def cancel(self, group_id: str, kind: str | None = None) -> bool:
+        """Cancela a execução em andamento do grupo.
+
+        Args:
+            group_id: Grupo da execução
+            kind: Cancela apenas se a execução for deste tipo (ex: "manual")
+
+        Returns:
+            True se havia execução para cancelar
+        """
+        entry = self._runs.get(group_id)
+        if entry is None or (kind is not None and entry[2] != kind):
+            return False
+        return entry[0].cancel()
+
+    def _release(self, task: asyncio.Task) -> None:
+        for group_id in [g for g, (t, *_) in self._runs.items() if t is task]:
+            del self._runs[group_id]
+
+    async def run(
+        self,
+        group_ids: Iterable[str],
+        fn: Callable[[], Awaitable[Any]],
+        kind: str = "",
+    ) -> RunOutcome:
+        """Executa ``fn`` para os grupos ou reaproveita a execução em andamento.
+
+        Args:
+            group_ids: Grupos afetados pela execução
+            fn: Corrotina que executa a curadoria (chamada no máximo uma vez)
+            kind: Tipo da execução, para log e ``cancel`` (ex: "scheduled")
+
+        Returns:
+            Resultado de ``fn`` ou da execução reaproveitada
+
+        Raises:
+            Exception: O erro da execução, inclusive para quem a reaproveitou
+        """
+        groups = frozenset(str(g) for g in group_ids)
+        waited = False
+
+        while True:
+            active = {self._runs[g][:2] for g in groups if g in self._runs}
+            if not active:
+                break
+            if len(active) == 1:
+                task, covered = next(iter(active))
+                if groups <= covered:
+                    logger.info(
+                        "Curadoria %s aguardando execução em andamento para %s",
+                        kind,
+                        sorted(groups),
+                    )
+                    CURATION_RUNS.inc(outcome="coalesced")
+                    try:
+                        return RunOutcome(await asyncio.shield(task), coalesced=True)
+                    except asyncio.CancelledError:
+                        # Cancelaram a execução reaproveitada (ex: "Cancelar" da
+                        # manual), não este pedido: roda a própria execução
+                        if not task.cancelled() or asyncio.current_task().cancelling():
+                            raise
+                    logger.info(
+                        "Execução reaproveitada foi cancelada; curadoria %s roda a própria", kind
+                    )
+                    continue
+            logger.info("Curadoria %s na fila atrás de execução em andamento", kind)
+            waited = True
+            await asyncio.wait({task for task, _ in active})
+
+        task = asyncio.ensure_future(fn())
+        task.add_done_callback(self._release)
+        for group_id in groups:
+            self._runs[group_id] = (task, groups, kind)
+        CURATION_RUNS.inc(outcome="waited" if waited else "started")
+        return RunOutcome(await asyncio.shield(task))
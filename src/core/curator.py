@@ -1,19 +1,132 @@
 """Lógica de curadoria de produtos."""
 
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+
 from src.core.deduplicator import Deduplicator
 from src.core.link_gen import LinkGenerator
+from src.core.profiler import RunProfiler
+from src.core.profiles import CurationProfile
 from src.core.scoring import (
+    CompiledPipeline,
+    FilterCheck,
     FilterThresholds,
+    RejectReason,
     ScoreWeights,
-    passes_filters,
-    rank_products,
+    compile_filter,
+    compile_pipeline,
 )
+from src.core.topk import TopK
 from src.database import Database
 from src.shopee import ShopeeClient
-from src.utils.logger import get_logger
+from src.utils.logger import LogContext, get_logger, lazy
+from src.utils.metrics import REGISTRY
 
 logger = get_logger("mariabicobot", "curator")
 
+CURATION_SECONDS = REGISTRY.histogram(
+    "curation_duration_seconds", "Duração de Curator.curate", ("mode",)
+)
+CURATION_PRODUCTS = REGISTRY.counter(
+    "curation_products_total", "Produtos por etapa da curadoria", ("stage",)
+)
+
+
+@dataclass
+class GroupConfig:
+    """Seleção de um grupo na curadoria multi-grupo (``Curator.curate_groups``)."""
+
+    group_id: str
+    group_hash: str = "default"  # Vai nos subIds dos links do grupo
+    top_n: int | None = None  # None usa o do Curator
+    thresholds: FilterThresholds | None = None  # None usa os do Curator
+    dedup_days: int = 7
+
+
+def _ranking_summary(products: list[dict]) -> str:
+    """Resumo ``itemId=score`` de um ranking, para logs de depuração."""
+    return ", ".join(f"{p['itemId']}={p['score']}" for p in products)
+
+
+def _new_filter_stats(total: int = 0) -> dict:
+    """Retorna contadores de filtragem zerados."""
+    return {
+        "total": total,
+        "passed_filters": 0,
+        **{f"failed_{reason.value}": 0 for reason in RejectReason},
+    }
+
+
+class _Selection:
+    """Filtro, deduplicação e top-K de um grupo, alimentados página a página.
+
+    A deduplicação por histórico é consultada apenas para produtos que
+    entrariam no top-K.
+    """
+
+    def __init__(self, group_id: str, top_n: int, check: FilterCheck, deduplicator: Deduplicator):
+        self.group_id = group_id
+        self.check = check
+        self.deduplicator = deduplicator
+        self.top = TopK(top_n)
+        self.filter_stats = _new_filter_stats()
+        self.after_dedup = 0
+        self._seen_ids: set[str] = set()
+        self._sent_ids: set[str] = set()
+
+    def wants(self, page_products: list[dict]) -> bool:
+        """Indica se a página tem algum candidato acima do top-K atual."""
+        floor = self.top.threshold()
+        return floor is None or any(
+            p["score"] > floor and self.check(p) is None for p in page_products
+        )
+
+    def offer_page(self, page_products: list[dict], profiler: RunProfiler) -> None:
+        """Filtra a página e oferece os aprovados ao top-K."""
+        stats = self.filter_stats
+        top = self.top
+        for product in page_products:
+            item_id = product["itemId"]
+            first_time = item_id not in self._seen_ids
+            self._seen_ids.add(item_id)
+            if first_time:
+                stats["total"] += 1
+
+            reason = self.check(product)
+            if reason is not None:
+                if first_time:
+                    stats[f"failed_{reason.value}"] += 1
+                continue
+            if first_time:
+                stats["passed_filters"] += 1
+
+            if item_id in self._sent_ids:
+                continue
+            if item_id not in top:
+                if not top.accepts(product["score"]):
+                    continue
+                with profiler.stage("dedup"):
+                    duplicate = self.deduplicator.is_duplicate(item_id, self.group_id)
+                if duplicate:
+                    self._sent_ids.add(item_id)
+                    continue
+                self.after_dedup += 1
+            # Cópia própria do grupo: o top-K mescla keywords e o gerador de
+            # links grava shortLink no produto, que não pode vazar entre grupos
+            keywords = product.get("keywords") or [product.get("keyword", "")]
+            top.offer(dict(product, keywords=list(keywords)))
+
+    def result(self, products: list[dict]) -> dict:
+        """Resultado no formato de ``Curator.curate``."""
+        return {
+            "fetched": self.filter_stats["total"],
+            "approved": self.filter_stats["passed_filters"],
+            "after_dedup": self.after_dedup,
+            "final": len(products),
+            "products": products,
+            "filter_stats": self.filter_stats,
+        }
+
 
 class Curator:
     """Gerencia curadoria de produtos Shopee."""
@@ -30,8 +143,24 @@ class Curator:
         dedup_days: int = 7,
         weights: ScoreWeights | None = None,
         thresholds: FilterThresholds | None = None,
+        streaming: bool = False,
+        early_stop_pages: int = 0,
+        reference_days: int = 30,
     ):
-        """Inicializa o curador."""
+        """Inicializa o curador.
+
+        Com ``streaming=True``, ``curate`` processa cada página assim que ela
+        chega (normaliza → filtra → top-K) em vez de materializar as listas
+        completas de buscados, aprovados e rankeados.
+
+        ``early_stop_pages`` (apenas no modo streaming) interrompe a paginação de
+        uma keyword após N páginas seguidas sem nenhum candidato acima do score
+        mínimo do top-N atual. 0 desliga.
+
+        Quando ``weights.real_discount`` é diferente de zero, cada produto recebe
+        ``referencePrice`` (menor preço dos últimos ``reference_days`` dias no
+        histórico, antes do preço atual entrar em vigor) antes de ser pontuado.
+        """
         self.shopee = shopee_client
         self.db = db
         self.group_id = group_id
@@ -39,11 +168,51 @@ class Curator:
         self.top_n = top_n
         self.max_pages = max_pages
         self.page_limit = page_limit
-        self.weights = weights or ScoreWeights()
-        self.thresholds = thresholds or FilterThresholds()
+        self.pipeline: CompiledPipeline = compile_pipeline(thresholds, weights)
+        self.streaming = streaming
+        self.early_stop_pages = early_stop_pages
+        self.reference_days = reference_days
 
         self.deduplicator = Deduplicator(db, dedup_days)
         self.link_gen = LinkGenerator(shopee_client, db, group_hash)
+        # Deduplicadores por janela, compartilhados entre grupos (curate_groups)
+        self._deduplicators: dict[int, Deduplicator] = {dedup_days: self.deduplicator}
+
+    @property
+    def thresholds(self) -> FilterThresholds:
+        """Thresholds de filtragem em uso."""
+        return self.pipeline.thresholds
+
+    @thresholds.setter
+    def thresholds(self, value: FilterThresholds) -> None:
+        # Recompila apenas quando os thresholds são substituídos
+        self.pipeline = compile_pipeline(value, self.pipeline.weights)
+
+    @property
+    def weights(self) -> ScoreWeights:
+        """Pesos de score em uso."""
+        return self.pipeline.weights
+
+    @weights.setter
+    def weights(self, value: ScoreWeights) -> None:
+        self.pipeline = compile_pipeline(self.pipeline.thresholds, value)
+
+    def apply_profile(self, profile: CurationProfile) -> None:
+        """Aplica um perfil de curadoria (vale a partir da próxima execução)."""
+        self.top_n = profile.top_n
+        self.max_pages = profile.max_pages
+        self.page_limit = profile.page_limit
+        self.pipeline = compile_pipeline(profile.thresholds, profile.weights)
+
+    def _attach_reference_prices(self, products: list[dict]) -> None:
+        """Preenche ``referencePrice`` a partir do histórico de preços."""
+        references = self.db.get_reference_prices(
+            {p["itemId"]: p["priceMin"] for p in products}, self.reference_days
+        )
+        for product in products:
+            reference = references.get(int(product["itemId"]))
+            if reference is not None:
+                product["referencePrice"] = reference
 
     def _normalize_offer(self, offer: dict, keyword: str = "") -> dict:
         """Normaliza campos da oferta para o padrão do bot."""
@@ -81,6 +250,12 @@ class Curator:
         except (ValueError, TypeError):
             rating = 0.0
 
+        # Vendas (usado pelo filtro sales_min)
+        try:
+            sales = int(offer.get("sales", 0) or 0)
+        except (ValueError, TypeError):
+            sales = 0
+
         normalized = {
             "itemId": str(offer.get("itemId", "0")),
             "productName": name,
@@ -90,89 +265,193 @@ class Curator:
             "originUrl": offer.get("offerLink", ""),
             "imageUrl": offer.get("imageUrl", ""),
             "rating": rating,
+            "sales": sales,
             "keyword": keyword,
         }
         return normalized
 
-    async def fetch_products(
+    def _merge_offer(self, offers: dict[str, dict], product: dict) -> bool:
+        """Adiciona oferta ao índice da execução, sem repetir itemId.
+
+        Quando o mesmo itemId aparece para mais de uma keyword, mantém a cópia
+        de maior score e acumula as keywords em ``keywords``.
+
+        Args:
+            offers: Índice itemId -> produto da execução atual
+            product: Produto normalizado e pontuado
+
+        Returns:
+            True se o itemId ainda não tinha sido visto
+        """
+        item_id = product["itemId"]
+
+        current = offers.get(item_id)
+        if current is None:
+            product["keywords"] = [product["keyword"]]
+            offers[item_id] = product
+            return True
+
+        keywords = current["keywords"]
+        if product["keyword"] not in keywords:
+            keywords.append(product["keyword"])
+
+        if product["score"] > current["score"]:
+            product["keywords"] = keywords
+            offers[item_id] = product
+
+        return False
+
+    async def iter_pages(
         self,
         keywords: list[str],
         categories: list[int] | None = None,
-    ) -> list[dict]:
-        """Busca produtos na API Shopee."""
-        all_products = []
+        wants: Callable[[list[dict]], bool] | None = None,
+        fetch_stats: dict | None = None,
+        profiler: RunProfiler | None = None,
+        refresh: bool = False,
+    ) -> AsyncIterator[list[dict]]:
+        """Itera as páginas da API Shopee já normalizadas e pontuadas.
+
+        Args:
+            keywords: Keywords de busca
+            categories: Categorias (API aceita uma por vez; usa a primeira)
+            wants: Indica se a página (já pontuada) tem algum candidato que
+                entraria no top-N; habilita a parada antecipada por keyword
+            fetch_stats: Dicionário preenchido com métricas por keyword
+            profiler: Mede as etapas fetch, normalize e rank
+            refresh: Ignora respostas em cache e busca de novo na API
+
+        Yields:
+            Lista de produtos normalizados (com ``score``) de cada página
+        """
+        # Resolve categoria (API aceita uma por vez)
+        cat_id = categories[0] if categories else None
+        score = self.pipeline.score
+        use_history = bool(self.pipeline.weights.real_discount)
+        patience = self.early_stop_pages if wants is not None else 0
+        profiler = profiler or RunProfiler()
 
         for keyword in keywords:
-            logger.info(f"Buscando produtos para keyword: {keyword}")
+            logger.info("Buscando produtos para keyword: %s", keyword)
+            pages_fetched = 0
+            stale_pages = 0
+            stopped_early = False
 
             for page in range(1, self.max_pages + 1):
-                try:
-                    # Resolve categoria (API aceita uma por vez)
-                    cat_id = categories[0] if categories else None
-
-                    offers = await self.shopee.search_products(
-                        keywords=[keyword],
-                        limit=self.page_limit,
-                        page=page,
-                        category_id=cat_id,
+                with profiler.stage("fetch"):
+                    try:
+                        page_offers = await self.shopee.search_products(
+                            keywords=[keyword],
+                            limit=self.page_limit,
+                            page=page,
+                            category_id=cat_id,
+                            refresh=refresh,
+                        )
+                    except Exception as e:
+                        logger.error("Erro ao buscar página %s para '%s': %s", page, keyword, e)
+                        continue
+                    finally:
+                        pages_fetched += 1
+
+                if not page_offers:
+                    logger.info("Página %s vazia para keyword '%s'", page, keyword)
+                    break
+
+                logger.info("Buscou %d produtos (página %s)", len(page_offers), page)
+                with profiler.stage("normalize"):
+                    page_products = [self._normalize_offer(o, keyword) for o in page_offers]
+                    if use_history:
+                        self._attach_reference_prices(page_products)
+                with profiler.stage("rank"):
+                    for product in page_products:
+                        product["score"] = score(product)
+
+                # Avalia a página contra o top-N antes de entregá-la ao consumidor
+                if patience:
+                    stale_pages = 0 if wants(page_products) else stale_pages + 1
+
+                yield page_products
+
+                if patience and stale_pages >= patience and page < self.max_pages:
+                    stopped_early = True
+                    logger.info(
+                        "Paginação de '%s' interrompida na página %s: "
+                        "%d página(s) sem candidatos acima do top-N",
+                        keyword,
+                        page,
+                        stale_pages,
                     )
+                    break
 
-                    if not offers:
-                        logger.info(f"Página {page} vazia para keyword '{keyword}'")
-                        break
+            if fetch_stats is not None:
+                fetch_stats[keyword] = {
+                    "pages_fetched": pages_fetched,
+                    "pages_saved": self.max_pages - pages_fetched if stopped_early else 0,
+                    "stopped_early": stopped_early,
+                }
 
-                    # Normaliza e adiciona keyword
-                    for o in offers:
-                        norm = self._normalize_offer(o, keyword)
-                        all_products.append(norm)
-
-                    logger.info(f"Buscou {len(offers)} produtos (página {page})")
-
-                except Exception as e:
-                    logger.error(f"Erro ao buscar página {page} para '{keyword}': {e}")
+    async def fetch_products(
+        self,
+        keywords: list[str],
+        categories: list[int] | None = None,
+        profiler: RunProfiler | None = None,
+    ) -> list[dict]:
+        """Busca produtos na API Shopee (um produto por itemId)."""
+        offers: dict[str, dict] = {}
+        duplicates = 0
+        profiler = profiler or RunProfiler()
+
+        async for page_products in self.iter_pages(keywords, categories, profiler=profiler):
+            # Deduplica por itemId entre páginas e keywords
+            with profiler.stage("normalize"):
+                for product in page_products:
+                    if not self._merge_offer(offers, product):
+                        duplicates += 1
 
-        logger.info(f"Total de produtos buscados: {len(all_products)}")
-        return all_products
+        logger.info(
+            "Total de produtos buscados: %d únicos (%d repetidos mesclados)",
+            len(offers),
+            duplicates,
+        )
+        return list(offers.values())
 
     def filter_products(self, products: list[dict]) -> tuple[list[dict], dict]:
-        """Filtra produtos por thresholds."""
+        """Filtra produtos por thresholds.
+
+        Cada produto é avaliado uma única vez; o motivo de reprovação retornado
+        pelo filtro compilado alimenta os contadores ``failed_<motivo>``.
+        """
         filtered = []
-        stats = {
-            "total": len(products),
-            "passed_filters": 0,
-            "failed_commission": 0,
-            "failed_discount": 0,
-            "failed_price": 0,
-        }
+        stats = _new_filter_stats(len(products))
 
+        check = self.pipeline.check
         for product in products:
-            if passes_filters(product, self.thresholds):
+            reason = check(product)
+            if reason is None:
                 filtered.append(product)
-                stats["passed_filters"] += 1
             else:
-                comm = product.get("commission", 0)
-                rate = product.get("commissionRate", 0)
-                discount = product.get("priceDiscountRate", 0)
-                price = product.get("priceMin", 0)
-
-                if (
-                    rate < self.thresholds.commission_rate_min
-                    or comm < self.thresholds.commission_min_brl
-                ):
-                    stats["failed_commission"] += 1
-                elif discount < self.thresholds.discount_min_pct:
-                    stats["failed_discount"] += 1
-                elif self.thresholds.price_max_brl and price > self.thresholds.price_max_brl:
-                    stats["failed_price"] += 1
+                stats[f"failed_{reason.value}"] += 1
 
-        logger.info(
-            f"Filtragem: {stats['passed_filters']}/{stats['total']} aprovados, "
-            f"{stats['failed_commission']} falharam em comissão, "
-            f"{stats['failed_discount']} em desconto"
-        )
+        stats["passed_filters"] = len(filtered)
+        self._log_filter_stats(stats)
 
         return filtered, stats
 
+    @staticmethod
+    def _log_filter_stats(stats: dict) -> None:
+        """Loga o resumo da filtragem."""
+        logger.info(
+            "Filtragem: %d/%d aprovados, %d falharam em comissão, %d em desconto, "
+            "%d em preço, %d em vendas, %d em avaliação",
+            stats["passed_filters"],
+            stats["total"],
+            stats["failed_commission"],
+            stats["failed_discount"],
+            stats["failed_price"],
+            stats["failed_sales"],
+            stats["failed_rating"],
+        )
+
     def deduplicate_products(self, products: list[dict]) -> list[dict]:
         """Remove produtos já enviados recentemente."""
         return self.deduplicator.filter_duplicates(products, self.group_id)
@@ -185,32 +464,77 @@ class Curator:
         self,
         keywords: list[str],
         categories: list[int] | None = None,
+        profiler: RunProfiler | None = None,
     ) -> dict:
-        """Executa curadoria completa."""
+        """Executa curadoria completa.
+
+        Args:
+            keywords: Keywords de busca
+            categories: Categorias (opcional)
+            profiler: Acumula tempo e contadores por etapa; o chamador pode
+                reutilizá-lo para medir o envio e gravar com
+                ``Database.record_run_stages``
+
+        Returns:
+            Resultado da curadoria; ``stages`` traz as etapas medidas até aqui
+        """
+        logger.info("Iniciando curadoria: keywords=%s", keywords)
+        profiler = profiler or RunProfiler(self.shopee, self.db)
+        mode = "streaming" if self.streaming else "batch"
+        with CURATION_SECONDS.time(mode=mode):
+            if self.streaming:
+                result = await self._curate_streaming(keywords, categories, profiler)
+            else:
+                result = await self._curate_batch(keywords, categories, profiler)
+        result["stages"] = profiler.rows()
+        for stage in ("fetched", "approved", "final"):
+            CURATION_PRODUCTS.inc(result[stage], stage=stage)
+
+        logger.info(
+            "Curadoria concluída: %d buscados, %d aprovados, %d finais",
+            result["fetched"],
+            result["approved"],
+            result["final"],
+        )
+
+        return result
+
+    async def _curate_batch(
+        self,
+        keywords: list[str],
+        categories: list[int] | None = None,
+        profiler: RunProfiler | None = None,
+    ) -> dict:
+        """Curadoria em lotes: materializa cada etapa antes da próxima."""
+        profiler = profiler or RunProfiler()
+
         # 1. Busca
-        logger.info(f"Iniciando curadoria: keywords={keywords}")
-        fetched = await self.fetch_products(keywords, categories)
+        fetched = await self.fetch_products(keywords, categories, profiler)
 
         # 2. Filtra
-        filtered, filter_stats = self.filter_products(fetched)
+        with profiler.stage("filter"):
+            filtered, filter_stats = self.filter_products(fetched)
 
         # 3. Rankeia
-        ranked = rank_products(filtered, self.weights)
+        with profiler.stage("rank"):
+            ranked = self.pipeline.rank(filtered)
 
         # 4. Deduplica
-        after_dedup = self.deduplicate_products(ranked)
+        with profiler.stage("dedup"):
+            after_dedup = self.deduplicate_products(ranked)
 
         # 5. Top N
         final_products = after_dedup[: self.top_n]
 
         # 6. Gera links
-        await self.generate_links(final_products)
+        with profiler.stage("link_gen"):
+            await self.generate_links(final_products)
 
         # 7. Salva produtos vistos
-        for product in fetched:
-            self.db.upsert_product(product)
+        with profiler.stage("upsert"):
+            self.db.upsert_products(fetched)
 
-        result = {
+        return {
             "fetched": len(fetched),
             "approved": len(filtered),
             "after_dedup": len(after_dedup),
@@ -219,9 +543,223 @@ class Curator:
             "filter_stats": filter_stats,
         }
 
+    async def _curate_streaming(
+        self,
+        keywords: list[str],
+        categories: list[int] | None = None,
+        profiler: RunProfiler | None = None,
+    ) -> dict:
+        """Curadoria em streaming: cada página passa por filtro e top-K ao chegar.
+
+        Só os K melhores produtos ficam em memória. A deduplicação por histórico
+        é consultada apenas para produtos que entrariam no top-K, então
+        ``after_dedup`` conta os candidatos que passaram por essa verificação.
+        A etapa ``filter`` inclui a inserção no top-K.
+        """
+        profiler = profiler or RunProfiler()
+        selection = _Selection(self.group_id, self.top_n, self.pipeline.check, self.deduplicator)
+        fetch_stats: dict[str, dict] = {}
+
+        async for page_products in self.iter_pages(
+            keywords,
+            categories,
+            wants=selection.wants,
+            fetch_stats=fetch_stats,
+            profiler=profiler,
+        ):
+            # Salva produtos vistos (uma transação por página)
+            with profiler.stage("upsert"):
+                self.db.upsert_products(page_products)
+
+            with profiler.stage("filter"):
+                selection.offer_page(page_products, profiler)
+
+        self._log_filter_stats(selection.filter_stats)
+        self._log_pages_saved(fetch_stats)
+
+        final_products = selection.top.items()
+        with profiler.stage("link_gen"):
+            await self.generate_links(final_products)
+
+        return {**selection.result(final_products), "fetch_stats": fetch_stats}
+
+    @staticmethod
+    def _log_pages_saved(fetch_stats: dict[str, dict]) -> None:
+        pages_saved = sum(stats["pages_saved"] for stats in fetch_stats.values())
+        if pages_saved:
+            logger.info("Parada antecipada economizou %d página(s) da API", pages_saved)
+
+    def deduplicator_for(self, dedup_days: int) -> Deduplicator:
+        """Deduplicador para a janela (um índice em memória por janela)."""
+        deduplicator = self._deduplicators.get(dedup_days)
+        if deduplicator is None:
+            deduplicator = self._deduplicators[dedup_days] = Deduplicator(self.db, dedup_days)
+        return deduplicator
+
+    async def _select_groups(
+        self,
+        keywords: list[str],
+        groups: list[GroupConfig],
+        categories: list[int] | None,
+        profiler: RunProfiler,
+        refresh: bool = False,
+    ) -> tuple[list[_Selection], dict[str, dict]]:
+        """Busca uma vez e oferece cada página à seleção de cada grupo."""
+        selections = [
+            _Selection(
+                group.group_id,
+                self.top_n if group.top_n is None else group.top_n,
+                (
+                    self.pipeline.check
+                    if group.thresholds is None
+                    else compile_filter(group.thresholds)
+                ),
+                self.deduplicator_for(group.dedup_days),
+            )
+            for group in groups
+        ]
+        fetch_stats: dict[str, dict] = {}
+
+        async for page_products in self.iter_pages(
+            keywords,
+            categories,
+            wants=lambda page: any(s.wants(page) for s in selections),
+            fetch_stats=fetch_stats,
+            profiler=profiler,
+            refresh=refresh,
+        ):
+            with profiler.stage("upsert"):
+                self.db.upsert_products(page_products)
+
+            with profiler.stage("filter"):
+                for selection in selections:
+                    selection.offer_page(page_products, profiler)
+
+        self._log_pages_saved(fetch_stats)
+        return selections, fetch_stats
+
+    async def _group_links(
+        self, group: GroupConfig, selection: _Selection, profiler: RunProfiler
+    ) -> list[dict]:
+        """Gera os links do top-N de um grupo com o ``group_hash`` dele."""
+        with LogContext(group_id=group.group_id):
+            self._log_filter_stats(selection.filter_stats)
+            products = selection.top.items()
+            logger.debug(
+                "Top-%d do grupo: %s", len(products), lazy(lambda: _ranking_summary(products))
+            )
+            link_gen = LinkGenerator(self.shopee, self.db, group.group_hash)
+            with profiler.stage("link_gen"):
+                await link_gen.generate_batch(products, campaign_type="curadoria")
+        return products
+
+    async def curate_groups(
+        self,
+        keywords: list[str],
+        groups: list[GroupConfig],
+        categories: list[int] | None = None,
+        profiler: RunProfiler | None = None,
+    ) -> dict:
+        """Curadoria de vários grupos com uma única busca na API.
+
+        Busca, normalização, score e upsert acontecem uma vez por página; cada
+        grupo aplica apenas os próprios thresholds, histórico de envios e
+        top-N, e gera os links com o próprio ``group_hash``. Com parada
+        antecipada ligada, uma keyword só é interrompida quando nenhum grupo
+        tem candidatos nas últimas páginas.
+
+        Args:
+            keywords: Keywords de busca
+            groups: Grupos de destino
+            categories: Categorias (opcional)
+            profiler: Acumula tempo e contadores por etapa
+
+        Returns:
+            ``fetched`` (produtos únicos buscados), ``groups`` (group_id ->
+            resultado no formato de ``curate``), ``fetch_stats`` e ``stages``
+
+        Raises:
+            ValueError: Se ``groups`` estiver vazio
+        """
+        if not groups:
+            raise ValueError("curate_groups requer ao menos um grupo")
+
+        logger.info("Iniciando curadoria de %d grupo(s): keywords=%s", len(groups), keywords)
+        profiler = profiler or RunProfiler(self.shopee, self.db)
+
+        with CURATION_SECONDS.time(mode="multi_group"):
+            selections, fetch_stats = await self._select_groups(
+                keywords, groups, categories, profiler
+            )
+            results = {}
+            for group, selection in zip(groups, selections, strict=True):
+                products = await self._group_links(group, selection, profiler)
+                results[group.group_id] = selection.result(products)
+
+        fetched = selections[0].filter_stats["total"]
+        CURATION_PRODUCTS.inc(fetched, stage="fetched")
+        for stage in ("approved", "final"):
+            CURATION_PRODUCTS.inc(sum(r[stage] for r in results.values()), stage=stage)
+
         logger.info(
-            f"Curadoria concluída: {result['fetched']} buscados, "
-            f"{result['approved']} aprovados, {result['final']} finais"
+            "Curadoria de %d grupo(s) concluída: %d buscados, %d enviáveis no total",
+            len(groups),
+            fetched,
+            sum(r["final"] for r in results.values()),
         )
+        return {
+            "fetched": fetched,
+            "groups": results,
+            "fetch_stats": fetch_stats,
+            "stages": profiler.rows(),
+        }
 
-        return result
+    async def prewarm(
+        self,
+        keywords: list[str],
+        groups: list[GroupConfig],
+        categories: list[int] | None = None,
+    ) -> dict:
+        """Aquece os caches antes de uma curadoria agendada.
+
+        Faz a mesma busca de ``curate_groups`` ignorando o cache de buscas
+        (``refresh``), grava os produtos e gera os short links do top-N atual
+        de cada grupo. Nada é enviado nem marcado como enviado: a curadoria
+        seguinte, dentro do TTL do cache, reaproveita as respostas da API e
+        encontra os links já gerados, restando revalidar e enviar.
+
+        Args:
+            keywords: Keywords de busca
+            groups: Grupos de destino
+            categories: Categorias (opcional)
+
+        Returns:
+            ``fetched`` (produtos únicos buscados), ``links`` (produtos com
+            link pronto), ``fetch_stats`` e ``stages``
+
+        Raises:
+            ValueError: Se ``groups`` estiver vazio
+        """
+        if not groups:
+            raise ValueError("prewarm requer ao menos um grupo")
+
+        logger.info("Pré-aquecendo curadoria de %d grupo(s): keywords=%s", len(groups), keywords)
+        profiler = RunProfiler(self.shopee, self.db)
+
+        with CURATION_SECONDS.time(mode="prewarm"):
+            selections, fetch_stats = await self._select_groups(
+                keywords, groups, categories, profiler, refresh=True
+            )
+            links = 0
+            for group, selection in zip(groups, selections, strict=True):
+                products = await self._group_links(group, selection, profiler)
+                links += sum(1 for p in products if p.get("shortLink"))
+
+        fetched = selections[0].filter_stats["total"]
+        logger.info("Pré-aquecimento concluído: %d buscados, %d link(s) prontos", fetched, links)
+        return {
+            "fetched": fetched,
+            "links": links,
+            "fetch_stats": fetch_stats,
+            "stages": profiler.rows(),
+        }
@@ -1,5 +1,6 @@
 """Deduplicação de produtos já enviados."""
 
+from src.core.sent_index import RecentSendsIndex
 from src.database import Database
 from src.utils.logger import get_logger
 
@@ -9,15 +10,41 @@ logger = get_logger("mariabicobot", "deduplicator")
 class Deduplicator:
     """Gerencia deduplicação de produtos."""
 
-    def __init__(self, db: Database, dedup_days: int = 7):
+    def __init__(
+        self,
+        db: Database,
+        dedup_days: int = 7,
+        use_index: bool = True,
+        bloom_threshold: int | None = None,
+    ):
         """Inicializa o deduplicador.
 
         Args:
             db: Instância do banco de dados
             dedup_days: Dias para considerar duplicata (default 7)
+            use_index: Mantém os envios recentes em memória (RecentSendsIndex),
+                aquecido a partir de sent_messages no primeiro uso
+            bloom_threshold: Envios por grupo a partir dos quais o índice usa
+                Bloom filter e confirma positivos no banco (None desliga)
         """
         self.db = db
         self.dedup_days = dedup_days
+        self.index = RecentSendsIndex(dedup_days * 86400, bloom_threshold) if use_index else None
+        self._warmed = False
+
+    def warm(self) -> int:
+        """Carrega os envios recentes do banco para o índice em memória.
+
+        Returns:
+            Quantidade de envios carregados
+        """
+        if self.index is None:
+            return 0
+        rows = self.db.get_recent_sends(self.dedup_days)
+        self.index.load(rows)
+        self._warmed = True
+        logger.info("Índice de envios recentes aquecido com %d envios", len(rows))
+        return len(rows)
 
     def is_duplicate(self, item_id: int, group_id: str) -> bool:
         """Verifica se produto já foi enviado recentemente.
@@ -29,9 +56,17 @@ class Deduplicator:
         Returns:
             True se foi enviado nos últimos dedup_days
         """
-        was_sent = self.db.was_sent_recently(item_id, group_id, self.dedup_days)
+        if self.index is None:
+            was_sent = self.db.was_sent_recently(item_id, group_id, self.dedup_days)
+        else:
+            if not self._warmed:
+                self.warm()
+            was_sent = self.index.contains(group_id, item_id)
+            if was_sent is None:
+                # Bloom filter: positivo precisa de confirmação
+                was_sent = self.db.was_sent_recently(item_id, group_id, self.dedup_days)
         if was_sent:
-            logger.debug(f"Produto {item_id} já enviado nos últimos {self.dedup_days} dias")
+            logger.debug("Produto %s já enviado nos últimos %d dias", item_id, self.dedup_days)
         return was_sent
 
     def filter_duplicates(self, products: list[dict], group_id: str) -> list[dict]:
@@ -59,7 +94,9 @@ class Deduplicator:
             filtered.append(product)
 
         logger.info(
-            f"Deduplicação: {duplicates} duplicatas removidas, {len(filtered)} únicos restantes"
+            "Deduplicação: %d duplicatas removidas, %d únicos restantes",
+            duplicates,
+            len(filtered),
         )
         return filtered
 
@@ -73,3 +110,37 @@ class Deduplicator:
             batch_id: ID do batch de envio
         """
         self.db.mark_as_sent(item_id, group_id, short_link, batch_id)
+        if self.index is not None:
+            self.db.call_after_commit(lambda: self.index.add(group_id, item_id))
+
+    def mark_sent_batch(self, products: list[dict], group_id: str, batch_id: str) -> int:
+        """Marca um lote de produtos como enviados com um único commit.
+
+        Produtos sem itemId ou shortLink são ignorados. O índice em memória só é
+        atualizado após o commit, então um rollback da transação externa
+        (``Database.transaction``) não deixa entradas órfãs.
+
+        Args:
+            products: Produtos enviados (com itemId e shortLink)
+            group_id: ID do grupo Telegram
+            batch_id: ID do batch de envio
+
+        Returns:
+            Quantidade de produtos marcados
+        """
+        items = [
+            (product["itemId"], product["shortLink"])
+            for product in products
+            if product.get("itemId") and product.get("shortLink")
+        ]
+        self.db.mark_as_sent_batch(items, group_id, batch_id)
+
+        if self.index is not None and items:
+
+            def update_index() -> None:
+                for item_id, _ in items:
+                    self.index.add(group_id, item_id)
+
+            self.db.call_after_commit(update_index)
+
+        return len(items)
@@ -1,5 +1,6 @@
 """Geração de short links rastreáveis."""
 
+import hashlib
 from datetime import datetime
 
 from src.database import Database
@@ -18,6 +19,11 @@ def _sanitize(text: str) -> str:
     return re.sub(r"[^a-zA-Z0-9]", "", text)
 
 
+def group_hash_for(group_id: str | int) -> str:
+    """Hash curto e estável de um group_id, usado nos subIds."""
+    return hashlib.blake2b(str(group_id).encode(), digest_size=3).hexdigest()
+
+
 def build_sub_ids(
     campaign_type: str,
     group_hash: str,
@@ -92,20 +98,20 @@ class LinkGenerator:
             ShopeeAPIError: Em caso de erro na API Shopee
         """
         # Verifica cache primeiro
-        cached = self.db.get_cached_link(origin_url)
+        cached = self.db.get_cached_link(origin_url, self.group_hash)
         if cached:
-            logger.debug(f"Link em cache encontrado para {origin_url[:50]}...")
+            logger.debug("Link em cache encontrado para %.50s...", origin_url)
             return cached.short_link
 
         # Gera subIds
         sub_ids = build_sub_ids(campaign_type, self.group_hash, tag=tag)
 
         # Chama API
-        logger.info(f"Gerando short link para {origin_url[:50]}... com sub_ids={sub_ids}")
+        logger.info("Gerando short link para %.50s... com sub_ids=%s", origin_url, sub_ids)
         short_link = await self.shopee.generate_short_link(origin_url, sub_ids)
 
         # Salva no cache
-        self.db.get_or_create_link(origin_url, short_link, sub_ids)
+        self.db.get_or_create_link(origin_url, short_link, sub_ids, self.group_hash)
 
         return short_link
 
@@ -126,7 +132,7 @@ class LinkGenerator:
         for product in products:
             origin_url = product.get("originUrl")
             if not origin_url:
-                logger.warning(f"Produto {product.get('itemId')} sem originUrl")
+                logger.warning("Produto %s sem originUrl", product.get("itemId"))
                 continue
 
             # Usa keyword como tag
@@ -136,7 +142,7 @@ class LinkGenerator:
                 short_link = await self.generate(origin_url, campaign_type, tag)
                 product["shortLink"] = short_link
             except Exception as e:
-                logger.error(f"Erro ao gerar link para produto {product.get('itemId')}: {e}")
+                logger.error("Erro ao gerar link para produto %s: %s", product.get("itemId"), e)
                 product["shortLink"] = origin_url  # Fallback
 
         return products
@@ -0,0 +1,107 @@
+"""Tempo e contadores por etapa de uma execução de curadoria."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+# Ordem de exibição das etapas
+STAGES = ("fetch", "normalize", "filter", "rank", "dedup", "link_gen", "upsert", "send")
+
+
+@dataclass
+class StageStats:
+    """Totais acumulados de uma etapa."""
+
+    stage: str
+    wall_ms: float = 0.0
+    api_calls: int = 0
+    api_retries: int = 0
+    db_queries: int = 0
+
+
+class RunProfiler:
+    """Mede tempo, chamadas à API e operações no banco por etapa.
+
+    As etapas podem ser reabertas (ex: ``fetch`` a cada página) e os valores
+    são somados. Uma etapa aberta dentro de outra pausa a externa, então os
+    tempos são exclusivos e a soma das etapas equivale ao tempo medido.
+    """
+
+    def __init__(self, shopee: Any = None, db: Any = None):
+        """Inicializa o profiler.
+
+        Args:
+            shopee: Cliente com ``request_count``/``retry_count`` (opcional)
+            db: Banco com ``query_count`` (opcional)
+        """
+        self.shopee = shopee
+        self.db = db
+        self._stats: dict[str, StageStats] = {}
+        # Quantas vezes cada etapa foi aberta (ex: páginas buscadas em ``fetch``)
+        self._entries: dict[str, int] = {}
+        # Pilha de [etapa, início, contadores no início]
+        self._stack: list[list] = []
+
+    def _counters(self) -> tuple[int, int, int]:
+        return (
+            getattr(self.shopee, "request_count", 0),
+            getattr(self.shopee, "retry_count", 0),
+            getattr(self.db, "query_count", 0),
+        )
+
+    def _charge(self, frame: list, now: float, counters: tuple[int, int, int]) -> None:
+        """Soma à etapa do frame o que foi gasto desde o último checkpoint."""
+        name, started, base = frame
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = StageStats(name)
+        stats.wall_ms += (now - started) * 1000
+        stats.api_calls += counters[0] - base[0]
+        stats.api_retries += counters[1] - base[1]
+        stats.db_queries += counters[2] - base[2]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Mede o bloco como parte da etapa ``name``."""
+        now = time.perf_counter()
+        counters = self._counters()
+        if self._stack:
+            parent = self._stack[-1]
+            self._charge(parent, now, counters)
+
+        self._entries[name] = self._entries.get(name, 0) + 1
+        frame = [name, now, counters]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            counters = self._counters()
+            self._charge(self._stack.pop(), now, counters)
+            if self._stack:
+                # Retoma a etapa externa a partir deste ponto
+                self._stack[-1][1] = now
+                self._stack[-1][2] = counters
+
+    @property
+    def current_stage(self) -> str | None:
+        """Etapa em andamento (a mais interna), para relatórios de progresso."""
+        return self._stack[-1][0] if self._stack else None
+
+    def entries(self, name: str) -> int:
+        """Quantas vezes a etapa foi aberta até agora."""
+        return self._entries.get(name, 0)
+
+    def stages(self) -> list[StageStats]:
+        """Retorna as etapas medidas, na ordem de ``STAGES``."""
+        order = {name: i for i, name in enumerate(STAGES)}
+        return sorted(self._stats.values(), key=lambda s: order.get(s.stage, len(order)))
+
+    def rows(self) -> list[tuple[str, float, int, int, int]]:
+        """Retorna as etapas como (stage, wall_ms, api_calls, api_retries, db_queries)."""
+        return [
+            (s.stage, round(s.wall_ms, 2), s.api_calls, s.api_retries, s.db_queries)
+            for s in self.stages()
+        ]
@@ -0,0 +1,238 @@
+"""Perfis de curadoria persistidos na tabela settings."""
+
+import json
+import threading
+import types
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Any, Union, get_args, get_origin
+
+from src.core.scoring import FilterThresholds, ScoreWeights
+from src.database import Database
+from src.utils.logger import get_logger
+
+logger = get_logger("mariabicobot", "curator")
+
+DEFAULT_PROFILE = "default"
+
+# Chave do perfil na tabela settings
+SETTING_PREFIX = "curation_profile:"
+
+DEFAULT_KEYWORDS = ("fone bluetooth", "smartwatch", "carregador rápido", "cabo usb", "fone ouvido")
+
+
+@dataclass
+class CurationProfile:
+    """Parâmetros de uma curadoria que podem mudar sem reiniciar o bot.
+
+    ``max_pages`` x ``page_limit`` x keywords define quantas chamadas à API
+    cada execução pode fazer.
+    """
+
+    keywords: list[str] = field(default_factory=lambda: list(DEFAULT_KEYWORDS))
+    categories: list[int] | None = None
+    top_n: int = 10
+    max_pages: int = 5
+    page_limit: int = 50
+    weights: ScoreWeights = field(default_factory=ScoreWeights)
+    thresholds: FilterThresholds = field(default_factory=FilterThresholds)
+
+    def to_dict(self) -> dict:
+        """Serializa para JSON."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "CurationProfile":
+        """Carrega um perfil salvo; campos ausentes ou desconhecidos usam o default.
+
+        Os valores vêm do banco (que pode ter sido editado à mão), então os
+        tipos são conferidos campo a campo.
+
+        Raises:
+            ValueError: Se ``data`` não for um objeto ou algum campo tiver tipo inválido
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"perfil deve ser um objeto, não {type(data).__name__}")
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+
+        if "keywords" in values:
+            keywords = values["keywords"]
+            if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+                raise ValueError("keywords deve ser uma lista de textos")
+        if values.get("categories") is not None:
+            categories = values["categories"]
+            if not isinstance(categories, list) or not all(_is_int(c) for c in categories):
+                raise ValueError("categories deve ser uma lista de inteiros")
+        for key, minimum in _LIMITS.items():
+            if key in values and not (_is_int(values[key]) and values[key] >= minimum):
+                raise ValueError(f"{key} deve ser um inteiro >= {minimum}")
+
+        for key, nested in (("weights", ScoreWeights), ("thresholds", FilterThresholds)):
+            if key not in values:
+                continue
+            if not isinstance(values[key], dict):
+                raise ValueError(f"{key} deve ser um objeto")
+            types_by_name = {f.name: f.type for f in fields(nested)}
+            nested_values = {k: v for k, v in values[key].items() if k in types_by_name}
+            for name, value in nested_values.items():
+                _check_number(f"{key}.{name}", value, types_by_name[name])
+            values[key] = nested(**nested_values)
+        return cls(**values)
+
+
+def _is_int(value: Any) -> bool:
+    """Indica se o valor é um inteiro (bool não conta)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_number(path: str, value: Any, annotation: Any) -> None:
+    """Confere um valor numérico carregado do banco contra o tipo do campo.
+
+    Raises:
+        ValueError: Se o valor não for compatível com ``annotation``
+    """
+    if get_origin(annotation) in (Union, types.UnionType):
+        if value is None:
+            return
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    valid = _is_int(value) or (annotation is float and isinstance(value, float))
+    if not valid:
+        raise ValueError(f"{path} deve ser {annotation.__name__}")
+
+
+# Campos simples editáveis e seus mínimos
+_LIMITS = {"top_n": 1, "max_pages": 1, "page_limit": 1}
+
+
+def _coerce(raw: str, annotation: Any) -> Any:
+    """Converte o texto digitado para o tipo do campo (int, float ou ``X | None``)."""
+    text = raw.strip()
+    if get_origin(annotation) in (Union, types.UnionType):
+        if text.lower() in ("", "none", "-"):
+            return None
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if annotation is int:
+        return int(text)
+    if annotation is float:
+        return float(text.replace(",", "."))
+    raise ValueError(f"tipo não suportado: {annotation}")
+
+
+def parse_field(profile: CurationProfile, path: str, raw: str) -> CurationProfile:
+    """Retorna uma cópia do perfil com um campo alterado a partir de texto.
+
+    Exemplos: ``top_n 15``, ``keywords fone, smartwatch``,
+    ``weights.commission 1.5``, ``thresholds.price_max_brl none``.
+
+    Args:
+        profile: Perfil atual
+        path: Campo (``weights.x``/``thresholds.x`` para os aninhados)
+        raw: Valor digitado
+
+    Returns:
+        Novo perfil
+
+    Raises:
+        ValueError: Campo desconhecido ou valor inválido
+    """
+    path = path.strip().lower()
+    if path == "keywords":
+        keywords = [k.strip() for k in raw.split(",") if k.strip()]
+        if not keywords:
+            raise ValueError("informe ao menos uma keyword")
+        return replace(profile, keywords=keywords)
+    if path == "categories":
+        categories = [int(c) for c in raw.replace(" ", "").split(",") if c and c != "-"]
+        return replace(profile, categories=categories or None)
+    if path in _LIMITS:
+        value = int(raw.strip())
+        if value < _LIMITS[path]:
+            raise ValueError(f"{path} deve ser >= {_LIMITS[path]}")
+        return replace(profile, **{path: value})
+
+    group, _, name = path.partition(".")
+    if group in ("weights", "thresholds") and name:
+        current = getattr(profile, group)
+        types_by_name = {f.name: f.type for f in fields(current)}
+        if name not in types_by_name:
+            raise ValueError(f"campo desconhecido: {path}")
+        value = _coerce(raw, types_by_name[name])
+        return replace(profile, **{group: replace(current, **{name: value})})
+
+    raise ValueError(f"campo desconhecido: {path}")
+
+
+ProfileListener = Callable[[str, CurationProfile], None]
+
+
+class ProfileStore:
+    """Perfis de curadoria na tabela settings, com cache e notificação de mudanças.
+
+    ``get`` lê do banco apenas na primeira vez (ou após ``reload``, usado por
+    ``/perfil recarregar``). ``save`` grava, atualiza o cache e chama os
+    listeners registrados em ``subscribe``, que aplicam o perfil (ex:
+    ``Curator.apply_profile``) sem reiniciar o bot.
+    """
+
+    def __init__(self, db: Database):
+        """Inicializa o store.
+
+        Args:
+            db: Instância do banco de dados
+        """
+        self.db = db
+        self._cache: dict[str, CurationProfile] = {}
+        self._listeners: list[ProfileListener] = []
+        self._lock = threading.Lock()
+
+    def get(self, name: str = DEFAULT_PROFILE) -> CurationProfile:
+        """Retorna o perfil (o default do código se nunca foi salvo)."""
+        profile = self._cache.get(name)
+        if profile is not None:
+            return profile
+
+        raw = self.db.get_setting(SETTING_PREFIX + name)
+        profile = CurationProfile()
+        if raw is not None:
+            try:
+                profile = CurationProfile.from_dict(json.loads(raw))
+            except Exception as e:
+                logger.error("Perfil '%s' inválido no banco, usando o padrão: %s", name, e)
+        with self._lock:
+            return self._cache.setdefault(name, profile)
+
+    def save(self, profile: CurationProfile, name: str = DEFAULT_PROFILE) -> None:
+        """Grava o perfil e notifica os listeners."""
+        self.db.set_setting(SETTING_PREFIX + name, profile.to_dict())
+        with self._lock:
+            self._cache[name] = profile
+            listeners = list(self._listeners)
+        logger.info("Perfil de curadoria '%s' atualizado", name)
+        for listener in listeners:
+            listener(name, profile)
+
+    def set_field(self, path: str, raw: str, name: str = DEFAULT_PROFILE) -> CurationProfile:
+        """Altera um campo a partir de texto (ver ``parse_field``) e grava.
+
+        Raises:
+            ValueError: Campo desconhecido ou valor inválido
+        """
+        profile = parse_field(self.get(name), path, raw)
+        self.save(profile, name)
+        return profile
+
+    def subscribe(self, listener: ProfileListener) -> None:
+        """Registra ``listener(nome, perfil)`` chamado a cada ``save``."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def reload(self, name: str = DEFAULT_PROFILE) -> CurationProfile:
+        """Descarta o cache, relê do banco e notifica os listeners."""
+        with self._lock:
+            self._cache.pop(name, None)
+            listeners = list(self._listeners)
+        profile = self.get(name)
+        for listener in listeners:
+            listener(name, profile)
+        return profile
@@ -1,11 +1,17 @@
 """Algoritmo de score para rankeamento de produtos."""
 
-from dataclasses import dataclass
+import functools
+from collections.abc import Callable
+from dataclasses import astuple, dataclass
+from enum import StrEnum
 
-from src.utils.logger import get_logger
+from src.utils.logger import LogSampler, get_logger
 
 logger = get_logger("mariabicobot", "scoring")
 
+# Reprovações são logadas por amostragem: 1 a cada N, com a contagem acumulada
+REJECT_LOG_EVERY = 100
+
 
 @dataclass
 class ScoreWeights:
@@ -14,6 +20,8 @@ class ScoreWeights:
     commission: float = 1.0
     discount: float = 0.5
     price: float = 0.02
+    # Queda real (%) frente ao menor preço recente (``referencePrice``); 0 desliga
+    real_discount: float = 0.0
 
 
 @dataclass
@@ -41,22 +49,228 @@ def _get_commission(product: dict) -> float:
     return price * rate
 
 
+class RejectReason(StrEnum):
+    """Motivo de reprovação de um produto nos filtros.
+
+    O valor é usado como sufixo das chaves de estatística (``failed_<valor>``).
+    """
+
+    COMMISSION = "commission"
+    DISCOUNT = "discount"
+    PRICE = "price"
+    SALES = "sales"
+    RATING = "rating"
+
+
+# Predicado compilado: None se aprovado, senão o motivo da reprovação
+FilterCheck = Callable[[dict], RejectReason | None]
+# Função de score compilada
+Scorer = Callable[[dict], float]
+
+
+def _min_rule(field: str, minimum: float, reason: RejectReason) -> FilterCheck:
+    """Regra "campo >= mínimo"."""
+    log_reject = LogSampler(logger, REJECT_LOG_EVERY)
+
+    def rule(product: dict) -> RejectReason | None:
+        value = product.get(field, 0) or 0
+        if value < minimum:
+            log_reject("Produto reprovado: %s %s < %s", field, value, minimum)
+            return reason
+        return None
+
+    return rule
+
+
+def _commission_brl_rule(minimum: float) -> FilterCheck:
+    """Regra de comissão mínima em BRL."""
+    log_reject = LogSampler(logger, REJECT_LOG_EVERY)
+
+    def rule(product: dict) -> RejectReason | None:
+        commission_brl = _get_commission(product)
+        if commission_brl < minimum:
+            log_reject("Produto reprovado: commission R$%.2f < R$%.2f", commission_brl, minimum)
+            return RejectReason.COMMISSION
+        return None
+
+    return rule
+
+
+def _price_max_rule(maximum: float) -> FilterCheck:
+    """Regra de preço máximo."""
+    log_reject = LogSampler(logger, REJECT_LOG_EVERY)
+
+    def rule(product: dict) -> RejectReason | None:
+        price = product.get("priceMin", 0) or 0
+        if price > maximum:
+            log_reject("Produto reprovado: price R$%s > R$%s", price, maximum)
+            return RejectReason.PRICE
+        return None
+
+    return rule
+
+
+def compile_filter(thresholds: FilterThresholds) -> FilterCheck:
+    """Compila os thresholds em um predicado com apenas as regras ativas.
+
+    Thresholds zerados (ou ``price_max_brl=None``) não geram regra, então
+    filtros desligados não custam nada por produto.
+
+    Args:
+        thresholds: Thresholds de filtragem
+
+    Returns:
+        Função que recebe um produto e retorna None ou o RejectReason
+    """
+    rules: list[FilterCheck] = []
+
+    if thresholds.commission_rate_min > 0:
+        rules.append(
+            _min_rule("commissionRate", thresholds.commission_rate_min, RejectReason.COMMISSION)
+        )
+    if thresholds.commission_min_brl > 0:
+        rules.append(_commission_brl_rule(thresholds.commission_min_brl))
+    if thresholds.discount_min_pct > 0:
+        rules.append(
+            _min_rule("priceDiscountRate", thresholds.discount_min_pct, RejectReason.DISCOUNT)
+        )
+    if thresholds.price_max_brl is not None:
+        rules.append(_price_max_rule(thresholds.price_max_brl))
+    if thresholds.sales_min > 0:
+        rules.append(_min_rule("sales", thresholds.sales_min, RejectReason.SALES))
+    if thresholds.rating_min > 0:
+        rules.append(_min_rule("rating", thresholds.rating_min, RejectReason.RATING))
+
+    rules_tuple = tuple(rules)
+
+    def check(product: dict) -> RejectReason | None:
+        for rule in rules_tuple:
+            reason = rule(product)
+            if reason is not None:
+                return reason
+        return None
+
+    return check
+
+
+def real_discount_pct(product: dict) -> float:
+    """Queda percentual do preço atual frente ao ``referencePrice`` (0 se não caiu)."""
+    reference = product.get("referencePrice")
+    price = product.get("priceMin")
+    if not reference or price is None or price >= reference:
+        return 0.0
+    return (reference - price) / reference * 100
+
+
+def compile_scorer(weights: ScoreWeights) -> Scorer:
+    """Compila os pesos em uma função de score.
+
+    Args:
+        weights: Pesos do score
+
+    Returns:
+        Função que recebe um produto e retorna o score arredondado
+    """
+    w_commission = weights.commission
+    w_discount = weights.discount
+    w_price = weights.price
+    w_real_discount = weights.real_discount
+
+    def score(product: dict) -> float:
+        commission = _get_commission(product)
+        discount = product.get("priceDiscountRate", 0) or 0
+        price = product.get("priceMin", 0) or 0
+        return round((commission * w_commission) + (discount * w_discount) - (price * w_price), 2)
+
+    if not w_real_discount:
+        return score
+
+    def score_with_history(product: dict) -> float:
+        return round(score(product) + real_discount_pct(product) * w_real_discount, 2)
+
+    return score_with_history
+
+
+@dataclass(frozen=True)
+class CompiledPipeline:
+    """Filtro e score compilados para uma execução de curadoria."""
+
+    thresholds: FilterThresholds
+    weights: ScoreWeights
+    check: FilterCheck
+    score: Scorer
+
+    def rank(self, products: list[dict]) -> list[dict]:
+        """Calcula o score de cada produto e ordena por score decrescente."""
+        score = self.score
+        for product in products:
+            product["score"] = score(product)
+        return sorted(products, key=lambda p: p["score"], reverse=True)
+
+
+def compile_pipeline(
+    thresholds: FilterThresholds | None = None,
+    weights: ScoreWeights | None = None,
+) -> CompiledPipeline:
+    """Compila um par (thresholds, weights) para reuso durante a execução.
+
+    Args:
+        thresholds: Thresholds de filtragem (default FilterThresholds())
+        weights: Pesos do score (default ScoreWeights())
+
+    Returns:
+        CompiledPipeline pronto para uso
+    """
+    thresholds = thresholds or FilterThresholds()
+    weights = weights or ScoreWeights()
+    return CompiledPipeline(
+        thresholds=thresholds,
+        weights=weights,
+        check=compile_filter(thresholds),
+        score=compile_scorer(weights),
+    )
+
+
+# Pipeline padrão, compilado uma única vez no import
+_DEFAULT_PIPELINE = compile_pipeline()
+
+
+# Os wrappers de compatibilidade reutilizam o que já foi compilado para os
+# mesmos valores, mantendo também os LogSampler de cada regra entre chamadas
+@functools.lru_cache(maxsize=32)
+def _cached_filter(values: tuple) -> FilterCheck:
+    return compile_filter(FilterThresholds(*values))
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_scorer(values: tuple) -> Scorer:
+    return compile_scorer(ScoreWeights(*values))
+
+
 def calculate_score(
     product: dict,
     weights: ScoreWeights | None = None,
 ) -> float:
     """Calcula o score de um produto."""
-    weights = weights or ScoreWeights()
+    if weights is None:
+        return _DEFAULT_PIPELINE.score(product)
+    return _cached_scorer(astuple(weights))(product)
 
-    commission = _get_commission(product)
-    discount = product.get("priceDiscountRate", 0) or 0
-    price = product.get("priceMin", 0) or 0
 
-    score = (
-        (commission * weights.commission) + (discount * weights.discount) - (price * weights.price)
-    )
+def check_filters(
+    product: dict,
+    thresholds: FilterThresholds | None = None,
+) -> RejectReason | None:
+    """Avalia os filtros em uma única passada.
 
-    return round(score, 2)
+    Para avaliar muitos produtos, prefira ``compile_filter`` e reutilize o predicado.
+
+    Returns:
+        None se o produto foi aprovado, ou o primeiro motivo de reprovação
+    """
+    if thresholds is None:
+        return _DEFAULT_PIPELINE.check(product)
+    return _cached_filter(astuple(thresholds))(product)
 
 
 def passes_filters(
@@ -64,38 +278,7 @@ def passes_filters(
     thresholds: FilterThresholds | None = None,
 ) -> bool:
     """Verifica se produto passa nos filtros mínimos."""
-    thresholds = thresholds or FilterThresholds()
-
-    # Comissão
-    commission_rate = product.get("commissionRate", 0.0)
-    commission_brl = _get_commission(product)
-
-    if commission_rate < thresholds.commission_rate_min:
-        logger.debug(
-            f"Produto reprovado: commissionRate {commission_rate:.3f} < {thresholds.commission_rate_min}"
-        )
-        return False
-
-    if commission_brl < thresholds.commission_min_brl:
-        logger.debug(
-            f"Produto reprovado: commission R${commission_brl:.2f} < R${thresholds.commission_min_brl:.2f}"
-        )
-        return False
-
-    # Desconto
-    discount = product.get("priceDiscountRate", 0) or 0
-    if discount < thresholds.discount_min_pct:
-        logger.debug(f"Produto reprovado: discount {discount}% < {thresholds.discount_min_pct}%")
-        return False
-
-    # Preço máximo (se configurado)
-    price = product.get("priceMin", 0) or 0
-    if thresholds.price_max_brl is not None:
-        if price > thresholds.price_max_brl:
-            logger.debug(f"Produto reprovado: price R${price} > R${thresholds.price_max_brl}")
-            return False
-
-    return True
+    return check_filters(product, thresholds) is None
 
 
 def rank_products(
@@ -103,11 +286,6 @@ def rank_products(
     weights: ScoreWeights | None = None,
 ) -> list[dict]:
     """Rankeia produtos por score."""
-    weights = weights or ScoreWeights()
-
-    # Calcula score para cada produto
-    for product in products:
-        product["score"] = calculate_score(product, weights)
-
-    # Ordena por score decrescente
-    return sorted(products, key=lambda p: p["score"], reverse=True)
+    if weights is None:
+        return _DEFAULT_PIPELINE.rank(products)
+    return compile_pipeline(weights=weights).rank(products)
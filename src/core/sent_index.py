@@ -0,0 +1,123 @@
+"""Índice em memória dos envios recentes, usado pela deduplicação."""
+
+import hashlib
+import math
+import time
+
+
+class BloomFilter:
+    """Bloom filter simples (double hashing sobre BLAKE2b)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """Inicializa o filtro.
+
+        Args:
+            capacity: Quantidade esperada de elementos
+            error_rate: Taxa de falso positivo desejada
+        """
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        """Adiciona uma chave."""
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RecentSendsIndex:
+    """Envios recentes por grupo, com expiração.
+
+    Cada grupo guarda ``itemId -> expira_em`` (epoch). Grupos com histórico
+    maior que ``bloom_threshold`` passam a usar um Bloom filter: uma resposta
+    negativa é definitiva e uma positiva precisa ser confirmada no banco
+    (``contains`` retorna None).
+    """
+
+    def __init__(self, window_seconds: float, bloom_threshold: int | None = None):
+        """Inicializa o índice.
+
+        Args:
+            window_seconds: Janela de deduplicação em segundos
+            bloom_threshold: Tamanho a partir do qual um grupo usa Bloom filter
+                (None desliga)
+        """
+        self.window_seconds = window_seconds
+        self.bloom_threshold = bloom_threshold
+        self._groups: dict[str, dict[str, float]] = {}
+        self._blooms: dict[str, BloomFilter] = {}
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._groups.values())
+
+    def load(self, rows: list[tuple[str, int, int]]) -> None:
+        """Recarrega o índice a partir de (group_id, item_id, sent_ts).
+
+        Args:
+            rows: Envios recentes (ver ``Database.get_recent_sends``)
+        """
+        groups: dict[str, dict[str, float]] = {}
+        for group_id, item_id, sent_ts in rows:
+            groups.setdefault(str(group_id), {})[str(item_id)] = sent_ts + self.window_seconds
+
+        self._groups = {}
+        self._blooms = {}
+        for group_id, items in groups.items():
+            if self.bloom_threshold is not None and len(items) > self.bloom_threshold:
+                bloom = BloomFilter(len(items) * 2)
+                for item_id in items:
+                    bloom.add(item_id)
+                self._blooms[group_id] = bloom
+            else:
+                self._groups[group_id] = items
+
+    def add(self, group_id: str, item_id: str, sent_ts: float | None = None) -> None:
+        """Registra um envio.
+
+        Args:
+            group_id: ID do grupo
+            item_id: ID do produto
+            sent_ts: Momento do envio em epoch (default agora)
+        """
+        group_id = str(group_id)
+        item_id = str(item_id)
+        bloom = self._blooms.get(group_id)
+        if bloom is not None:
+            bloom.add(item_id)
+            return
+        sent_ts = time.time() if sent_ts is None else sent_ts
+        self._groups.setdefault(group_id, {})[item_id] = sent_ts + self.window_seconds
+
+    def contains(self, group_id: str, item_id: str, now: float | None = None) -> bool | None:
+        """Verifica se o produto foi enviado ao grupo dentro da janela.
+
+        Returns:
+            True/False, ou None quando o Bloom filter indica "talvez"
+        """
+        group_id = str(group_id)
+        item_id = str(item_id)
+        bloom = self._blooms.get(group_id)
+        if bloom is not None:
+            return None if item_id in bloom else False
+
+        items = self._groups.get(group_id)
+        if not items:
+            return False
+        expires_at = items.get(item_id)
+        if expires_at is None:
+            return False
+        if expires_at <= (time.time() if now is None else now):
+            del items[item_id]
+            return False
+        return True
@@ -0,0 +1,95 @@
+"""Ranking incremental limitado aos K melhores produtos."""
+
+import heapq
+import itertools
+
+
+class TopK:
+    """Mantém os K produtos de maior score à medida que chegam.
+
+    Usa um min-heap de tamanho K, então a memória fica limitada a K produtos
+    independente de quantas páginas forem processadas. Produtos com o mesmo
+    itemId são mesclados (mantém a cópia de maior score e acumula keywords).
+    Em caso de empate de score, o produto que chegou primeiro tem prioridade,
+    igual à ordenação estável do modo batch.
+    """
+
+    def __init__(self, k: int):
+        """Inicializa o ranking.
+
+        Args:
+            k: Quantidade máxima de produtos mantidos
+        """
+        self.k = k
+        # Entradas (score, -seq, itemId): o topo do heap é o pior produto
+        self._heap: list[tuple[float, int, str]] = []
+        self._items: dict[str, dict] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def threshold(self) -> float | None:
+        """Score mínimo para entrar no ranking (None enquanto não está cheio)."""
+        if len(self._heap) < self.k:
+            return None
+        return self._heap[0][0]
+
+    def accepts(self, score: float) -> bool:
+        """Indica se um produto novo com este score entraria no ranking."""
+        threshold = self.threshold()
+        return threshold is None or score > threshold
+
+    def offer(self, product: dict) -> bool:
+        """Oferece um produto (com ``score``) ao ranking.
+
+        Args:
+            product: Produto normalizado e pontuado
+
+        Returns:
+            True se o produto está no ranking após a operação
+        """
+        if self.k <= 0:
+            return False
+
+        item_id = product["itemId"]
+        score = product["score"]
+        product.setdefault("keywords", [product.get("keyword", "")])
+
+        current = self._items.get(item_id)
+        if current is not None:
+            keywords = current["keywords"]
+            for keyword in product["keywords"]:
+                if keyword not in keywords:
+                    keywords.append(keyword)
+            if score > current["score"]:
+                product["keywords"] = keywords
+                self._items[item_id] = product
+                # K é pequeno: reconstruir o heap é mais simples que remoção lazy
+                self._heap = [
+                    (score, neg_seq, iid) if iid == item_id else (s, neg_seq, iid)
+                    for s, neg_seq, iid in self._heap
+                ]
+                heapq.heapify(self._heap)
+            return True
+
+        if not self.accepts(score):
+            return False
+
+        entry = (score, -next(self._seq), item_id)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        else:
+            _, _, evicted = heapq.heapreplace(self._heap, entry)
+            del self._items[evicted]
+
+        self._items[item_id] = product
+        return True
+
+    def items(self) -> list[dict]:
+        """Retorna os produtos do ranking em ordem de score decrescente."""
+        ordered = sorted(self._heap, key=lambda entry: (-entry[0], -entry[1]))
+        return [self._items[item_id] for _, _, item_id in ordered]
@@ -1,6 +1,18 @@
 """Banco de dados SQLite do MariaBicoBot."""
 
-from .models import Database, Link, ProductSeen, Run, SentMessage
+from .models import Database, Link, PricePoint, ProductSeen, Run, RunStage, SentMessage
+from .retention import RetentionPolicy, run_retention
 from .schema import init_db
 
-__all__ = ["Database", "Link", "ProductSeen", "Run", "SentMessage", "init_db"]
+__all__ = [
+    "Database",
+    "Link",
+    "PricePoint",
+    "ProductSeen",
+    "RetentionPolicy",
+    "Run",
+    "RunStage",
+    "SentMessage",
+    "init_db",
+    "run_retention",
+]
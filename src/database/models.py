@@ -1,30 +1,114 @@
 """Models e funções de acesso ao banco de dados."""
 
+import functools
 import json
 import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
+from src.utils.metrics import REGISTRY
+
 from .schema import (
+    SQL_DELETE_LINKS_BEFORE,
+    SQL_DELETE_PRICE_HISTORY_BEFORE,
+    SQL_DELETE_SCHEDULER_JOB,
+    SQL_DELETE_SCHEDULER_JOBS,
+    SQL_DELETE_SEARCH_CACHE_BEFORE,
+    SQL_DELETE_SENT_BEFORE,
+    SQL_INCREMENTAL_VACUUM,
     SQL_INSERT_LINK,
+    SQL_INSERT_PRICE_HISTORY,
+    SQL_INSERT_RUN_STAGE,
     SQL_INSERT_RUN_START,
+    SQL_INSERT_SCHEDULER_JOB,
     SQL_INSERT_SENT_MESSAGE,
+    SQL_PRUNE_RAW_JSON,
     SQL_SELECT_DB_STATS,
+    SQL_SELECT_DUE_SCHEDULER_JOBS,
     SQL_SELECT_LAST_RUN,
     SQL_SELECT_LINK_BY_ORIGIN,
+    SQL_SELECT_NEXT_SCHEDULER_RUN,
+    SQL_SELECT_PRICE_HISTORY,
+    SQL_SELECT_PRODUCT_BY_ID,
+    SQL_SELECT_RAW_JSON_TEXT,
+    SQL_SELECT_RECENT_SENDS,
+    SQL_SELECT_REFERENCE_PRICES,
+    SQL_SELECT_RUN_STAGES,
     SQL_SELECT_RUNS_STATS,
+    SQL_SELECT_SCHEDULER_JOB,
+    SQL_SELECT_SCHEDULER_JOBS,
+    SQL_SELECT_SEARCH_CACHE,
     SQL_SELECT_SENT_RECENT,
     SQL_SELECT_SETTINGS_BY_KEY,
     SQL_UPDATE_LINK_LAST_USED,
+    SQL_UPDATE_RAW_JSON,
     SQL_UPDATE_RUN_END,
+    SQL_UPDATE_SCHEDULER_JOB,
     SQL_UPSERT_PRODUCT_SEEN,
+    SQL_UPSERT_SEARCH_CACHE,
     SQL_UPSERT_SETTING,
     SQL_VACUUM,
     get_connection,
 )
 
 
+def _days_modifier(days: int) -> str:
+    """Modificador de datetime() do SQLite para "N dias atrás"."""
+    return f"-{int(days)} days"
+
+
+# Marca que não há mais raw_json em texto (ver compress_existing_raw_json)
+RAW_JSON_COMPRESSED_SETTING = "raw_json_compressed"
+
+DB_OPERATIONS = REGISTRY.counter("db_operations_total", "Operações no banco por tipo", ("kind",))
+
+
+def _writes(method: Callable) -> Callable:
+    """Serializa o método na conexão de escrita (``Database._write_lock``)."""
+
+    @functools.wraps(method)
+    def wrapper(self: "Database", *args: Any, **kwargs: Any) -> Any:
+        with self._write_lock:
+            self._count_query()
+            DB_OPERATIONS.inc(kind="write")
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _reads(method: Callable) -> Callable:
+    """Conta o método como operação de leitura em ``Database.query_count``."""
+
+    @functools.wraps(method)
+    def wrapper(self: "Database", *args: Any, **kwargs: Any) -> Any:
+        self._count_query()
+        DB_OPERATIONS.inc(kind="read")
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _encode_raw_json(product: dict | list, compress: bool) -> str | bytes:
+    """Serializa o produto para a coluna raw_json (BLOB zlib se ``compress``)."""
+    text = json.dumps(product, separators=(",", ":"), ensure_ascii=False)
+    if compress:
+        return zlib.compress(text.encode("utf-8"))
+    return text
+
+
+def _decode_raw_json(value: str | bytes | None) -> str | None:
+    """Devolve raw_json sempre como texto JSON, descomprimindo se necessário."""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
 @dataclass
 class ProductSeen:
     """Produto já visto."""
@@ -40,6 +124,29 @@ class ProductSeen:
     raw_json: str | None = None
 
 
+@dataclass
+class PricePoint:
+    """Mudança de preço/comissão/desconto de um produto."""
+
+    item_id: int
+    ts: int
+    price: float | None = None
+    commission: float | None = None
+    discount: int | None = None
+
+
+@dataclass
+class RunStage:
+    """Tempo e contadores de uma etapa de uma execução."""
+
+    run_id: int
+    stage: str
+    wall_ms: float
+    api_calls: int = 0
+    api_retries: int = 0
+    db_queries: int = 0
+
+
 @dataclass
 class Link:
     """Short link gerado."""
@@ -50,6 +157,7 @@ class Link:
     sub_ids_json: str
     created_at: str
     last_used_at: str | None = None
+    group_hash: str = "default"
 
 
 @dataclass
@@ -80,31 +188,143 @@ class Run:
 
 
 class Database:
-    """Interface para acessar o banco de dados."""
+    """Interface para acessar o banco de dados.
 
-    def __init__(self, db_path: str):
+    Usa uma conexão de escrita (serializada por lock) e, em bancos em
+    arquivo, uma conexão de leitura por thread em modo WAL, para que leituras
+    não disputem a conexão de escrita.
+    """
+
+    def __init__(self, db_path: str, compress_raw_json: bool = True, read_pool: bool = True):
         """Inicializa a conexão com o banco.
 
         Args:
             db_path: Caminho para o arquivo SQLite
+            compress_raw_json: Grava raw_json como BLOB zlib (leitura é
+                transparente nos dois formatos)
+            read_pool: Usa conexões de leitura por thread (ignorado em
+                ``:memory:``, onde cada conexão seria um banco diferente)
         """
         self.db_path = db_path
+        self.compress_raw_json = compress_raw_json
+        self.read_pool = read_pool and db_path not in (":memory:", "")
         self._conn: sqlite3.Connection | None = None
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._tx_depth = 0
+        self._tx_owner: int | None = None
+        self._after_commit: list[Callable[[], None]] = []
+        # Operações de leitura/escrita executadas (ver RunProfiler); leituras
+        # rodam em várias threads, então o incremento é protegido
+        self.query_count = 0
+        self._count_lock = threading.Lock()
+
+    def _count_query(self) -> None:
+        """Incrementa ``query_count`` (chamado por ``_reads``/``_writes``)."""
+        with self._count_lock:
+            self.query_count += 1
 
     @property
     def conn(self) -> sqlite3.Connection:
-        """Retorna a conexão (lazy initialization)."""
+        """Retorna a conexão de escrita (lazy initialization)."""
         if self._conn is None:
-            self._conn = get_connection(self.db_path)
+            with self._write_lock:
+                if self._conn is None:
+                    conn = get_connection(self.db_path, check_same_thread=False)
+                    if self.read_pool:
+                        conn.execute("PRAGMA journal_mode = WAL")
+                        conn.execute("PRAGMA synchronous = NORMAL")
+                    self._conn = conn
         return self._conn
 
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """Retorna a conexão de leitura da thread atual.
+
+        Dentro de ``transaction()`` (na thread dona da transação) ou sem pool,
+        retorna a conexão de escrita, para enxergar as escritas ainda não
+        commitadas.
+        """
+        if not self.read_pool or (self._tx_depth and self._tx_owner == threading.get_ident()):
+            return self.conn
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            _ = self.conn  # A conexão de escrita ativa o modo WAL
+            # Só a thread atual usa a conexão; check_same_thread=False permite
+            # que close() a feche a partir de outra thread
+            conn = get_connection(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
     def close(self) -> None:
-        """Fecha a conexão com o banco."""
+        """Fecha as conexões com o banco."""
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self._local = threading.local()
         if self._conn:
             self._conn.close()
             self._conn = None
 
+    # Transações
+    @contextmanager
+    def transaction(self) -> Iterator["Database"]:
+        """Agrupa várias escritas em uma única transação.
+
+        Dentro do bloco os métodos de escrita não fazem commit; o commit (ou
+        rollback, em caso de exceção) acontece ao sair do bloco mais externo.
+        O lock de escrita fica com a thread até o fim do bloco.
+        """
+        with self._write_lock:
+            self._tx_depth += 1
+            self._tx_owner = threading.get_ident()
+            try:
+                yield self
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._tx_owner = None
+                    self.conn.rollback()
+                    self._after_commit.clear()
+                raise
+            else:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._tx_owner = None
+                    self._commit()
+
+    def call_after_commit(self, callback: Callable[[], None]) -> None:
+        """Executa callback após o commit da transação atual (ou imediatamente).
+
+        Só é adiado se a thread atual for a dona da transação; uma transação
+        aberta por outra thread não atrasa o callback.
+
+        Args:
+            callback: Função sem argumentos
+        """
+        if self._tx_depth and self._tx_owner == threading.get_ident():
+            self._after_commit.append(callback)
+        else:
+            callback()
+
+    def _commit(self) -> None:
+        """Faz commit, exceto dentro de ``transaction()``."""
+        if self._tx_depth:
+            return
+        self.conn.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
     # Settings
+    @_reads
     def get_setting(self, key: str) -> str | None:
         """Retorna uma configuração.
 
@@ -114,10 +334,11 @@ class Database:
         Returns:
             Valor da configuração ou None
         """
-        cursor = self.conn.execute(SQL_SELECT_SETTINGS_BY_KEY, (key,))
+        cursor = self.reader.execute(SQL_SELECT_SETTINGS_BY_KEY, (key,))
         row = cursor.fetchone()
         return row["value"] if row else None
 
+    @_writes
     def set_setting(self, key: str, value: Any) -> None:
         """Define uma configuração.
 
@@ -127,31 +348,112 @@ class Database:
         """
         json_value = json.dumps(value) if not isinstance(value, str) else value
         self.conn.execute(SQL_UPSERT_SETTING, (key, json_value))
-        self.conn.commit()
+        self._commit()
 
     # Products Seen
+    def _product_row(self, product: dict, now: str) -> tuple:
+        """Monta os parâmetros de SQL_UPSERT_PRODUCT_SEEN para um produto."""
+        return (
+            product["itemId"],
+            product.get("first_seen_at", now),
+            now,
+            product.get("priceMin"),
+            product.get("priceDiscountRate"),
+            product.get("commission"),
+            product.get("commissionRate"),
+            product.get("score"),
+            _encode_raw_json(product, self.compress_raw_json),
+        )
+
+    @staticmethod
+    def _history_row(product: dict, ts: int) -> tuple:
+        """Monta os parâmetros de SQL_INSERT_PRICE_HISTORY para um produto."""
+        return (
+            product["itemId"],
+            ts,
+            product.get("priceMin"),
+            product.get("commission"),
+            product.get("priceDiscountRate"),
+        )
+
+    @_writes
     def upsert_product(self, product: dict) -> None:
         """Insere ou atualiza um produto visto.
 
         Args:
             product: Dicionário com dados do produto
         """
+        self.conn.execute(SQL_INSERT_PRICE_HISTORY, self._history_row(product, int(time.time())))
         self.conn.execute(
             SQL_UPSERT_PRODUCT_SEEN,
-            (
-                product["itemId"],
-                product.get("first_seen_at", datetime.now().isoformat()),
-                datetime.now().isoformat(),
-                product.get("priceMin"),
-                product.get("priceDiscountRate"),
-                product.get("commission"),
-                product.get("commissionRate"),
-                product.get("score"),
-                json.dumps(product),
-            ),
+            self._product_row(product, datetime.now().isoformat()),
         )
-        self.conn.commit()
+        self._commit()
 
+    @_writes
+    def upsert_products(self, products: list[dict]) -> None:
+        """Insere ou atualiza vários produtos em uma única transação.
+
+        O histórico de preços é gravado antes do upsert, só para produtos
+        cujo preço, comissão ou desconto mudou desde a última vez.
+
+        Args:
+            products: Lista de produtos
+        """
+        if not products:
+            return
+        now = datetime.now().isoformat()
+        ts = int(time.time())
+        self.conn.executemany(
+            SQL_INSERT_PRICE_HISTORY,
+            [self._history_row(product, ts) for product in products],
+        )
+        self.conn.executemany(
+            SQL_UPSERT_PRODUCT_SEEN,
+            [self._product_row(product, now) for product in products],
+        )
+        self._commit()
+
+    @_reads
+    def get_price_history(self, item_id: int) -> list[PricePoint]:
+        """Retorna o histórico de preços de um produto (mais antigo primeiro).
+
+        Args:
+            item_id: ID do produto
+
+        Returns:
+            Lista de PricePoint
+        """
+        cursor = self.reader.execute(SQL_SELECT_PRICE_HISTORY, (item_id,))
+        return [PricePoint(**row) for row in cursor]
+
+    @_reads
+    def get_reference_prices(self, prices: dict[int, float], days: int = 30) -> dict[int, float]:
+        """Retorna o menor preço de cada produto nos últimos N dias antes do preço atual.
+
+        Inclui o preço vigente no início da janela, então um produto com preço
+        estável há mais de N dias ainda tem referência. Os pontos do preço
+        atual não contam: uma queda já gravada por uma busca anterior continua
+        sendo queda.
+
+        Args:
+            prices: item_id -> preço atual
+            days: Janela em dias
+
+        Returns:
+            Dicionário item_id -> preço de referência (só produtos com histórico
+            de um preço diferente do atual)
+        """
+        if not prices:
+            return {}
+        cutoff = int(time.time()) - days * 86400
+        current = [[int(item_id), price] for item_id, price in prices.items()]
+        cursor = self.reader.execute(
+            SQL_SELECT_REFERENCE_PRICES, (json.dumps(current), cutoff, cutoff)
+        )
+        return {row["item_id"]: row["reference_price"] for row in cursor}
+
+    @_reads
     def get_product(self, item_id: int) -> ProductSeen | None:
         """Retorna um produto visto.
 
@@ -161,47 +463,94 @@ class Database:
         Returns:
             ProductSeen ou None
         """
-        cursor = self.conn.execute("SELECT * FROM products_seen WHERE item_id = ?", (item_id,))
+        cursor = self.reader.execute(SQL_SELECT_PRODUCT_BY_ID, (item_id,))
         row = cursor.fetchone()
         if row:
-            return ProductSeen(**row)
+            data = dict(row)
+            data["raw_json"] = _decode_raw_json(data["raw_json"])
+            return ProductSeen(**data)
         return None
 
+    def compress_existing_raw_json(self, batch_size: int = 500) -> int:
+        """Migra raw_json gravado como texto para BLOB zlib.
+
+        Processa em lotes e o lock de escrita é tomado a cada lote, com um
+        commit por lote, então outras escritas intercalam com a migração. Ao
+        terminar, grava ``RAW_JSON_COMPRESSED_SETTING`` e as próximas chamadas
+        não varrem a tabela (limpe a configuração ao voltar a gravar texto).
+
+        Args:
+            batch_size: Linhas convertidas por lote
+
+        Returns:
+            Quantidade de linhas convertidas
+        """
+        if self.get_setting(RAW_JSON_COMPRESSED_SETTING) == "true":
+            return 0
+        converted = 0
+        while batch := self._compress_raw_json_batch(batch_size):
+            converted += batch
+        self.set_setting(RAW_JSON_COMPRESSED_SETTING, True)
+        return converted
+
+    @_writes
+    def _compress_raw_json_batch(self, batch_size: int) -> int:
+        """Converte um lote de raw_json em texto; retorna quantas linhas."""
+        rows = self.conn.execute(SQL_SELECT_RAW_JSON_TEXT, (batch_size,)).fetchall()
+        if rows:
+            self.conn.executemany(
+                SQL_UPDATE_RAW_JSON,
+                [(zlib.compress(row["raw_json"].encode("utf-8")), row["item_id"]) for row in rows],
+            )
+            self._commit()
+        return len(rows)
+
     # Links
-    def get_cached_link(self, origin_url: str) -> Link | None:
+    @_reads
+    def get_cached_link(self, origin_url: str, group_hash: str = "default") -> Link | None:
         """Retorna um link em cache (se válido).
 
         Args:
             origin_url: URL original
+            group_hash: Grupo dono do link (os subIds variam por grupo)
 
         Returns:
             Link em cache ou None
         """
-        cursor = self.conn.execute(SQL_SELECT_LINK_BY_ORIGIN, (origin_url,))
+        cursor = self.reader.execute(SQL_SELECT_LINK_BY_ORIGIN, (origin_url, group_hash))
         row = cursor.fetchone()
         if row:
             return Link(**row)
         return None
 
-    def create_link(self, origin_url: str, short_link: str, sub_ids: list) -> Link:
+    @_writes
+    def create_link(
+        self,
+        origin_url: str,
+        short_link: str,
+        sub_ids: list,
+        group_hash: str = "default",
+    ) -> Link:
         """Cria um novo short link.
 
         Args:
             origin_url: URL original
             short_link: Short link gerado
             sub_ids: Lista de subIds
+            group_hash: Grupo dono do link
 
         Returns:
             Link criado
         """
         cursor = self.conn.execute(
             SQL_INSERT_LINK,
-            (origin_url, short_link, json.dumps(sub_ids)),
+            (origin_url, group_hash, short_link, json.dumps(sub_ids)),
         )
         row = cursor.fetchone()
-        self.conn.commit()
+        self._commit()
         return Link(**row)
 
+    @_writes
     def update_link_used(self, link_id: int) -> None:
         """Atualiza o last_used_at de um link.
 
@@ -209,26 +558,35 @@ class Database:
             link_id: ID do link
         """
         self.conn.execute(SQL_UPDATE_LINK_LAST_USED, (link_id,))
-        self.conn.commit()
+        self._commit()
 
-    def get_or_create_link(self, origin_url: str, short_link: str, sub_ids: list) -> Link:
+    @_writes
+    def get_or_create_link(
+        self,
+        origin_url: str,
+        short_link: str,
+        sub_ids: list,
+        group_hash: str = "default",
+    ) -> Link:
         """Retorna link em cache ou cria novo.
 
         Args:
             origin_url: URL original
             short_link: Short link gerado
             sub_ids: Lista de subIds
+            group_hash: Grupo dono do link
 
         Returns:
             Link existente ou novo
         """
-        cached = self.get_cached_link(origin_url)
+        cached = self.get_cached_link(origin_url, group_hash)
         if cached:
             self.update_link_used(cached.id)
             return cached
-        return self.create_link(origin_url, short_link, sub_ids)
+        return self.create_link(origin_url, short_link, sub_ids, group_hash)
 
     # Sent Messages
+    @_reads
     def was_sent_recently(self, item_id: int, group_id: str, days: int = 7) -> bool:
         """Verifica se produto foi enviado recentemente.
 
@@ -240,11 +598,13 @@ class Database:
         Returns:
             True se foi enviado recentemente
         """
-        sql = SQL_SELECT_SENT_RECENT.format(days=days)
-        cursor = self.conn.execute(sql, (item_id, group_id))
+        cursor = self.reader.execute(
+            SQL_SELECT_SENT_RECENT, (str(group_id), item_id, _days_modifier(days))
+        )
         row = cursor.fetchone()
-        return row["count"] > 0
+        return bool(row["sent"])
 
+    @_writes
     def mark_as_sent(self, item_id: int, group_id: str, short_link: str, batch_id: str) -> None:
         """Marca produto como enviado.
 
@@ -255,9 +615,157 @@ class Database:
             batch_id: ID do batch
         """
         self.conn.execute(SQL_INSERT_SENT_MESSAGE, (item_id, group_id, short_link, batch_id))
-        self.conn.commit()
+        self._commit()
+
+    @_reads
+    def get_recent_sends(self, days: int = 7) -> list[tuple[str, int, int]]:
+        """Retorna o envio mais recente de cada (grupo, produto) no período.
+
+        Args:
+            days: Dias para considerar
+
+        Returns:
+            Lista de (group_id, item_id, sent_ts) com sent_ts em epoch (UTC)
+        """
+        cursor = self.reader.execute(SQL_SELECT_RECENT_SENDS, (_days_modifier(days),))
+        return [(row["group_id"], row["item_id"], row["sent_ts"]) for row in cursor]
+
+    @_writes
+    def purge_sent_messages(self, older_than_days: int) -> int:
+        """Remove envios mais antigos que o período informado.
+
+        Args:
+            older_than_days: Idade mínima (em dias) dos envios removidos
+
+        Returns:
+            Quantidade de linhas removidas
+        """
+        cursor = self.conn.execute(SQL_DELETE_SENT_BEFORE, (_days_modifier(older_than_days),))
+        self._commit()
+        return cursor.rowcount
+
+    @_writes
+    def mark_as_sent_batch(
+        self,
+        items: list[tuple[int, str]],
+        group_id: str,
+        batch_id: str,
+    ) -> None:
+        """Marca vários produtos como enviados em uma única transação.
+
+        Args:
+            items: Lista de (item_id, short_link)
+            group_id: ID do grupo
+            batch_id: ID do batch
+        """
+        if not items:
+            return
+        self.conn.executemany(
+            SQL_INSERT_SENT_MESSAGE,
+            [(item_id, group_id, short_link, batch_id) for item_id, short_link in items],
+        )
+        self._commit()
+
+    # Search Cache
+    @_reads
+    def get_search_cache(self, key: str) -> tuple[float, list[dict]] | None:
+        """Retorna uma resposta de busca em cache.
+
+        Args:
+            key: Chave da busca (ver ``SearchCache.key``)
+
+        Returns:
+            (fetched_at em epoch, nodes) ou None
+        """
+        row = self.reader.execute(SQL_SELECT_SEARCH_CACHE, (key,)).fetchone()
+        if row is None:
+            return None
+        return row["fetched_at"], json.loads(_decode_raw_json(row["nodes"]))
+
+    @_writes
+    def put_search_cache(self, key: str, nodes: list[dict], fetched_at: float) -> None:
+        """Grava uma resposta de busca (JSON comprimido com zlib).
+
+        Args:
+            key: Chave da busca
+            nodes: Ofertas retornadas pela API
+            fetched_at: Momento da busca (epoch)
+        """
+        self.conn.execute(
+            SQL_UPSERT_SEARCH_CACHE, (key, fetched_at, _encode_raw_json(nodes, compress=True))
+        )
+        self._commit()
+
+    # Scheduler Jobs
+    @_reads
+    def get_scheduler_job(self, job_id: str) -> bytes | None:
+        """Retorna o estado serializado de um job do scheduler (ou None)."""
+        row = self.reader.execute(SQL_SELECT_SCHEDULER_JOB, (job_id,)).fetchone()
+        return row["job_state"] if row else None
+
+    @_reads
+    def get_scheduler_jobs(self, due_before: float | None = None) -> list[tuple[str, bytes]]:
+        """Retorna (id, estado) dos jobs em ordem de próxima execução.
+
+        Args:
+            due_before: Apenas jobs com próxima execução até este momento
+                (epoch UTC); None retorna todos, pausados por último
+        """
+        if due_before is None:
+            cursor = self.reader.execute(SQL_SELECT_SCHEDULER_JOBS)
+        else:
+            cursor = self.reader.execute(SQL_SELECT_DUE_SCHEDULER_JOBS, (due_before,))
+        return [(row["id"], row["job_state"]) for row in cursor.fetchall()]
+
+    @_reads
+    def get_next_scheduler_run(self) -> float | None:
+        """Próxima execução entre todos os jobs (epoch UTC) ou None."""
+        return self.reader.execute(SQL_SELECT_NEXT_SCHEDULER_RUN).fetchone()["next_run_time"]
+
+    @_writes
+    def insert_scheduler_job(self, job_id: str, next_run_time: float | None, state: bytes) -> bool:
+        """Grava um job novo.
+
+        Returns:
+            False se já existe job com o mesmo id
+        """
+        try:
+            self.conn.execute(SQL_INSERT_SCHEDULER_JOB, (job_id, next_run_time, state))
+        except sqlite3.IntegrityError:
+            return False
+        self._commit()
+        return True
+
+    @_writes
+    def update_scheduler_job(self, job_id: str, next_run_time: float | None, state: bytes) -> bool:
+        """Substitui um job existente.
+
+        Returns:
+            False se o job não existe
+        """
+        cursor = self.conn.execute(SQL_UPDATE_SCHEDULER_JOB, (next_run_time, state, job_id))
+        self._commit()
+        return cursor.rowcount > 0
+
+    @_writes
+    def delete_scheduler_jobs(self, job_ids: list[str] | None = None) -> int:
+        """Remove os jobs informados (todos se None).
+
+        Returns:
+            Quantidade de jobs removidos
+        """
+        if job_ids is None:
+            deleted = self.conn.execute(SQL_DELETE_SCHEDULER_JOBS).rowcount
+        else:
+            deleted = sum(
+                self.conn.execute(SQL_DELETE_SCHEDULER_JOB, (job_id,)).rowcount
+                for job_id in job_ids
+            )
+        self._commit()
+        return deleted
 
     # Runs
+    @_writes
     def start_run(self, run_type: str) -> int:
         """Inicia uma execução.
 
@@ -269,9 +777,10 @@ class Database:
         """
         cursor = self.conn.execute(SQL_INSERT_RUN_START, (run_type,))
         row = cursor.fetchone()
-        self.conn.commit()
+        self._commit()
         return row["id"]
 
+    @_writes
     def end_run(
         self,
         run_id: int,
@@ -302,30 +811,62 @@ class Database:
                 run_id,
             ),
         )
-        self.conn.commit()
+        self._commit()
+
+    @_writes
+    def record_run_stages(
+        self,
+        run_id: int,
+        stages: list[tuple[str, float, int, int, int]],
+    ) -> None:
+        """Grava as etapas de uma execução.
 
+        Args:
+            run_id: ID da execução
+            stages: Lista de (stage, wall_ms, api_calls, api_retries, db_queries)
+        """
+        if not stages:
+            return
+        self.conn.executemany(SQL_INSERT_RUN_STAGE, [(run_id, *stage) for stage in stages])
+        self._commit()
+
+    @_reads
+    def get_run_stages(self, run_id: int) -> list[RunStage]:
+        """Retorna as etapas gravadas de uma execução.
+
+        Args:
+            run_id: ID da execução
+
+        Returns:
+            Lista de RunStage
+        """
+        cursor = self.reader.execute(SQL_SELECT_RUN_STAGES, (run_id,))
+        return [RunStage(**row) for row in cursor]
+
+    @_reads
     def get_last_run(self) -> Run | None:
         """Retorna a última execução.
 
         Returns:
             Run ou None
         """
-        cursor = self.conn.execute(SQL_SELECT_LAST_RUN)
+        cursor = self.reader.execute(SQL_SELECT_LAST_RUN)
         row = cursor.fetchone()
         if row:
             return Run(**row)
         return None
 
+    @_reads
     def get_stats(self) -> dict:
         """Retorna estatísticas gerais.
 
         Returns:
             Dicionário com estatísticas
         """
-        cursor = self.conn.execute(SQL_SELECT_RUNS_STATS)
+        cursor = self.reader.execute(SQL_SELECT_RUNS_STATS)
         runs_row = cursor.fetchone()
 
-        cursor = self.conn.execute(SQL_SELECT_DB_STATS)
+        cursor = self.reader.execute(SQL_SELECT_DB_STATS)
         db_row = cursor.fetchone()
 
         return {
@@ -338,7 +879,108 @@ class Database:
             "total_sent_messages": db_row["total_sent"] or 0,
         }
 
+    @_writes
     def vacuum(self) -> None:
         """Executa VACUUM para otimizar o banco."""
         self.conn.execute(SQL_VACUUM)
-        self.conn.commit()
+        self._commit()
+
+    # Retenção
+    @_writes
+    def prune_raw_json(self, older_than_days: int) -> int:
+        """Remove raw_json de produtos não vistos há mais de N dias.
+
+        Args:
+            older_than_days: Dias desde a última vez que o produto foi visto
+
+        Returns:
+            Quantidade de produtos afetados
+        """
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        cursor = self.conn.execute(SQL_PRUNE_RAW_JSON, (cutoff,))
+        self._commit()
+        return cursor.rowcount
+
+    @_writes
+    def purge_price_history(self, older_than_days: int) -> int:
+        """Remove pontos do histórico de preços mais antigos que N dias.
+
+        O ponto mais recente de cada produto é sempre mantido, pois ele é o
+        preço vigente usado como referência.
+
+        Args:
+            older_than_days: Idade mínima (em dias) dos pontos removidos
+
+        Returns:
+            Quantidade de pontos removidos
+        """
+        cutoff = int(time.time()) - older_than_days * 86400
+        cursor = self.conn.execute(SQL_DELETE_PRICE_HISTORY_BEFORE, (cutoff,))
+        self._commit()
+        return cursor.rowcount
+
+    @_writes
+    def purge_search_cache(self, older_than_seconds: float) -> int:
+        """Remove respostas de busca em cache mais antigas que N segundos.
+
+        Args:
+            older_than_seconds: Idade mínima das entradas removidas
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        cursor = self.conn.execute(
+            SQL_DELETE_SEARCH_CACHE_BEFORE, (time.time() - older_than_seconds,)
+        )
+        self._commit()
+        return cursor.rowcount
+
+    @_writes
+    def delete_expired_links(self, older_than_days: int) -> int:
+        """Remove short links criados há mais de N dias.
+
+        Args:
+            older_than_days: Idade mínima (em dias) dos links removidos
+
+        Returns:
+            Quantidade de links removidos
+        """
+        cursor = self.conn.execute(SQL_DELETE_LINKS_BEFORE, (_days_modifier(older_than_days),))
+        self._commit()
+        return cursor.rowcount
+
+    def file_size(self) -> int:
+        """Retorna o tamanho do banco em bytes (page_count x page_size)."""
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    @_writes
+    def enable_incremental_vacuum(self) -> bool:
+        """Converte o banco para ``auto_vacuum = INCREMENTAL``, se necessário.
+
+        A conversão exige um VACUUM completo, que reescreve o arquivo inteiro
+        segurando o lock de escrita: chame na inicialização, antes do bot
+        começar a atender.
+
+        Returns:
+            True se o banco foi convertido agora
+        """
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.vacuum()
+        return True
+
+    @_writes
+    def compact(self) -> None:
+        """Devolve páginas livres ao sistema de arquivos.
+
+        Usa ``incremental_vacuum``; se o banco ainda não está em
+        ``auto_vacuum = INCREMENTAL``, converte antes (ver
+        ``enable_incremental_vacuum``).
+        """
+        if self.enable_incremental_vacuum():
+            return
+        self.conn.execute(SQL_INCREMENTAL_VACUUM).fetchall()
+        self._commit()
@@ -0,0 +1,66 @@
+"""Retenção e compactação de dados do MariaBicoBot."""
+
+from dataclasses import dataclass
+
+from src.utils.logger import get_logger
+
+from .models import Database
+
+logger = get_logger("mariabicobot", "database")
+
+
+@dataclass
+class RetentionPolicy:
+    """Política de retenção de dados."""
+
+    raw_json_days: int = 30  # raw_json de produtos não vistos há N dias
+    link_days: int = 30  # Links além da validade do cache (SQL_SELECT_LINK_BY_ORIGIN)
+    sent_factor: int = 4  # Envios mantidos por N x janela de deduplicação
+    price_history_days: int = 90  # Histórico de preços (o último ponto é sempre mantido)
+    search_cache_seconds: int = 86400  # Respostas de busca além do TTL + stale do cache
+    compact: bool = True  # Executa incremental_vacuum ao final
+
+
+def run_retention(db: Database, policy: RetentionPolicy, dedup_days: int) -> dict:
+    """Executa a retenção e retorna um relatório.
+
+    Bloqueante (deletes e ``incremental_vacuum``): em código assíncrono, rode
+    com ``asyncio.to_thread``.
+
+    Args:
+        db: Instância do banco de dados
+        policy: Política de retenção
+        dedup_days: Janela de deduplicação em dias
+
+    Returns:
+        Dicionário com linhas afetadas por etapa e bytes liberados
+    """
+    size_before = db.file_size()
+
+    report = {
+        "raw_json_pruned": db.prune_raw_json(policy.raw_json_days),
+        "links_deleted": db.delete_expired_links(policy.link_days),
+        "sent_deleted": db.purge_sent_messages(dedup_days * policy.sent_factor),
+        "history_deleted": db.purge_price_history(policy.price_history_days),
+        "search_cache_deleted": db.purge_search_cache(policy.search_cache_seconds),
+    }
+
+    if policy.compact:
+        db.compact()
+
+    size_after = db.file_size()
+    report["bytes_before"] = size_before
+    report["bytes_after"] = size_after
+    report["bytes_reclaimed"] = max(size_before - size_after, 0)
+
+    logger.info(
+        "Retenção: %d raw_json limpos, %d links, %d envios, %d pontos de histórico e "
+        "%d buscas em cache removidos, %d bytes liberados",
+        report["raw_json_pruned"],
+        report["links_deleted"],
+        report["sent_deleted"],
+        report["history_deleted"],
+        report["search_cache_deleted"],
+        report["bytes_reclaimed"],
+    )
+    return report
@@ -1,6 +1,12 @@
 """Schema SQL do MariaBicoBot."""
 
 import sqlite3
+import time
+from dataclasses import dataclass
+
+from src.utils.logger import get_logger
+
+logger = get_logger("mariabicobot", "database")
 
 # SQL para criar as tabelas
 SQL_CREATE_SETTINGS = """
@@ -21,7 +27,7 @@ CREATE TABLE IF NOT EXISTS products_seen (
     last_commission REAL,
     last_commission_rate REAL,
     last_score REAL,
-    raw_json TEXT
+    raw_json TEXT  -- JSON em texto ou BLOB zlib (ver Database.compress_raw_json)
 );
 """
 
@@ -30,6 +36,18 @@ CREATE INDEX IF NOT EXISTS idx_products_seen_last_seen
 ON products_seen(last_seen_at);
 """
 
+# Histórico append-only; só grava quando preço/comissão/desconto mudam
+SQL_CREATE_PRICE_HISTORY = """
+CREATE TABLE IF NOT EXISTS price_history (
+    item_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    price REAL,
+    commission REAL,
+    discount INTEGER,
+    PRIMARY KEY (item_id, ts)
+) WITHOUT ROWID;
+"""
+
 SQL_CREATE_LINKS = """
 CREATE TABLE IF NOT EXISTS links (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -66,15 +84,23 @@ CREATE TABLE IF NOT EXISTS sent_messages (
 
 SQL_CREATE_SENT_MESSAGES_INDEXES = [
     """
-CREATE INDEX IF NOT EXISTS idx_sent_item_group
-ON sent_messages(item_id, group_id);
-""",
-    """
 CREATE INDEX IF NOT EXISTS idx_sent_batch
 ON sent_messages(batch_id);
 """,
 ]
 
+# Índice de cobertura para SQL_SELECT_SENT_RECENT (igualdade + range em sent_at);
+# substitui idx_sent_item_group
+SQL_CREATE_SENT_COVERING_INDEX = [
+    """
+CREATE INDEX IF NOT EXISTS idx_sent_group_item_sent
+ON sent_messages(group_id, item_id, sent_at);
+""",
+    """
+DROP INDEX IF EXISTS idx_sent_item_group;
+""",
+]
+
 SQL_CREATE_RUNS = """
 CREATE TABLE IF NOT EXISTS runs (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -94,22 +120,175 @@ CREATE INDEX IF NOT EXISTS idx_runs_started
 ON runs(started_at DESC);
 """
 
-# Todas as queries de criação
-ALL_CREATE_STATEMENTS = [
-    SQL_CREATE_SETTINGS,
-    SQL_CREATE_PRODUCTS_SEEN,
-    SQL_CREATE_PRODUCTS_SEEN_INDEX,
-    SQL_CREATE_LINKS,
-    *SQL_CREATE_LINKS_INDEXES,
-    SQL_CREATE_SENT_MESSAGES,
-    *SQL_CREATE_SENT_MESSAGES_INDEXES,
-    SQL_CREATE_RUNS,
-    SQL_CREATE_RUNS_INDEX,
+SQL_CREATE_RUN_STAGES = """
+CREATE TABLE IF NOT EXISTS run_stages (
+    run_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    wall_ms REAL NOT NULL,
+    api_calls INTEGER DEFAULT 0,
+    api_retries INTEGER DEFAULT 0,
+    db_queries INTEGER DEFAULT 0,
+    PRIMARY KEY (run_id, stage),
+    FOREIGN KEY (run_id) REFERENCES runs(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+"""
+
+# Links passam a ser únicos por (origin_url, group_hash): cada grupo tem o seu
+# short link com os próprios subIds. O group_hash dos links existentes vem do
+# segundo subId ("grupo<hash>").
+SQL_MIGRATE_LINKS_PER_GROUP = [
+    """
+CREATE TABLE links_per_group (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin_url TEXT NOT NULL,
+    group_hash TEXT NOT NULL DEFAULT 'default',
+    short_link TEXT NOT NULL,
+    sub_ids_json TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_used_at DATETIME,
+    UNIQUE (origin_url, group_hash)
+);
+""",
+    """
+INSERT INTO links_per_group
+    (id, origin_url, group_hash, short_link, sub_ids_json, created_at, last_used_at)
+SELECT
+    id,
+    origin_url,
+    COALESCE(
+        CASE WHEN json_valid(sub_ids_json) THEN
+            CASE WHEN json_extract(sub_ids_json, '$[1]') LIKE 'grupo_%'
+            THEN substr(json_extract(sub_ids_json, '$[1]'), 6) END
+        END,
+        'default'
+    ),
+    short_link,
+    sub_ids_json,
+    created_at,
+    last_used_at
+FROM links;
+""",
+    "DROP TABLE links;",
+    "ALTER TABLE links_per_group RENAME TO links;",
+    """
+CREATE INDEX IF NOT EXISTS idx_links_created
+ON links(created_at);
+""",
+]
+
+# Respostas de productOfferV2 por variáveis da busca (ver src/shopee/cache.py)
+SQL_CREATE_SEARCH_CACHE = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    nodes BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Jobs do APScheduler (estado serializado com pickle, ver DatabaseJobStore)
+SQL_CREATE_SCHEDULER_JOBS = [
+    """
+CREATE TABLE IF NOT EXISTS scheduler_jobs (
+    id TEXT PRIMARY KEY,
+    next_run_time REAL,
+    job_state BLOB NOT NULL
+);
+""",
+    """
+CREATE INDEX IF NOT EXISTS idx_scheduler_jobs_next_run
+ON scheduler_jobs(next_run_time);
+""",
+]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Passo de migração do schema (aplicado quando user_version < version)."""
+
+    version: int
+    description: str
+    statements: tuple[str, ...]
+
+
+# Migrações em ordem. Nunca altere um passo já publicado: adicione um novo.
+# Os statements são idempotentes para que bancos anteriores ao controle de
+# versão (user_version = 0) possam passar por todos os passos.
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        "schema inicial",
+        (
+            SQL_CREATE_SETTINGS,
+            SQL_CREATE_PRODUCTS_SEEN,
+            SQL_CREATE_PRODUCTS_SEEN_INDEX,
+            SQL_CREATE_LINKS,
+            *SQL_CREATE_LINKS_INDEXES,
+            SQL_CREATE_SENT_MESSAGES,
+            *SQL_CREATE_SENT_MESSAGES_INDEXES,
+            SQL_CREATE_RUNS,
+            SQL_CREATE_RUNS_INDEX,
+        ),
+    ),
+    Migration(2, "índice de cobertura em sent_messages", tuple(SQL_CREATE_SENT_COVERING_INDEX)),
+    Migration(3, "histórico de preços", (SQL_CREATE_PRICE_HISTORY,)),
+    Migration(4, "etapas por execução", (SQL_CREATE_RUN_STAGES,)),
+    Migration(5, "links por grupo", tuple(SQL_MIGRATE_LINKS_PER_GROUP)),
+    Migration(6, "cache de buscas", (SQL_CREATE_SEARCH_CACHE,)),
+    Migration(7, "jobs do scheduler", tuple(SQL_CREATE_SCHEDULER_JOBS)),
 ]
 
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Retorna a versão do schema gravada em ``PRAGMA user_version``."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(
+    conn: sqlite3.Connection,
+    migrations: list[Migration] | None = None,
+) -> list[tuple[int, str, float]]:
+    """Aplica as migrações pendentes.
+
+    Cada passo roda em uma única transação junto com a atualização de
+    ``user_version``; se falhar, nada do passo é gravado.
+
+    Args:
+        conn: Conexão com o banco
+        migrations: Lista de migrações (default MIGRATIONS)
+
+    Returns:
+        Lista de (versão, descrição, duração em ms) dos passos aplicados
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    current = get_schema_version(conn)
+    applied = []
+
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+        started = time.perf_counter()
+        conn.execute("BEGIN")
+        try:
+            for statement in migration.statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        applied.append((migration.version, migration.description, elapsed_ms))
+        logger.info(
+            "Migração %d (%s): %.1fms", migration.version, migration.description, elapsed_ms
+        )
+
+    return applied
+
 
 def init_db(db_path: str) -> sqlite3.Connection:
-    """Inicializa o banco de dados criando todas as tabelas.
+    """Inicializa o banco de dados aplicando as migrações pendentes.
 
     Args:
         db_path: Caminho para o arquivo SQLite
@@ -117,30 +296,54 @@ def init_db(db_path: str) -> sqlite3.Connection:
     Returns:
         Conexão com o banco de dados
     """
+    started = time.perf_counter()
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
 
     # Habilita foreign keys (SQLite precisa ser habilitado por conexão)
     conn.execute("PRAGMA foreign_keys = ON")
 
-    cursor = conn.cursor()
-    for statement in ALL_CREATE_STATEMENTS:
-        cursor.execute(statement)
-
-    conn.commit()
+    # Permite liberar páginas com incremental_vacuum (só tem efeito em bancos
+    # novos; bancos existentes são convertidos por
+    # Database.enable_incremental_vacuum na inicialização)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    applied = migrate(conn)
+    if applied:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            "Schema migrado para a versão %d (%d passo(s), %.1fms)",
+            SCHEMA_VERSION,
+            len(applied),
+            elapsed_ms,
+        )
     return conn
 
 
-def get_connection(db_path: str) -> sqlite3.Connection:
+# Statements preparados mantidos por conexão (default do sqlite3 é 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+def get_connection(
+    db_path: str,
+    check_same_thread: bool = True,
+    cached_statements: int = STATEMENT_CACHE_SIZE,
+) -> sqlite3.Connection:
     """Retorna uma conexão com o banco de dados.
 
     Args:
         db_path: Caminho para o arquivo SQLite
+        check_same_thread: Restringe o uso à thread que criou a conexão
+        cached_statements: Tamanho do cache de statements preparados
 
     Returns:
         Conexão com o banco de dados
     """
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=check_same_thread,
+        cached_statements=cached_statements,
+    )
     conn.row_factory = sqlite3.Row
 
     # Habilita foreign keys (SQLite precisa ser habilitado por conexão)
@@ -163,6 +366,10 @@ SQL_SELECT_PRODUCT_SEEN = """
 SELECT * FROM products_seen WHERE item_id = ?;
 """
 
+SQL_SELECT_PRODUCT_BY_ID = """
+SELECT * FROM products_seen WHERE item_id = ?;
+"""
+
 SQL_UPSERT_PRODUCT_SEEN = """
 INSERT INTO products_seen (
     item_id, first_seen_at, last_seen_at,
@@ -182,14 +389,14 @@ ON CONFLICT(item_id) DO UPDATE SET
 
 SQL_SELECT_LINK_BY_ORIGIN = """
 SELECT * FROM links
-WHERE origin_url = ?
+WHERE origin_url = ? AND group_hash = ?
 AND created_at > datetime('now', '-30 days');
 """
 
 SQL_INSERT_LINK = """
-INSERT INTO links (origin_url, short_link, sub_ids_json, created_at)
-VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-RETURNING id, origin_url, short_link, sub_ids_json, created_at;
+INSERT INTO links (origin_url, group_hash, short_link, sub_ids_json, created_at)
+VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+RETURNING id, origin_url, group_hash, short_link, sub_ids_json, created_at;
 """
 
 SQL_UPDATE_LINK_LAST_USED = """
@@ -197,11 +404,14 @@ UPDATE links SET last_used_at = CURRENT_TIMESTAMP
 WHERE id = ?;
 """
 
+# Parâmetros: group_id, item_id, modificador de data (ex: "-7 days")
 SQL_SELECT_SENT_RECENT = """
-SELECT COUNT(*) as count FROM sent_messages
-WHERE item_id = ?
-AND group_id = ?
-AND sent_at > datetime('now', '-{days} days');
+SELECT EXISTS(
+    SELECT 1 FROM sent_messages
+    WHERE group_id = ?
+    AND item_id = ?
+    AND sent_at > datetime('now', ?)
+) AS sent;
 """
 
 SQL_INSERT_SENT_MESSAGE = """
@@ -209,6 +419,176 @@ INSERT INTO sent_messages (item_id, group_id, short_link, sent_at, batch_id)
 VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?);
 """
 
+# Parâmetro: modificador de data (ex: "-7 days")
+SQL_SELECT_RECENT_SENDS = """
+SELECT
+    group_id,
+    item_id,
+    CAST(strftime('%s', MAX(sent_at)) AS INTEGER) AS sent_ts
+FROM sent_messages
+WHERE sent_at > datetime('now', ?)
+GROUP BY group_id, item_id;
+"""
+
+# Parâmetro: last_seen_at limite (ISO, mesmo formato de upsert_product)
+SQL_PRUNE_RAW_JSON = """
+UPDATE products_seen SET raw_json = NULL
+WHERE last_seen_at < ?
+AND raw_json IS NOT NULL;
+"""
+
+# Deve rodar antes de SQL_UPSERT_PRODUCT_SEEN: compara com os last_* atuais
+# Parâmetros: item_id, ts (epoch), price, commission, discount
+SQL_INSERT_PRICE_HISTORY = """
+INSERT OR REPLACE INTO price_history (item_id, ts, price, commission, discount)
+SELECT ?1, ?2, ?3, ?4, ?5
+WHERE NOT EXISTS (
+    SELECT 1 FROM products_seen
+    WHERE item_id = ?1
+    AND last_price_min IS ?3
+    AND last_commission IS ?4
+    AND last_discount_rate IS ?5
+);
+"""
+
+SQL_SELECT_PRICE_HISTORY = """
+SELECT item_id, ts, price, commission, discount
+FROM price_history
+WHERE item_id = ?
+ORDER BY ts;
+"""
+
+# Menor preço desde o início da janela (incluindo o preço vigente no início
+# dela) até o último ponto com preço diferente do atual: os pontos do preço
+# atual, gravados por buscas anteriores (ex: pré-aquecimento), não contam
+# Parâmetros: lista JSON de [item_id, preço atual], ts de corte, ts de corte
+SQL_SELECT_REFERENCE_PRICES = """
+WITH current(item_id, price) AS (
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]')
+    FROM json_each(?)
+),
+before_current(item_id, until_ts) AS (
+    SELECT c.item_id, MAX(h.ts)
+    FROM current c
+    JOIN price_history h ON h.item_id = c.item_id
+    WHERE h.price IS NOT c.price
+    GROUP BY c.item_id
+)
+SELECT h.item_id, MIN(h.price) AS reference_price
+FROM before_current b
+JOIN price_history h ON h.item_id = b.item_id
+WHERE h.ts <= b.until_ts
+AND (
+    h.ts >= ?
+    OR h.ts = (
+        SELECT MAX(p.ts) FROM price_history p
+        WHERE p.item_id = h.item_id AND p.ts < ?
+    )
+)
+AND h.price IS NOT NULL
+GROUP BY h.item_id;
+"""
+
+# Remove pontos antigos, preservando o último de cada produto
+# Parâmetro: ts de corte (epoch)
+SQL_DELETE_PRICE_HISTORY_BEFORE = """
+DELETE FROM price_history
+WHERE ts < ?
+AND ts < (
+    SELECT MAX(p.ts) FROM price_history p
+    WHERE p.item_id = price_history.item_id
+);
+"""
+
+SQL_SELECT_SEARCH_CACHE = """
+SELECT fetched_at, nodes FROM search_cache WHERE key = ?;
+"""
+
+# Parâmetros: key, fetched_at (epoch), nodes (JSON zlib)
+SQL_UPSERT_SEARCH_CACHE = """
+INSERT OR REPLACE INTO search_cache (key, fetched_at, nodes)
+VALUES (?, ?, ?);
+"""
+
+# Parâmetro: fetched_at de corte (epoch)
+SQL_DELETE_SEARCH_CACHE_BEFORE = """
+DELETE FROM search_cache WHERE fetched_at < ?;
+"""
+
+SQL_SELECT_SCHEDULER_JOB = """
+SELECT job_state FROM scheduler_jobs WHERE id = ?;
+"""
+
+# Jobs pausados (next_run_time NULL) por último
+SQL_SELECT_SCHEDULER_JOBS = """
+SELECT id, job_state FROM scheduler_jobs
+ORDER BY next_run_time IS NULL, next_run_time;
+"""
+
+# Parâmetro: momento atual (epoch UTC)
+SQL_SELECT_DUE_SCHEDULER_JOBS = """
+SELECT id, job_state FROM scheduler_jobs
+WHERE next_run_time <= ?
+ORDER BY next_run_time;
+"""
+
+SQL_SELECT_NEXT_SCHEDULER_RUN = """
+SELECT MIN(next_run_time) AS next_run_time FROM scheduler_jobs;
+"""
+
+# Parâmetros: id, next_run_time (epoch UTC ou NULL), job_state (pickle)
+SQL_INSERT_SCHEDULER_JOB = """
+INSERT INTO scheduler_jobs (id, next_run_time, job_state) VALUES (?, ?, ?);
+"""
+
+# Parâmetros: next_run_time, job_state, id
+SQL_UPDATE_SCHEDULER_JOB = """
+UPDATE scheduler_jobs SET next_run_time = ?, job_state = ? WHERE id = ?;
+"""
+
+SQL_DELETE_SCHEDULER_JOB = """
+DELETE FROM scheduler_jobs WHERE id = ?;
+"""
+
+SQL_DELETE_SCHEDULER_JOBS = """
+DELETE FROM scheduler_jobs;
+"""
+
+# Parâmetros: run_id, stage, wall_ms, api_calls, api_retries, db_queries
+SQL_INSERT_RUN_STAGE = """
+INSERT OR REPLACE INTO run_stages (run_id, stage, wall_ms, api_calls, api_retries, db_queries)
+VALUES (?, ?, ?, ?, ?, ?);
+"""
+
+SQL_SELECT_RUN_STAGES = """
+SELECT run_id, stage, wall_ms, api_calls, api_retries, db_queries
+FROM run_stages
+WHERE run_id = ?;
+"""
+
+# Parâmetro: tamanho do lote
+SQL_SELECT_RAW_JSON_TEXT = """
+SELECT item_id, raw_json FROM products_seen
+WHERE typeof(raw_json) = 'text'
+LIMIT ?;
+"""
+
+SQL_UPDATE_RAW_JSON = """
+UPDATE products_seen SET raw_json = ? WHERE item_id = ?;
+"""
+
+# Parâmetro: modificador de data (ex: "-30 days")
+SQL_DELETE_LINKS_BEFORE = """
+DELETE FROM links
+WHERE created_at < datetime('now', ?);
+"""
+
+# Parâmetro: modificador de data (ex: "-28 days")
+SQL_DELETE_SENT_BEFORE = """
+DELETE FROM sent_messages
+WHERE sent_at < datetime('now', ?);
+"""
+
 SQL_INSERT_RUN_START = """
 INSERT INTO runs (run_type, started_at)
 VALUES (?, CURRENT_TIMESTAMP)
@@ -249,3 +629,5 @@ SELECT
 """
 
 SQL_VACUUM = "VACUUM;"
+
+SQL_INCREMENTAL_VACUUM = "PRAGMA incremental_vacuum;"
@@ -1,12 +1,12 @@
 """Entry point do MariaBicoBot."""
 
 import asyncio
+import logging
 import signal
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
@@ -19,6 +19,7 @@ from telegram.ext import (
 from src.bot.formatters import format_consolidated_message
 from src.bot.handlers import (
     AWAITING_LINK,
+    cancel_curation_callback,
     convert_link_message,
     convert_link_start,
     curate_now_callback,
@@ -26,20 +27,144 @@ from src.bot.handlers import (
     help_command,
     menu_callback,
     menu_command,
+    profile_callback,
+    profile_command,
     report_callback,
     report_command,
     status_callback,
 )
 from src.bot.keyboards import CallbackData
 from src.config import get_settings
-from src.core import Curator, ScoreWeights
-from src.database import Database, init_db
-from src.shopee import ShopeeClient
-from src.utils.logger import get_logger, setup_logger
+from src.core import (
+    CurationProfile,
+    Curator,
+    GroupConfig,
+    ProfileStore,
+    RunCoordinator,
+    RunProfiler,
+    group_hash_for,
+)
+from src.core.profiles import DEFAULT_PROFILE
+from src.database import Database, RetentionPolicy, init_db, run_retention
+from src.database.models import RAW_JSON_COMPRESSED_SETTING
+from src.shopee import SearchCache, ShopeeClient
+from src.utils.logger import LogContext, get_logger, setup_logger
+from src.utils.metrics import MetricsLogHandler, start_metrics_server
+from src.utils.scheduling import (
+    DatabaseJobStore,
+    LeadTrigger,
+    cron_trigger,
+    ensure_job,
+    register_application,
+)
 
 logger = get_logger("mariabicobot", "main")
 
 
+def _scheduled_groups(context, curator: Curator) -> list[GroupConfig]:
+    """Grupos da curadoria agendada (só o grupo alvo se não configurados)."""
+    return context.bot_data.get("groups") or [
+        GroupConfig(
+            str(get_settings().target_group_id),
+            curator.group_hash,
+            dedup_days=curator.deduplicator.dedup_days,
+        )
+    ]
+
+
+async def _scheduled_run(
+    context, db: Database, curator: Curator, groups: list[GroupConfig], profile: CurationProfile
+) -> dict:
+    """Executa a curadoria agendada, envia em cada grupo e registra o run.
+
+    Returns:
+        Resultado de ``Curator.curate_groups``
+
+    Raises:
+        Exception: Erro na curadoria (o run é finalizado como falho)
+    """
+    # Inicia run; run_id e batch_id acompanham todos os logs da execução
+    run_id = db.start_run("scheduled")
+    batch_id = datetime.now().strftime("%Y%m%d_%H%M_scheduled")
+    profiler = RunProfiler(curator.shopee, db)
+
+    with LogContext(run_id=run_id, batch_id=batch_id):
+        try:
+            # Uma busca para todos os grupos; filtros, histórico e top-N por grupo
+            result = await curator.curate_groups(
+                profile.keywords, groups, profile.categories, profiler=profiler
+            )
+
+            # Envia em cada grupo; uma falha não impede os demais
+            sent_groups = []
+            for group in groups:
+                group_result = result["groups"][group.group_id]
+                if group_result["products"]:
+                    message = format_consolidated_message(
+                        group_result["products"],
+                        {
+                            "fetched": group_result["fetched"],
+                            "approved": group_result["approved"],
+                        },
+                    )
+                    try:
+                        with profiler.stage("send"):
+                            await context.bot.send_message(
+                                chat_id=group.group_id,
+                                text=message,
+                                parse_mode="HTML",
+                                disable_web_page_preview=True,
+                            )
+                    except Exception as e:
+                        logger.error("Erro ao enviar curadoria ao grupo %s: %s", group.group_id, e)
+                        continue
+                sent_groups.append(group)
+
+            # Marca produtos como enviados e finaliza run na mesma transação
+            items_sent = 0
+            with db.transaction():
+                for group in sent_groups:
+                    products = result["groups"][group.group_id]["products"]
+                    curator.deduplicator_for(group.dedup_days).mark_sent_batch(
+                        products, group.group_id, batch_id
+                    )
+                    items_sent += len(products)
+                db.record_run_stages(run_id, profiler.rows())
+                db.end_run(
+                    run_id,
+                    items_fetched=result["fetched"],
+                    items_approved=sum(r["approved"] for r in result["groups"].values()),
+                    items_sent=items_sent,
+                    error_summary=(
+                        None
+                        if len(sent_groups) == len(groups)
+                        else f"{len(groups) - len(sent_groups)} grupo(s) sem envio"
+                    ),
+                    success=True,
+                )
+
+            logger.info(
+                "Curadoria agendada concluída: %d buscados, %d enviados em %d/%d grupo(s)",
+                result["fetched"],
+                items_sent,
+                len(sent_groups),
+                len(groups),
+            )
+            return result
+
+        except Exception as e:
+            db.record_run_stages(run_id, profiler.rows())
+            db.end_run(
+                run_id,
+                items_fetched=0,
+                items_approved=0,
+                items_sent=0,
+                error_summary=str(e),
+                success=False,
+            )
+            raise
+
+
 async def scheduled_curation(context):
     """Job de curadoria agendada.
 
@@ -48,7 +173,6 @@ async def scheduled_curation(context):
     """
     logger.info("Iniciando curadoria agendada")
 
-    settings = get_settings()
     db: Database = context.bot_data.get("db")
     shopee: ShopeeClient = context.bot_data.get("shopee")
     curator: Curator = context.bot_data.get("curator")
@@ -57,92 +181,144 @@ async def scheduled_curation(context):
         logger.error("Sistema não disponível para curadoria agendada")
         return
 
-    # Inicia run
-    run_id = db.start_run("scheduled")
+    # Perfil atual (editável pelo bot com /perfil)
+    profiles: ProfileStore | None = context.bot_data.get("profiles")
+    profile = profiles.get() if profiles else CurationProfile()
+    groups = _scheduled_groups(context, curator)
 
+    # Serializa com a curadoria manual; se ela já cobre todos os grupos, reaproveita
+    runs: RunCoordinator = context.bot_data.setdefault("runs", RunCoordinator())
     try:
-        # Configurações (TODO: carregar do banco)
-        keywords = ["fone bluetooth", "smartwatch", "carregador rápido", "cabo usb", "fone ouvido"]
-        categories = None
-
-        # Executa curadoria
-        result = await curator.curate(keywords, categories)
-
-        # Envia no grupo
-        if result["products"]:
-            message = format_consolidated_message(
-                result["products"],
-                {
-                    "fetched": result["fetched"],
-                    "approved": result["approved"],
-                },
-            )
+        outcome = await runs.run(
+            [group.group_id for group in groups],
+            lambda: _scheduled_run(context, db, curator, groups, profile),
+            kind="scheduled",
+        )
+    except Exception as e:
+        logger.error(f"Erro na curadoria agendada: {e}")
+        return
 
-            await context.bot.send_message(
-                chat_id=settings.target_group_id,
-                text=message,
-                parse_mode="HTML",
-                disable_web_page_preview=True,
-            )
+    if outcome.coalesced:
+        logger.info("Curadoria agendada coberta pela execução em andamento; nada a enviar")
 
-            # Marca produtos como enviados
-            batch_id = datetime.now().strftime("%Y%m%d_%H%M_scheduled")
-            for product in result["products"]:
-                item_id = product.get("itemId")
-                short_link = product.get("shortLink", "")
-                if item_id and short_link:
-                    curator.deduplicator.mark_sent(
-                        item_id, settings.target_group_id, short_link, batch_id
-                    )
 
-        # Finaliza run
-        db.end_run(
-            run_id,
-            items_fetched=result["fetched"],
-            items_approved=result["approved"],
-            items_sent=result["final"],
-            success=True,
-        )
+async def prewarm_job(context):
+    """Job de pré-aquecimento: busca e gera links antes da curadoria agendada.
 
-        logger.info(
-            f"Curadoria agendada concluída: {result['fetched']} buscados, "
-            f"{result['approved']} aprovados, {result['final']} enviados"
+    Args:
+        context: Contexto do bot
+    """
+    curator: Curator = context.bot_data.get("curator")
+    if curator is None:
+        logger.error("Sistema não disponível para pré-aquecimento")
+        return
+
+    profiles: ProfileStore | None = context.bot_data.get("profiles")
+    profile = profiles.get() if profiles else CurationProfile()
+    try:
+        await curator.prewarm(
+            profile.keywords, _scheduled_groups(context, curator), profile.categories
         )
+    except Exception as e:
+        # A curadoria agendada segue normalmente, apenas sem caches quentes
+        logger.error("Erro no pré-aquecimento: %s", e)
 
+
+async def retention_job(context):
+    """Job de retenção: poda raw_json, links expirados, envios e histórico antigos.
+
+    Args:
+        context: Contexto do bot
+    """
+    settings = get_settings()
+    db: Database = context.bot_data.get("db")
+    curator: Curator = context.bot_data.get("curator")
+
+    if not all([db, curator]):
+        logger.error("Sistema não disponível para retenção")
+        return
+
+    policy = RetentionPolicy(
+        raw_json_days=settings.retention_raw_json_days,
+        link_days=settings.retention_link_days,
+        sent_factor=settings.retention_sent_factor,
+        price_history_days=settings.retention_price_history_days,
+        search_cache_seconds=settings.search_cache_ttl + settings.search_cache_stale,
+    )
+    try:
+        # Fora do event loop: a compactação pode segurar o lock de escrita
+        await asyncio.to_thread(run_retention, db, policy, curator.deduplicator.dedup_days)
     except Exception as e:
-        logger.error(f"Erro na curadoria agendada: {e}")
-        db.end_run(
-            run_id,
-            items_fetched=0,
-            items_approved=0,
-            items_sent=0,
-            error_summary=str(e),
-            success=False,
-        )
+        logger.error(f"Erro na retenção: {e}")
 
 
 def setup_scheduler(application: Application) -> AsyncIOScheduler:
     """Configura o scheduler para curadoria automática.
 
+    Os jobs ficam na tabela ``scheduler_jobs`` do banco: após um reinício, um
+    disparo perdido há menos de ``SCHEDULE_MISFIRE_GRACE`` segundos roda uma
+    única vez (disparos acumulados são agrupados) e o jitter espalha o início
+    das execuções.
+
     Args:
-        application: Aplicação do bot
+        application: Aplicação do bot (registrada para os jobs persistidos)
 
     Returns:
         Scheduler configurado
     """
     settings = get_settings()
-    scheduler = AsyncIOScheduler(timezone=settings.tz)
-
-    # Usa CronTrigger para fazer parse robusto do cron
-    trigger = CronTrigger.from_crontab(settings.schedule_cron, timezone=settings.tz)
+    register_application(application)
+    jobstore = DatabaseJobStore(application.bot_data["db"])
+    scheduler = AsyncIOScheduler(
+        timezone=settings.tz,
+        jobstores={"default": jobstore},
+        job_defaults={"coalesce": True, "max_instances": 1},
+    )
+    grace = settings.schedule_misfire_grace
 
     # Adiciona job de curadoria
-    scheduler.add_job(
-        scheduled_curation,
-        trigger=trigger,
-        id="curation_job",
+    ensure_job(
+        scheduler,
+        jobstore,
+        "curation_job",
+        "src.main:scheduled_curation",
+        cron_trigger(settings.schedule_cron, settings.tz, settings.schedule_jitter),
         name="Curadoria Automática",
-        args=(application,),
+        misfire_grace_time=grace,
+    )
+
+    # Pré-aquece buscas e links alguns minutos antes de cada curadoria
+    if settings.prewarm_minutes:
+        if settings.prewarm_minutes * 60 >= settings.search_cache_ttl + settings.search_cache_stale:
+            logger.warning(
+                "PREWARM_MINUTES=%d excede o cache de buscas; a curadoria buscará de novo "
+                "e só os links serão reaproveitados",
+                settings.prewarm_minutes,
+            )
+        lead = timedelta(minutes=settings.prewarm_minutes)
+        ensure_job(
+            scheduler,
+            jobstore,
+            "prewarm_job",
+            "src.main:prewarm_job",
+            # Sem jitter: precede o horário base da curadoria
+            LeadTrigger(cron_trigger(settings.schedule_cron, settings.tz), lead),
+            name="Pré-aquecimento da Curadoria",
+            # Atrasado além da antecedência, o pré-aquecimento perde o sentido
+            misfire_grace_time=int(lead.total_seconds()),
+        )
+    elif jobstore.lookup_job("prewarm_job"):
+        jobstore.remove_job("prewarm_job")
+
+    # Adiciona job diário de retenção
+    ensure_job(
+        scheduler,
+        jobstore,
+        "retention_job",
+        "src.main:retention_job",
+        cron_trigger(settings.retention_cron, settings.tz, settings.schedule_jitter),
+        name="Retenção de Dados",
+        misfire_grace_time=grace,
     )
 
     return scheduler
@@ -166,11 +342,30 @@ async def init_application() -> Application:
     # Inicializa banco de dados
     logger.info("Inicializando banco de dados...")
     conn = init_db(settings.db_path)
-    db = Database(settings.db_path)
+    db = Database(settings.db_path, compress_raw_json=settings.raw_json_compression)
+    if settings.raw_json_compression:
+        converted = db.compress_existing_raw_json()
+        if converted:
+            logger.info(f"raw_json comprimido em {converted} produtos existentes")
+    else:
+        # Novas linhas em texto: a migração precisa varrer a tabela de novo
+        db.set_setting(RAW_JSON_COMPRESSED_SETTING, False)
+    # Conversão única (VACUUM completo) antes do bot atender, e não no job de retenção
+    if db.enable_incremental_vacuum():
+        logger.info("Banco convertido para auto_vacuum incremental")
 
     # Inicializa cliente Shopee
     logger.info("Inicializando cliente Shopee API...")
-    shopee = ShopeeClient(settings.shopee_app_id, settings.shopee_secret)
+    search_cache = None
+    if settings.search_cache_ttl > 0:
+        search_cache = SearchCache(
+            ttl=settings.search_cache_ttl, stale_ttl=settings.search_cache_stale, db=db
+        )
+    shopee = ShopeeClient(settings.shopee_app_id, settings.shopee_secret, cache=search_cache)
+
+    # Perfil de curadoria (settings), aplicado ao curador a cada alteração
+    profiles = ProfileStore(db)
+    profile = profiles.get()
 
     # Inicializa curador
     logger.info("Inicializando curador...")
@@ -179,12 +374,31 @@ async def init_application() -> Application:
         db=db,
         group_id=str(settings.target_group_id),
         group_hash="g1",  # TODO: configurável
-        top_n=10,
-        max_pages=5,
-        page_limit=50,
+        top_n=profile.top_n,
+        max_pages=profile.max_pages,
+        page_limit=profile.page_limit,
         dedup_days=7,
-        weights=ScoreWeights(),  # TODO: configurável
+        weights=profile.weights,
+        thresholds=profile.thresholds,
+        streaming=True,
+        early_stop_pages=2,
     )
+    profiles.subscribe(
+        lambda name, changed: curator.apply_profile(changed) if name == DEFAULT_PROFILE else None
+    )
+
+    # Grupos da curadoria agendada: o principal mantém o hash "g1" dos links já
+    # gerados; os adicionais usam um hash do próprio ID
+    dedup_days = curator.deduplicator.dedup_days
+    groups = [GroupConfig(str(settings.target_group_id), curator.group_hash, dedup_days=dedup_days)]
+    groups += [
+        GroupConfig(str(group_id), group_hash_for(group_id), dedup_days=dedup_days)
+        for group_id in settings.extra_group_ids
+    ]
+    logger.info("Grupos da curadoria agendada: %s", [group.group_id for group in groups])
+
+    # Aquece índice de deduplicação em memória
+    curator.deduplicator.warm()
 
     # Cria aplicação Telegram com timeouts configurados
     logger.info("Inicializando bot Telegram...")
@@ -202,12 +416,16 @@ async def init_application() -> Application:
     application.bot_data["db"] = db
     application.bot_data["shopee"] = shopee
     application.bot_data["curator"] = curator
+    application.bot_data["groups"] = groups
+    application.bot_data["profiles"] = profiles
+    application.bot_data["runs"] = RunCoordinator()
 
     # Registra handlers
     application.add_handler(CommandHandler("start", menu_command))
     application.add_handler(CommandHandler("menu", menu_command))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("relatorio", report_command))
+    application.add_handler(CommandHandler("perfil", profile_command))
 
     # Callback handlers
     application.add_handler(CallbackQueryHandler(menu_callback, pattern=f"^{CallbackData.MENU}$"))
@@ -220,7 +438,13 @@ async def init_application() -> Application:
     application.add_handler(
         CallbackQueryHandler(curate_now_callback, pattern=f"^{CallbackData.CURATE_NOW}$")
     )
+    application.add_handler(
+        CallbackQueryHandler(cancel_curation_callback, pattern=f"^{CallbackData.CANCEL_CURATION}$")
+    )
     application.add_handler(CallbackQueryHandler(help_callback, pattern=f"^{CallbackData.HELP}$"))
+    application.add_handler(
+        CallbackQueryHandler(profile_callback, pattern=f"^{CallbackData.PROFILE}$")
+    )
 
     # Conversação de conversão de link
     # Importante: deve ser registrado ANTES de outros MessageHandlers
@@ -259,6 +483,7 @@ async def main():
 
     # Setup logger global com o nível configurado
     setup_logger("mariabicobot", level=settings.log_level)
+    logging.getLogger("mariabicobot").addHandler(MetricsLogHandler())
 
     logger.info("=" * 50)
     logger.info("MariaBicoBot v1.0.0")
@@ -268,6 +493,14 @@ async def main():
         # Inicializa aplicação
         application = await init_application()
 
+        # Endpoint de métricas (opcional)
+        if settings.metrics_port:
+            server = await start_metrics_server(settings.metrics_host, settings.metrics_port)
+            application.bot_data["metrics_server"] = server
+            logger.info(
+                f"Métricas em http://{settings.metrics_host}:{settings.metrics_port}/metrics"
+            )
+
         # Configura scheduler
         scheduler = setup_scheduler(application)
         scheduler.start()
@@ -314,6 +547,11 @@ async def shutdown(application: Application):
     await application.stop()
     await application.shutdown()
 
+    # Fecha endpoint de métricas
+    metrics_server = application.bot_data.get("metrics_server")
+    if metrics_server:
+        metrics_server.close()
+
     # Fecha cliente Shopee
     shopee: ShopeeClient = application.bot_data.get("shopee")
     if shopee:
@@ -1,5 +1,6 @@
 """Cliente Shopee Affiliate API."""
 
+from .cache import SearchCache
 from .client import ShopeeAPIError, ShopeeClient
 from .queries import (
     PRODUCT_OFFER_V2_QUERY,
@@ -10,6 +11,7 @@ from .queries import (
 __all__ = [
     "ShopeeClient",
     "ShopeeAPIError",
+    "SearchCache",
     "PRODUCT_OFFER_V2_QUERY",
     "build_product_offer_variables",
     "get_short_link_query",
@@ -0,0 +1,135 @@
+"""Cache das respostas de busca (productOfferV2)."""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from src.database import Database
+from src.utils.logger import get_logger
+from src.utils.metrics import REGISTRY
+
+logger = get_logger("mariabicobot", "shopee_client")
+
+SEARCH_CACHE = REGISTRY.counter(
+    "shopee_search_cache_total", "Buscas atendidas pelo cache por resultado", ("result",)
+)
+
+Fetch = Callable[[], Awaitable[list[dict]]]
+
+
+class SearchCache:
+    """Cache de ``search_products`` em memória (LRU) e, opcionalmente, no SQLite.
+
+    Uma resposta com até ``ttl`` segundos é servida direto. Entre ``ttl`` e
+    ``ttl + stale_ttl`` ela ainda é servida, mas dispara uma atualização em
+    segundo plano (stale-while-revalidate). Mais velha que isso, a busca espera
+    a API. Buscas simultâneas da mesma chave compartilham uma única requisição.
+    Erros não são guardados.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600,
+        stale_ttl: float = 0,
+        db: Database | None = None,
+        max_entries: int = 512,
+    ):
+        """Inicializa o cache.
+
+        Args:
+            ttl: Segundos em que uma resposta é considerada atual
+            stale_ttl: Segundos extras em que a resposta ainda é servida
+                enquanto é atualizada em segundo plano (0 desliga)
+            db: Banco para persistir as respostas entre reinícios (opcional)
+            max_entries: Respostas mantidas em memória
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.db = db
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def key(variables: dict) -> str:
+        """Chave de uma busca a partir das variáveis da query."""
+        return json.dumps(variables, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+    @property
+    def max_age(self) -> float:
+        """Idade a partir da qual uma resposta não é mais servida."""
+        return self.ttl + self.stale_ttl
+
+    def _lookup(self, key: str) -> tuple[float, list[dict]] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.db is None:
+            return None
+        entry = self.db.get_search_cache(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: tuple[float, list[dict]]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _fetch_and_store(self, key: str, fetch: Fetch) -> list[dict]:
+        nodes = await fetch()
+        fetched_at = time.time()
+        self._remember(key, (fetched_at, nodes))
+        if self.db is not None:
+            self.db.put_search_cache(key, nodes, fetched_at)
+        return nodes
+
+    def _start_fetch(self, key: str, fetch: Fetch) -> asyncio.Task:
+        """Inicia (ou reaproveita) a busca em andamento da chave."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Falha ao atualizar busca em cache: %s", task.exception())
+
+    async def get_or_fetch(self, key: str, fetch: Fetch, refresh: bool = False) -> list[dict]:
+        """Retorna a resposta em cache ou chama ``fetch``.
+
+        Args:
+            key: Chave da busca (ver ``key``)
+            fetch: Corrotina que busca na API
+            refresh: Ignora o cache e busca de novo (o resultado é guardado)
+
+        Returns:
+            Ofertas da busca
+        """
+        entry = None if refresh else self._lookup(key)
+        if entry is not None:
+            fetched_at, nodes = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                SEARCH_CACHE.inc(result="hit")
+                return list(nodes)
+            if age < self.max_age:
+                SEARCH_CACHE.inc(result="stale")
+                if key not in self._inflight:
+                    self._start_fetch(key, fetch).add_done_callback(self._log_refresh_error)
+                return list(nodes)
+
+        SEARCH_CACHE.inc(result="miss")
+        # shield: o cancelamento de quem espera não cancela a busca compartilhada
+        return list(await asyncio.shield(self._start_fetch(key, fetch)))
+
+    def clear(self) -> None:
+        """Descarta as respostas em memória."""
+        self._entries.clear()
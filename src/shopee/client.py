@@ -6,6 +6,7 @@ import json
 import httpx
 
 from .auth import get_auth_headers
+from .cache import SearchCache
 from .queries import (
     CONVERSION_REPORT_QUERY,
     PRODUCT_OFFER_V2_QUERY,
@@ -14,9 +15,20 @@ from .queries import (
     get_short_link_query,
 )
 from src.utils.logger import get_logger
+from src.utils.metrics import REGISTRY, SlidingWindowCounter
 
 logger = get_logger("mariabicobot", "shopee_client")
 
+REQUEST_SECONDS = REGISTRY.histogram(
+    "shopee_request_duration_seconds", "Latência de cada tentativa HTTP à API Shopee"
+)
+REQUESTS = REGISTRY.counter(
+    "shopee_requests_total", "Tentativas HTTP à API Shopee por resultado", ("outcome",)
+)
+REQUESTS_LAST_HOUR = REGISTRY.gauge(
+    "shopee_requests_last_hour", "Tentativas HTTP na última hora (cota da API)"
+)
+
 SHOPEE_API_URL = "https://open-api.affiliate.shopee.com.br/graphql"
 RETRY_DELAYS = [1, 2, 4]
 
@@ -32,16 +44,24 @@ class ShopeeAPIError(Exception):
 class ShopeeClient:
     """Cliente para Shopee Affiliate GraphQL API."""
 
-    def __init__(self, app_id: str, secret: str):
+    def __init__(self, app_id: str, secret: str, cache: SearchCache | None = None):
         """Inicializa o cliente.
 
         Args:
             app_id: App ID da Shopee
             secret: Secret key da Shopee
+            cache: Cache das respostas de ``search_products`` (opcional)
         """
         self.app_id = app_id
         self.secret = secret
+        self.cache = cache
         self.client = httpx.AsyncClient(timeout=30.0)
+        # Contadores acumulados (tentativas HTTP e novas tentativas)
+        self.request_count = 0
+        self.retry_count = 0
+        # Janela de 1h para acompanhar a cota da API
+        self.recent_requests = SlidingWindowCounter(3600)
+        REQUESTS_LAST_HOUR.set_function(self.recent_requests.total)
 
     async def close(self):
         """Fecha a sessão do cliente."""
@@ -57,12 +77,17 @@ class ShopeeClient:
         last_error = None
 
         for attempt, delay in enumerate(RETRY_DELAYS):
+            self.request_count += 1
+            self.recent_requests.add()
+            if attempt:
+                self.retry_count += 1
             try:
-                response = await self.client.post(
-                    SHOPEE_API_URL,
-                    content=payload_json,
-                    headers=headers,
-                )
+                with REQUEST_SECONDS.time():
+                    response = await self.client.post(
+                        SHOPEE_API_URL,
+                        content=payload_json,
+                        headers=headers,
+                    )
                 response.raise_for_status()
                 data = response.json()
 
@@ -73,6 +98,7 @@ class ShopeeClient:
 
                     # Se for erro de auth, tenta de novo
                     if code == "10020" and attempt < len(RETRY_DELAYS) - 1:
+                        REQUESTS.inc(outcome="auth_retry")
                         logger.warning(
                             f"Erro de autenticação (tentativa {attempt + 1}), tentando novamente..."
                         )
@@ -80,9 +106,11 @@ class ShopeeClient:
 
                     raise ShopeeAPIError(f"GraphQL Error: {message}", code=code)
 
+                REQUESTS.inc(outcome="ok")
                 return data
 
             except (httpx.HTTPError, ShopeeAPIError) as e:
+                REQUESTS.inc(outcome="error")
                 last_error = e
                 logger.warning(f"Erro na requisição (tentativa {attempt + 1}): {e}")
                 if attempt < len(RETRY_DELAYS) - 1:
@@ -99,15 +127,25 @@ class ShopeeClient:
         shop_id: int | None = None,
         list_type: int = 1,
         sort_type: int = 5,
+        refresh: bool = False,
     ) -> list[dict]:
-        """Busca produtos via productOfferV2."""
+        """Busca produtos via productOfferV2.
+
+        Com ``cache`` configurado, buscas repetidas (mesmas keyword, página,
+        limite, categoria, loja e ordenação) são servidas do cache;
+        ``refresh=True`` força uma nova chamada e atualiza o cache.
+        """
         variables = build_product_offer_variables(
             keywords, limit, page, category_id, shop_id, list_type, sort_type
         )
-        data = await self._request(PRODUCT_OFFER_V2_QUERY, variables)
 
-        nodes = data.get("data", {}).get("productOfferV2", {}).get("nodes", [])
-        return nodes
+        async def fetch() -> list[dict]:
+            data = await self._request(PRODUCT_OFFER_V2_QUERY, variables)
+            return data.get("data", {}).get("productOfferV2", {}).get("nodes", [])
+
+        if self.cache is None:
+            return await fetch()
+        return await self.cache.get_or_fetch(SearchCache.key(variables), fetch, refresh=refresh)
 
     async def _fetch_report(
         self,
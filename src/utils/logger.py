@@ -1,9 +1,18 @@
 """Logging estruturado em JSON para o MariaBicoBot."""
 
+import atexit
+import copy
 import json
 import logging
+import queue
 import sys
+from collections.abc import Callable
+from contextvars import ContextVar, Token
 from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, TextIO
+
+from src.utils.metrics import REGISTRY
 
 # Componentes do sistema
 COMPONENTS = [
@@ -16,6 +25,41 @@ COMPONENTS = [
     "scheduler",
 ]
 
+# Registros aguardando formatação/escrita; acima disso novos logs são descartados
+LOG_QUEUE_SIZE = 10_000
+
+LOG_DROPPED = REGISTRY.counter(
+    "log_records_dropped_total", "Logs descartados com a fila de logging cheia"
+)
+
+_listeners: list[QueueListener] = []
+
+# Contexto de correlação (run_id, batch_id, update_id...) do fluxo atual. Cada
+# task asyncio herda uma cópia do contexto de quem a criou.
+_log_context: ContextVar[dict[str, Any] | None] = ContextVar("log_context", default=None)
+
+
+def get_log_context() -> dict[str, Any]:
+    """Retorna uma cópia do contexto de correlação atual."""
+    return dict(_log_context.get() or {})
+
+
+def bind_log_context(**context: Any) -> Token:
+    """Acrescenta campos ao contexto de correlação do fluxo atual.
+
+    Args:
+        **context: Campos a acrescentar (ex: run_id=42)
+
+    Returns:
+        Token para desfazer com ``reset_log_context``
+    """
+    return _log_context.set({**(_log_context.get() or {}), **context})
+
+
+def reset_log_context(token: Token) -> None:
+    """Restaura o contexto anterior a um ``bind_log_context``."""
+    _log_context.reset(token)
+
 
 class JSONFormatter(logging.Formatter):
     """Formatter que outputa logs em JSON estruturado."""
@@ -38,7 +82,84 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data, ensure_ascii=False)
+        # default=str: valores do contexto nem sempre são serializáveis
+        return json.dumps(log_data, ensure_ascii=False, default=str)
+
+
+class LogContextFilter(logging.Filter):
+    """Copia o contexto de correlação para ``record.context``.
+
+    Roda na thread de origem do log (antes da fila), onde o contexto do fluxo
+    ainda está acessível. Um ``extra={"context": {...}}`` explícito prevalece.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if context:
+            explicit = getattr(record, "context", None)
+            record.context = {**context, **explicit} if explicit else context
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloqueia: com a fila cheia o registro é descartado."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Interpola a mensagem na thread de origem (os args podem mudar depois).
+
+        JSON, timestamp e traceback ficam para o JSONFormatter na thread do
+        listener.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_DROPPED.inc()
+
+
+def build_queue_logging(
+    stream: TextIO,
+    level: int,
+    maxsize: int = LOG_QUEUE_SIZE,
+) -> tuple[DroppingQueueHandler, QueueListener]:
+    """Monta o par handler/listener que escreve JSON em ``stream`` numa thread.
+
+    Args:
+        stream: Destino dos logs
+        level: Nível mínimo
+        maxsize: Capacidade da fila
+
+    Returns:
+        (handler para o logger, listener ainda não iniciado)
+    """
+    output = logging.StreamHandler(stream)
+    output.setLevel(level)
+    output.setFormatter(JSONFormatter())
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=maxsize))
+    handler.setLevel(level)
+    handler.addFilter(LogContextFilter())
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    return handler, listener
+
+
+def stop_logging() -> None:
+    """Esvazia a fila e para os listeners (chamado também no atexit)."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_logging)
 
 
 def setup_logger(
@@ -69,10 +190,11 @@ def setup_logger(
         log_level = level
     logger.setLevel(log_level)
 
-    # Handler para stdout
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(log_level)
-    handler.setFormatter(JSONFormatter())
+    # Formatação e escrita em stdout rodam na thread do listener, fora do
+    # event loop
+    handler, listener = build_queue_logging(sys.stdout, log_level)
+    listener.start()
+    _listeners.append(listener)
 
     logger.addHandler(handler)
 
@@ -94,20 +216,90 @@ def get_logger(name: str, component: str, level: int = logging.INFO) -> logging.
     return setup_logger(name, component=component, level=level)
 
 
+class lazy:
+    """Adia um cálculo caro para o momento em que a mensagem é formatada.
+
+    Uso: ``logger.debug("Top: %s", lazy(lambda: resumo(produtos)))``. Como
+    argumento de um log em estilo ``%``, ``fn`` só é chamada se o nível estiver
+    habilitado (a interpolação acontece em ``record.getMessage()``).
+    """
+
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+
+    def __str__(self) -> str:
+        return str(self.fn())
+
+    def __repr__(self) -> str:
+        return repr(self.fn())
+
+
+class LogSampler:
+    """Amostragem de um ponto de log quente: emite 1 a cada ``every`` chamadas.
+
+    Todas as chamadas são contadas; a mensagem emitida recebe o total
+    acumulado. A primeira chamada é sempre emitida. Com o nível desabilitado
+    o custo é um incremento e uma checagem de nível.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger | logging.LoggerAdapter,
+        every: int = 100,
+        level: int = logging.DEBUG,
+    ):
+        """Inicializa o sampler.
+
+        Args:
+            logger: Logger (ou adapter) de destino
+            every: Emite uma mensagem a cada N chamadas
+            level: Nível das mensagens
+        """
+        self.logger = logger
+        self.every = max(every, 1)
+        self.level = level
+        self.count = 0
+
+    def __call__(self, msg: str, *args: Any) -> None:
+        """Conta a ocorrência e loga se for a vez desta chamada."""
+        self.count += 1
+        if (self.count - 1) % self.every:
+            return
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self.logger.log(self.level, msg + " [%d ocorrência(s)]", *args, self.count)
+
+
 class LogContext:
-    """Context manager para adicionar contexto aos logs."""
+    """Context manager que acrescenta campos de correlação aos logs do bloco.
+
+    Vale para todos os loggers e para as tasks asyncio criadas dentro do
+    bloco. Os campos aparecem em ``context`` no JSON.
+
+    Exemplo::
+
+        with LogContext(run_id=run_id):
+            await curator.curate(keywords)
+    """
+
+    def __init__(self, logger: logging.LoggerAdapter | None = None, **context: Any):
+        """Inicializa o contexto.
 
-    def __init__(self, logger: logging.LoggerAdapter, **context):
+        Args:
+            logger: Retornado no ``with`` (compatibilidade; opcional)
+            **context: Campos de correlação
+        """
         self.logger = logger
         self.context = context
-        self.old_context = {}
+        self._token: Token | None = None
 
     def __enter__(self):
-        if hasattr(self.logger, "extra"):
-            self.old_context = self.logger.extra.copy()
-            self.logger.extra.update(self.context)
+        self._token = bind_log_context(**self.context)
         return self.logger
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if hasattr(self.logger, "extra"):
-            self.logger.extra = self.old_context
+        if self._token is not None:
+            reset_log_context(self._token)
+            self._token = None
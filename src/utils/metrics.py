@@ -0,0 +1,346 @@
+"""Métricas em processo no formato de exposição texto do Prometheus."""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+# Buckets de latência em segundos (de chamadas rápidas ao banco a curadorias)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC):
+    """Base das métricas: nome, ajuda e valores por combinação de labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} espera labels {self.labelnames}, recebeu {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> list[tuple[str, str, float]]:
+        """Retorna (sufixo, labels formatados, valor) de cada série."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Contador monotônico."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Incrementa o contador."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Valor atual da série."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """Valor que sobe e desce; pode ser calculado na leitura com ``set_function``."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels: str) -> None:
+        """Define o valor."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Soma ao valor."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Calcula o valor (sem labels) a cada leitura."""
+        self._function = function
+
+    def value(self, **labels: str) -> float:
+        """Valor atual da série."""
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        if self._function is not None:
+            return [("", "", self._function())]
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    """Distribuição de valores (ex: latência) em buckets cumulativos."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Por série: [contagem por bucket (não cumulativa), soma, total]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Registra uma observação."""
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observa a duração do bloco em segundos."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Quantidade de observações da série."""
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()]
+        samples = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels((*self.labelnames, "le"), (*key, _format_value(bound)))
+                samples.append(("_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, count))
+        return samples
+
+
+class SlidingWindowCounter:
+    """Conta eventos numa janela móvel, agrupados em buckets de tempo.
+
+    A memória fica limitada a ``window_seconds / bucket_seconds`` buckets.
+    """
+
+    def __init__(self, window_seconds: float, bucket_seconds: float = 60):
+        """Inicializa a janela.
+
+        Args:
+            window_seconds: Tamanho da janela
+            bucket_seconds: Resolução da janela
+        """
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._buckets: deque[list] = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= cutoff:
+            self._buckets.popleft()
+
+    def add(self, amount: int = 1, now: float | None = None) -> None:
+        """Registra eventos."""
+        now = time.time() if now is None else now
+        start = now - (now % self.bucket_seconds)
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] == start:
+                self._buckets[-1][1] += amount
+            else:
+                self._buckets.append([start, amount])
+            self._expire(now)
+
+    def total(self, now: float | None = None) -> int:
+        """Eventos dentro da janela."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            return sum(count for _, count in self._buckets)
+
+
+class MetricsRegistry:
+    """Registro de métricas; ``counter``/``gauge``/``histogram`` são idempotentes por nome."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Métrica {name} já registrada como {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def render(self) -> str:
+        """Exposição texto (``text/plain; version=0.0.4``)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Registro padrão do processo
+REGISTRY = MetricsRegistry()
+
+PROCESS_START_TIME = time.time()
+REGISTRY.gauge("process_start_time_seconds", "Início do processo (epoch)").set_function(
+    lambda: PROCESS_START_TIME
+)
+
+# Erros logados (nível ERROR ou acima), ver MetricsLogHandler
+LOG_ERRORS = REGISTRY.counter("log_errors_total", "Logs com nível ERROR ou acima")
+RECENT_ERRORS = SlidingWindowCounter(24 * 3600, bucket_seconds=300)
+
+
+def uptime_seconds() -> float:
+    """Segundos desde o início do processo."""
+    return time.time() - PROCESS_START_TIME
+
+
+class MetricsLogHandler(logging.Handler):
+    """Conta logs de erro em ``log_errors_total`` e na janela de 24h."""
+
+    def __init__(self, level: int = logging.ERROR):
+        super().__init__(level)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        LOG_ERRORS.inc()
+        RECENT_ERRORS.add()
+
+
+async def start_metrics_server(
+    host: str,
+    port: int,
+    registry: MetricsRegistry = REGISTRY,
+) -> asyncio.AbstractServer:
+    """Sobe um endpoint HTTP mínimo que responde ``GET /metrics``.
+
+    Args:
+        host: Interface (use 127.0.0.1 para acesso apenas local)
+        port: Porta TCP (0 escolhe uma livre)
+        registry: Registro exposto
+
+    Returns:
+        Servidor asyncio (feche com ``server.close()``)
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Descarta os headers
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (
+                b"\r\n",
+                b"\n",
+                b"",
+            ):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = registry.render().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status = "404 Not Found"
+                body = b"not found\n"
+                content_type = "text/plain; charset=utf-8"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,233 @@
+"""Triggers, job store e registro de aplicações do APScheduler."""
+
+import pickle
+from datetime import datetime, timedelta
+from typing import Any
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.schedulers.base import BaseScheduler
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.util import datetime_to_utc_timestamp, ref_to_obj, utc_timestamp_to_datetime
+
+from src.database import Database
+from src.utils.logger import get_logger
+
+logger = get_logger("mariabicobot", "scheduler")
+
+# Aplicações disponíveis aos jobs persistidos (um job guarda apenas o nome)
+_applications: dict[str, Any] = {}
+
+
+def register_application(application: Any, name: str = "default") -> None:
+    """Registra a aplicação que os jobs recebem como contexto."""
+    _applications[name] = application
+
+
+def get_application(name: str = "default") -> Any:
+    """Retorna a aplicação registrada.
+
+    Raises:
+        LookupError: Se nenhuma aplicação foi registrada com o nome
+    """
+    try:
+        return _applications[name]
+    except KeyError:
+        raise LookupError(f"Aplicação '{name}' não registrada") from None
+
+
+async def run_with_application(func_ref: str, name: str = "default") -> None:
+    """Executa ``func_ref`` (ex: ``"src.main:scheduled_curation"``) com o contexto do bot.
+
+    É a função gravada nos jobs persistidos: apenas referências textuais e o
+    nome da aplicação vão para o banco, e a função recebe um
+    ``CallbackContext`` da aplicação registrada (``bot_data`` e ``bot``),
+    como os handlers do Telegram.
+    """
+    application = get_application(name)
+    await ref_to_obj(func_ref)(application.context_types.context(application))
+
+
+def cron_trigger(expr: str, timezone: str, jitter: int | None = None) -> CronTrigger:
+    """``CronTrigger`` a partir de uma expressão crontab de 5 campos, com jitter.
+
+    Args:
+        expr: Expressão crontab (minuto hora dia mês dia_da_semana)
+        timezone: Fuso horário
+        jitter: Atraso aleatório máximo em segundos em cada disparo
+
+    Raises:
+        ValueError: Se a expressão não tiver 5 campos
+    """
+    values = expr.split()
+    if len(values) != 5:
+        raise ValueError(f"Expressão cron inválida (esperados 5 campos): '{expr}'")
+    minute, hour, day, month, day_of_week = values
+    return CronTrigger(
+        minute=minute,
+        hour=hour,
+        day=day,
+        month=month,
+        day_of_week=day_of_week,
+        timezone=timezone,
+        jitter=jitter or None,
+    )
+
+
+def ensure_job(
+    scheduler: BaseScheduler,
+    jobstore: BaseJobStore,
+    job_id: str,
+    func_ref: str,
+    trigger: BaseTrigger,
+    **kwargs: Any,
+) -> Job:
+    """Agenda um job persistido sem perder o horário salvo.
+
+    Com o mesmo trigger e função já gravados, a próxima execução salva antes
+    do reinício é mantida e, se já passou, é tratada como atrasada
+    (``misfire_grace_time``/``coalesce``). Se o agendamento mudou, o job é
+    recalculado a partir de agora. As demais opções sempre são atualizadas.
+
+    Args:
+        scheduler: Scheduler (antes de ``start``)
+        jobstore: Job store em que o job é gravado
+        job_id: Id do job
+        func_ref: Referência ``"modulo:funcao"`` executada por ``run_with_application``
+        trigger: Trigger do job
+        **kwargs: Demais opções de ``add_job`` (name, misfire_grace_time...)
+
+    Returns:
+        Job agendado
+    """
+    existing = jobstore.lookup_job(job_id)
+    if (
+        existing is not None
+        and existing.args == (func_ref,)
+        and repr(existing.trigger) == repr(trigger)
+    ):
+        kwargs["next_run_time"] = existing.next_run_time
+        logger.info("Job '%s' mantido; próxima execução: %s", job_id, existing.next_run_time)
+    else:
+        logger.info("Job '%s' agendado: %s", job_id, trigger)
+
+    return scheduler.add_job(
+        run_with_application,
+        trigger=trigger,
+        args=(func_ref,),
+        id=job_id,
+        replace_existing=True,
+        **kwargs,
+    )
+
+
+class LeadTrigger(BaseTrigger):
+    """Dispara um intervalo fixo antes de cada disparo de outro trigger.
+
+    Ex: ``LeadTrigger(CronTrigger.from_crontab("0 */12 * * *"), timedelta(minutes=5))``
+    dispara às 11:55 e 23:55. Um disparo do trigger base que já está a menos
+    de ``lead`` do momento atual é pulado.
+    """
+
+    def __init__(self, trigger: BaseTrigger, lead: timedelta):
+        """Inicializa o trigger.
+
+        Args:
+            trigger: Trigger de referência (ex: o cron da curadoria)
+            lead: Antecedência em relação a cada disparo de ``trigger``
+        """
+        self.trigger = trigger
+        self.lead = lead
+
+    def get_next_fire_time(
+        self, previous_fire_time: datetime | None, now: datetime
+    ) -> datetime | None:
+        previous = previous_fire_time + self.lead if previous_fire_time else None
+        fire_time = self.trigger.get_next_fire_time(previous, now + self.lead)
+        return fire_time - self.lead if fire_time else None
+
+    def __str__(self) -> str:
+        return f"{self.trigger} - {self.lead}"
+
+    def __repr__(self) -> str:
+        return f"<LeadTrigger (trigger={self.trigger!r}, lead={self.lead!r})>"
+
+
+class DatabaseJobStore(BaseJobStore):
+    """Job store do APScheduler na tabela ``scheduler_jobs`` do banco do bot.
+
+    Equivalente ao ``SQLAlchemyJobStore`` sem depender do SQLAlchemy: o
+    estado de cada job é serializado com pickle, então função e argumentos
+    precisam ser referências importáveis (ver ``run_with_application``).
+    """
+
+    def __init__(self, db: Database, pickle_protocol: int = pickle.HIGHEST_PROTOCOL):
+        """Inicializa o job store.
+
+        Args:
+            db: Banco já migrado (tabela ``scheduler_jobs``)
+            pickle_protocol: Protocolo do pickle
+        """
+        super().__init__()
+        self.db = db
+        self.pickle_protocol = pickle_protocol
+
+    def _serialize(self, job: Job) -> tuple[float | None, bytes]:
+        return (
+            datetime_to_utc_timestamp(job.next_run_time),
+            pickle.dumps(job.__getstate__(), self.pickle_protocol),
+        )
+
+    def _reconstitute_job(self, job_state: bytes) -> Job:
+        state = pickle.loads(job_state)
+        state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _restore(self, rows: list[tuple[str, bytes]]) -> list[Job]:
+        """Restaura os jobs; os que não podem ser restaurados são removidos."""
+        jobs, failed = [], []
+        for job_id, job_state in rows:
+            try:
+                jobs.append(self._reconstitute_job(job_state))
+            except Exception:
+                logger.exception("Não foi possível restaurar o job '%s'; removendo", job_id)
+                failed.append(job_id)
+        if failed:
+            self.db.delete_scheduler_jobs(failed)
+        return jobs
+
+    def lookup_job(self, job_id: str) -> Job | None:
+        job_state = self.db.get_scheduler_job(job_id)
+        return self._reconstitute_job(job_state) if job_state else None
+
+    def get_due_jobs(self, now: datetime) -> list[Job]:
+        return self._restore(self.db.get_scheduler_jobs(datetime_to_utc_timestamp(now)))
+
+    def get_next_run_time(self) -> datetime | None:
+        return utc_timestamp_to_datetime(self.db.get_next_scheduler_run())
+
+    def get_all_jobs(self) -> list[Job]:
+        return self._restore(self.db.get_scheduler_jobs())
+
+    def add_job(self, job: Job) -> None:
+        if not self.db.insert_scheduler_job(job.id, *self._serialize(job)):
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job: Job) -> None:
+        if not self.db.update_scheduler_job(job.id, *self._serialize(job)):
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id: str) -> None:
+        if not self.db.delete_scheduler_jobs([job_id]):
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self) -> None:
+        self.db.delete_scheduler_jobs()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} (db={self.db.db_path})>"
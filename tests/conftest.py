@@ -62,10 +62,12 @@ def temp_db_path() -> Generator[str, None, None]:
         init_db(path)
         yield path
     finally:
-        try:
-            os.unlink(path)
-        except OSError:
-            pass
+        # Remove também os arquivos do modo WAL
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.unlink(path + suffix)
+            except OSError:
+                pass
 
 
 @pytest.fixture(scope="function")
@@ -204,6 +204,241 @@ class TestCuratorIntegration:
             assert prod["shortLink"]  # Não vazio
 
 
+class TestCuratorOfferMerge:
+    """Testes para deduplicação de ofertas entre keywords."""
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_fetch_merges_same_item_across_keywords(self, curator):
+        """Mesmo itemId em várias keywords vira um único produto."""
+        offer = {
+            "itemId": 42,
+            "productName": "Fone",
+            "priceMin": "100.00",
+            "commissionRate": "0.10",
+            "commission": "10.00",
+            "offerLink": "https://shope.ee/42",
+        }
+        better = {**offer, "commission": "20.00"}
+
+        curator.max_pages = 1
+        curator.shopee.search_products = AsyncMock(side_effect=[[offer], [better], [offer]])
+
+        products = await curator.fetch_products(["fone bluetooth", "fone ouvido", "fone"])
+
+        assert len(products) == 1
+        assert products[0]["commission"] == 20.0
+        assert products[0]["keyword"] == "fone ouvido"
+        assert products[0]["keywords"] == ["fone bluetooth", "fone ouvido", "fone"]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_curate_never_repeats_item(self, curator):
+        """Top N não contém o mesmo itemId duas vezes."""
+        offer = {
+            "itemId": 7,
+            "productName": "Produto",
+            "priceMin": "100.00",
+            "priceDiscountRate": 20,
+            "commissionRate": "0.10",
+            "commission": "10.00",
+            "offerLink": "https://shope.ee/7",
+        }
+        curator.shopee.search_products = AsyncMock(return_value=[offer])
+
+        result = await curator.curate(keywords=["a", "b"], categories=None)
+
+        assert result["fetched"] == 1
+        ids = [p["itemId"] for p in result["products"]]
+        assert len(ids) == len(set(ids))
+
+
+class TestCuratorStreaming:
+    """Testes para o modo streaming da curadoria."""
+
+    @staticmethod
+    def _offers(page: int) -> list[dict]:
+        return [
+            {
+                "itemId": page * 100 + i,
+                "productName": f"Produto {page}-{i}",
+                "priceMin": "100.00",
+                "priceDiscountRate": 10 + i,
+                "commissionRate": "0.10",
+                "commission": f"{5 + i + page}.00",
+                "offerLink": f"https://shope.ee/{page}{i}",
+            }
+            for i in range(5)
+        ]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_streaming_matches_batch(self, curator):
+        """Streaming seleciona os mesmos produtos que o modo batch."""
+        from src.core import FilterThresholds
+
+        pages = [self._offers(1), self._offers(2), self._offers(1)]
+        # Ofertas normalizadas não trazem priceDiscountRate
+        curator.thresholds = FilterThresholds(discount_min_pct=0, commission_min_brl=7)
+        curator.top_n = 3
+        curator.max_pages = 1
+
+        curator.shopee.search_products = AsyncMock(side_effect=list(pages))
+        batch = await curator.curate(keywords=["a", "b", "c"])
+
+        curator.streaming = True
+        curator.shopee.search_products = AsyncMock(side_effect=list(pages))
+        streamed = await curator.curate(keywords=["a", "b", "c"])
+
+        assert [p["itemId"] for p in streamed["products"]] == [
+            p["itemId"] for p in batch["products"]
+        ]
+        assert streamed["fetched"] == batch["fetched"] == 10
+        assert streamed["approved"] == batch["approved"]
+        assert streamed["filter_stats"] == batch["filter_stats"]
+        assert 0 < batch["approved"] < batch["fetched"]
+
+    @pytest.mark.integration
+    @pytest.mark.database
+    @pytest.mark.asyncio
+    async def test_streaming_skips_recently_sent(self, curator, db):
+        """Produtos enviados recentemente não entram no top-K."""
+        from src.core import FilterThresholds
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        offers = self._offers(1)
+        best = curator._normalize_offer(offers[-1])
+        db.upsert_product(best)
+        db.mark_as_sent(int(best["itemId"]), curator.group_id, "https://test.link", "b1")
+
+        curator.streaming = True
+        curator.max_pages = 1
+        curator.shopee.search_products = AsyncMock(return_value=offers)
+
+        result = await curator.curate(keywords=["a"])
+
+        ids = [p["itemId"] for p in result["products"]]
+        assert best["itemId"] not in ids
+        assert len(ids) == 4
+        assert db.get_product(int(offers[0]["itemId"])) is not None
+
+
+class TestCuratorEarlyStop:
+    """Testes para parada antecipada da paginação."""
+
+    @staticmethod
+    def _page(page: int, commission: float) -> list[dict]:
+        return [
+            {
+                "itemId": page * 100 + i,
+                "productName": f"Produto {page}-{i}",
+                "priceMin": "100.00",
+                "commissionRate": "0.10",
+                "commission": str(commission),
+                "offerLink": f"https://shope.ee/{page}{i}",
+            }
+            for i in range(3)
+        ]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_stops_keyword_without_candidates(self, curator):
+        """Para de paginar quando páginas não superam o top-N."""
+        from src.core import FilterThresholds
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.streaming = True
+        curator.top_n = 3
+        curator.max_pages = 5
+        curator.early_stop_pages = 1
+        curator.shopee.search_products = AsyncMock(
+            side_effect=[self._page(p, 50 - p * 10) for p in range(1, 6)]
+        )
+
+        result = await curator.curate(keywords=["fone"])
+
+        # Página 1 enche o top-3; página 2 não tem candidatos acima dele
+        assert curator.shopee.search_products.call_count == 2
+        assert result["fetch_stats"]["fone"] == {
+            "pages_fetched": 2,
+            "pages_saved": 3,
+            "stopped_early": True,
+        }
+        assert [p["itemId"] for p in result["products"]] == ["100", "101", "102"]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_keeps_paging_while_pages_improve(self, curator):
+        """Continua paginando enquanto surgem candidatos melhores."""
+        from src.core import FilterThresholds
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.streaming = True
+        curator.top_n = 3
+        curator.max_pages = 3
+        curator.early_stop_pages = 1
+        curator.shopee.search_products = AsyncMock(
+            side_effect=[self._page(p, 10 + p * 10) for p in range(1, 4)]
+        )
+
+        result = await curator.curate(keywords=["fone"])
+
+        assert curator.shopee.search_products.call_count == 3
+        assert result["fetch_stats"]["fone"]["stopped_early"] is False
+        assert [p["itemId"] for p in result["products"]] == ["300", "301", "302"]
+
+
+class TestCuratorFilterStats:
+    """Testes para estatísticas de filtragem."""
+
+    @pytest.mark.unit
+    def test_filter_products_counts_every_reason(self, curator):
+        """Conta reprovações por motivo, incluindo vendas e avaliação."""
+        from src.core import FilterThresholds
+
+        curator.thresholds = FilterThresholds(sales_min=50, rating_min=4.5)
+        base = {
+            "commissionRate": 0.10,
+            "commission": 10.0,
+            "priceDiscountRate": 20,
+            "priceMin": 100,
+            "sales": 100,
+            "rating": 4.8,
+        }
+        products = [
+            base,
+            {**base, "commissionRate": 0.01},
+            {**base, "priceDiscountRate": 1},
+            {**base, "sales": 10},
+            {**base, "rating": 3.0},
+        ]
+
+        filtered, stats = curator.filter_products(products)
+
+        assert filtered == [base]
+        assert stats["total"] == 5
+        assert stats["passed_filters"] == 1
+        assert stats["failed_commission"] == 1
+        assert stats["failed_discount"] == 1
+        assert stats["failed_price"] == 0
+        assert stats["failed_sales"] == 1
+        assert stats["failed_rating"] == 1
+
+    @pytest.mark.unit
+    def test_thresholds_assignment_recompiles_pipeline(self, curator):
+        """Substituir thresholds/pesos recompila o pipeline."""
+        from src.core import FilterThresholds, ScoreWeights
+
+        original = curator.pipeline
+        curator.thresholds = FilterThresholds(discount_min_pct=50)
+        assert curator.pipeline is not original
+        assert curator.pipeline.thresholds.discount_min_pct == 50
+
+        curator.weights = ScoreWeights(commission=3.0)
+        assert curator.pipeline.weights.commission == 3.0
+        assert curator.pipeline.thresholds.discount_min_pct == 50
+
+
 class TestCuratorNormalize:
     """Testes para normalização de ofertas da API."""
 
@@ -298,3 +533,236 @@ class TestCuratorNormalize:
         assert normalized["commissionRate"] == 0.0
         assert normalized["commission"] == 0.0
         assert normalized["rating"] == 0.0
+
+
+class TestCuratorPriceHistory:
+    """Testes para o score de desconto real via histórico de preços."""
+
+    @pytest.mark.integration
+    @pytest.mark.database
+    @pytest.mark.asyncio
+    async def test_real_discount_uses_reference_price(self, curator, db):
+        """Produto que caiu de preço recebe referencePrice e score maior."""
+        from src.core import FilterThresholds, ScoreWeights
+
+        db.upsert_products([{"itemId": "1", "priceMin": 100.0, "commission": 10.0}])
+        db.conn.execute("UPDATE price_history SET ts = ts - 3600")
+        db.conn.commit()
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.weights = ScoreWeights(price=0, real_discount=0.5)
+        curator.max_pages = 1
+        curator.shopee.search_products = AsyncMock(
+            return_value=[
+                {
+                    "itemId": 1,
+                    "productName": "Fone",
+                    "priceMin": "80.00",
+                    "commissionRate": "0.125",
+                    "commission": "10.0",
+                    "offerLink": "https://shope.ee/1",
+                }
+            ]
+        )
+
+        result = await curator.curate(keywords=["fone"])
+
+        product = result["products"][0]
+        assert product["referencePrice"] == 100.0
+        assert product["score"] == 20.0
+        assert [p.price for p in db.get_price_history(1)] == [100.0, 80.0]
+
+    @pytest.mark.integration
+    @pytest.mark.database
+    @pytest.mark.asyncio
+    async def test_real_discount_survives_earlier_fetches(self, curator, db):
+        """Queda já gravada pelo pré-aquecimento ainda conta como desconto real."""
+        from src.core import FilterThresholds, GroupConfig, ScoreWeights
+
+        db.upsert_products([{"itemId": "1", "priceMin": 100.0, "commission": 10.0}])
+        db.conn.execute("UPDATE price_history SET ts = ts - 3600")
+        db.conn.commit()
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.weights = ScoreWeights(price=0, real_discount=0.5)
+        curator.max_pages = 1
+        offer = {
+            "itemId": 1,
+            "productName": "Fone",
+            "priceMin": "80.00",
+            "commissionRate": "0.125",
+            "commission": "10.0",
+            "offerLink": "https://shope.ee/1",
+        }
+        curator.shopee.search_products = AsyncMock(return_value=[offer])
+        curator.shopee.generate_short_link = AsyncMock(return_value="https://s/1")
+        groups = [GroupConfig("-1", "g1")]
+
+        # Duas buscas gravam o novo preço antes da curadoria que pontua
+        await curator.prewarm(["fone"], groups)
+        await curator.curate(keywords=["fone"])
+        result = await curator.curate_groups(["fone"], groups)
+
+        (product,) = result["groups"]["-1"]["products"]
+        assert product["referencePrice"] == 100.0
+        assert product["score"] == 20.0
+
+
+class TestCuratorStages:
+    """Testes para a medição de etapas da curadoria."""
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("streaming", [False, True])
+    async def test_curate_reports_stages(self, curator, mock_shopee_response_product, streaming):
+        """Resultado traz as etapas medidas com chamadas à API e ao banco."""
+        from src.core import FilterThresholds, RunProfiler
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.streaming = streaming
+        curator.max_pages = 1
+        curator.shopee.search_products = AsyncMock(return_value=[mock_shopee_response_product])
+
+        profiler = RunProfiler(curator.shopee, curator.db)
+        result = await curator.curate(keywords=["fone"], profiler=profiler)
+
+        stages = {row[0]: row for row in result["stages"]}
+        assert {"fetch", "normalize", "filter", "rank", "link_gen", "upsert"} <= set(stages)
+        assert stages["upsert"][4] >= 1
+        assert result["stages"] == profiler.rows()
+
+
+class TestCuratorMultiGroup:
+    """Testes para a curadoria de vários grupos com busca compartilhada."""
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_groups_share_fetch_and_select_independently(self, curator):
+        """Uma busca por página; cada grupo aplica os próprios filtros e top-N."""
+        from src.core import FilterThresholds, GroupConfig
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.max_pages = 1
+        curator.shopee.search_products = AsyncMock(return_value=TestCuratorStreaming._offers(1))
+        groups = [
+            GroupConfig("-1", "g1", top_n=2),
+            GroupConfig(
+                "-2",
+                "g2",
+                top_n=5,
+                thresholds=FilterThresholds(discount_min_pct=0, commission_min_brl=9),
+            ),
+        ]
+
+        result = await curator.curate_groups(["a"], groups)
+
+        assert curator.shopee.search_products.await_count == 1
+        assert result["fetched"] == 5
+        first, second = result["groups"]["-1"], result["groups"]["-2"]
+        assert [p["itemId"] for p in first["products"]] == ["104", "103"]
+        # Comissão de 6 a 10: apenas 9 e 10 passam no filtro do segundo grupo
+        assert {p["itemId"] for p in second["products"]} == {"103", "104"}
+        assert second["filter_stats"]["failed_commission"] == 3
+
+    @pytest.mark.integration
+    @pytest.mark.database
+    @pytest.mark.asyncio
+    async def test_dedup_and_links_are_per_group(self, curator, db):
+        """Envio a um grupo não bloqueia o outro e cada grupo tem o próprio link."""
+        from src.core import FilterThresholds, GroupConfig
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.max_pages = 1
+        offers = TestCuratorStreaming._offers(1)[:1]
+        curator.shopee.search_products = AsyncMock(return_value=offers)
+        curator.shopee.generate_short_link = AsyncMock(side_effect=["https://s/1", "https://s/2"])
+        db.upsert_product(curator._normalize_offer(offers[0]))
+        db.mark_as_sent(100, "-1", "https://s/0", "b0")
+
+        result = await curator.curate_groups(
+            ["a"], [GroupConfig("-1", "g1"), GroupConfig("-2", "g2")]
+        )
+
+        assert result["groups"]["-1"]["products"] == []
+        (product,) = result["groups"]["-2"]["products"]
+        assert product["shortLink"] == "https://s/1"
+        sub_ids = curator.shopee.generate_short_link.await_args[0][1]
+        assert sub_ids[1] == "grupog2"
+        assert db.get_cached_link(product["originUrl"], "g2").short_link == "https://s/1"
+        assert db.get_cached_link(product["originUrl"], "g1") is None
+
+    @pytest.mark.integration
+    @pytest.mark.database
+    @pytest.mark.asyncio
+    async def test_same_winner_gets_link_per_group(self, curator, db):
+        """Produto vencedor em dois grupos recebe um link (e subId) por grupo."""
+        from src.core import FilterThresholds, GroupConfig
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.max_pages = 1
+        offers = TestCuratorStreaming._offers(1)[:1]
+        curator.shopee.search_products = AsyncMock(return_value=offers)
+        curator.shopee.generate_short_link = AsyncMock(side_effect=["https://s/g1", "https://s/g2"])
+
+        result = await curator.curate_groups(
+            ["a"], [GroupConfig("-1", "g1"), GroupConfig("-2", "g2")]
+        )
+
+        (first,) = result["groups"]["-1"]["products"]
+        (second,) = result["groups"]["-2"]["products"]
+        assert first is not second
+        assert first["keywords"] is not second["keywords"]
+        assert first["shortLink"] == "https://s/g1"
+        assert second["shortLink"] == "https://s/g2"
+        sub_ids = [call.args[1][1] for call in curator.shopee.generate_short_link.await_args_list]
+        assert sub_ids == ["grupog1", "grupog2"]
+        assert db.get_cached_link(first["originUrl"], "g1").short_link == "https://s/g1"
+        assert db.get_cached_link(second["originUrl"], "g2").short_link == "https://s/g2"
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_requires_groups(self, curator):
+        """Lista de grupos vazia é um erro."""
+        with pytest.raises(ValueError):
+            await curator.curate_groups(["a"], [])
+
+
+class TestCuratorPrewarm:
+    """Testes para o pré-aquecimento da curadoria agendada."""
+
+    @pytest.mark.integration
+    @pytest.mark.database
+    @pytest.mark.asyncio
+    async def test_prewarm_generates_links_without_sending(self, curator, db):
+        """Pré-aquecimento busca com refresh, gera links e não marca envio."""
+        from src.core import FilterThresholds, GroupConfig
+
+        curator.thresholds = FilterThresholds(discount_min_pct=0)
+        curator.max_pages = 1
+        curator.shopee.search_products = AsyncMock(return_value=TestCuratorStreaming._offers(1))
+        curator.shopee.generate_short_link = AsyncMock(
+            side_effect=[f"https://s/{i}" for i in range(2)]
+        )
+        groups = [GroupConfig("-1", "g1", top_n=2)]
+
+        warm = await curator.prewarm(["a"], groups)
+
+        assert warm["fetched"] == 5
+        assert warm["links"] == 2
+        assert curator.shopee.search_products.await_args.kwargs["refresh"] is True
+        assert not db.was_sent_recently(104, "-1")
+
+        # No horário, a curadoria encontra os mesmos vencedores com links prontos
+        result = await curator.curate_groups(["a"], groups)
+
+        assert curator.shopee.generate_short_link.await_count == 2
+        assert curator.shopee.search_products.await_args.kwargs["refresh"] is False
+        links = [p["shortLink"] for p in result["groups"]["-1"]["products"]]
+        assert links == ["https://s/0", "https://s/1"]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_prewarm_requires_groups(self, curator):
+        """Lista de grupos vazia é um erro."""
+        with pytest.raises(ValueError):
+            await curator.prewarm(["a"], [])
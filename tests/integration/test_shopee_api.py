@@ -85,6 +85,22 @@ class TestShopeeClientUnit:
             variables = call_args[0][1]  # variables
             assert "keyword" in str(variables)
 
+    @pytest.mark.unit
+    async def test_search_products_uses_cache(self):
+        """Com cache, a mesma busca não chama a API de novo."""
+        from src.shopee import SearchCache
+
+        with patch.object(ShopeeClient, "_request") as mock_request:
+            mock_request.return_value = {"data": {"productOfferV2": {"nodes": [{"itemId": 1}]}}}
+
+            client = ShopeeClient("123", "secret", cache=SearchCache(ttl=60))
+            first = await client.search_products(keywords=["test"], page=1)
+            second = await client.search_products(keywords=["test"], page=1)
+            await client.search_products(keywords=["test"], page=2)
+
+            assert first == second == [{"itemId": 1}]
+            assert mock_request.call_count == 2
+
     @pytest.mark.unit
     async def test_generate_short_link_default_sub_ids(self):
         """Gera short link sem subIds customizados."""
@@ -287,3 +303,5 @@ class TestShopeeAPIErrors:
 
             assert call_count == 3  # Fez 3 tentativas
             assert result["data"]["test"] == "success"
+            assert client.request_count == 3
+            assert client.retry_count == 2
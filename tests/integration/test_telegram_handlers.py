@@ -1,12 +1,14 @@
 """Testes de integração para handlers do bot Telegram."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from telegram.ext import ConversationHandler
 
 from src.bot.handlers import (
     AWAITING_LINK,
+    cancel_curation_callback,
     convert_link_message,
     convert_link_start,
     convert_link_timeout,
@@ -15,6 +17,7 @@ from src.bot.handlers import (
     is_authorized,
     menu_callback,
     menu_command,
+    profile_command,
     status_callback,
 )
 
@@ -131,6 +134,11 @@ class TestStatusCallback:
 class TestCurateNowCallback:
     """Testes para callback de curadoria imediata."""
 
+    @staticmethod
+    async def _finish(context):
+        """Aguarda a curadoria disparada em segundo plano."""
+        await context.bot_data["manual_curation"].task
+
     @pytest.mark.smoke
     @pytest.mark.telegram
     @pytest.mark.asyncio
@@ -153,6 +161,7 @@ class TestCurateNowCallback:
         )
 
         await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        await self._finish(mock_telegram_context)
 
         # Verifica mensagens enviadas
         mock_telegram_update.callback_query.edit_message_text.assert_called()
@@ -172,10 +181,138 @@ class TestCurateNowCallback:
         )
 
         await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        await self._finish(mock_telegram_context)
 
         call_args = mock_telegram_update.callback_query.edit_message_text.call_args
         assert "Nenhum produto" in call_args[0][0]
 
+    @pytest.mark.telegram
+    @pytest.mark.asyncio
+    async def test_curate_now_double_tap_runs_once(
+        self, mock_telegram_update, mock_telegram_context
+    ):
+        """Dois toques seguidos executam uma única curadoria."""
+        curator = mock_telegram_context.bot_data.get("curator")
+        gate = asyncio.Event()
+
+        async def slow_curate(*args, **kwargs):
+            await gate.wait()
+            return {"fetched": 1, "approved": 1, "final": 1, "products": [{"itemId": "1"}]}
+
+        curator.curate = AsyncMock(side_effect=slow_curate)
+
+        await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        task = mock_telegram_context.bot_data["manual_curation"].task
+        await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        gate.set()
+        await task
+
+        assert curator.curate.await_count == 1
+        assert mock_telegram_context.bot.send_message.await_count == 1
+        texts = [
+            c[0][0] for c in mock_telegram_update.callback_query.edit_message_text.call_args_list
+        ]
+        assert any("já em andamento" in text for text in texts)
+        assert "Curadoria concluída" in texts[-1]
+
+    @pytest.mark.telegram
+    @pytest.mark.asyncio
+    async def test_curate_now_returns_before_curation_ends(
+        self, mock_telegram_update, mock_telegram_context
+    ):
+        """O handler retorna logo e a mensagem mostra o progresso."""
+        from src.bot import handlers
+
+        curator = mock_telegram_context.bot_data.get("curator")
+        gate = asyncio.Event()
+
+        async def slow_curate(keywords, categories, profiler):
+            with profiler.stage("fetch"):
+                pass
+            with profiler.stage("link_gen"):
+                await gate.wait()
+            return {"fetched": 1, "approved": 0, "final": 0, "products": []}
+
+        curator.curate = AsyncMock(side_effect=slow_curate)
+
+        with patch.object(handlers, "PROGRESS_INTERVAL", 0.01):
+            await curate_now_callback(mock_telegram_update, mock_telegram_context)
+            assert not mock_telegram_context.bot_data["manual_curation"].task.done()
+            await asyncio.sleep(0.05)
+            gate.set()
+            await self._finish(mock_telegram_context)
+
+        texts = [
+            c[0][0] for c in mock_telegram_update.callback_query.edit_message_text.call_args_list
+        ]
+        assert any("Páginas buscadas: 1" in t and "Etapa: Links" in t for t in texts)
+        assert "Nenhum produto" in texts[-1]
+        assert "manual_curation" not in mock_telegram_context.bot_data
+
+    @pytest.mark.telegram
+    @pytest.mark.database
+    @pytest.mark.asyncio
+    async def test_cancel_stops_curation(self, mock_telegram_update, mock_telegram_context, db):
+        """O botão Cancelar interrompe a curadoria e finaliza o run como falho."""
+        curator = mock_telegram_context.bot_data.get("curator")
+        started = asyncio.Event()
+
+        async def endless_curate(*args, **kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        curator.curate = AsyncMock(side_effect=endless_curate)
+
+        await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        task = mock_telegram_context.bot_data["manual_curation"].task
+        await started.wait()
+        await cancel_curation_callback(mock_telegram_update, mock_telegram_context)
+        await task
+
+        assert mock_telegram_context.bot.send_message.await_count == 0
+        texts = [
+            c[0][0] for c in mock_telegram_update.callback_query.edit_message_text.call_args_list
+        ]
+        assert "cancelada" in texts[-1]
+        run = db.get_last_run()
+        assert not run.success
+        assert run.error_summary == "cancelada"
+
+    @pytest.mark.telegram
+    @pytest.mark.asyncio
+    async def test_failed_first_edit_does_not_block_curation(
+        self, mock_telegram_update, mock_telegram_context
+    ):
+        """Falha ao editar a mensagem inicial não deixa a curadoria presa."""
+        curator = mock_telegram_context.bot_data.get("curator")
+        curator.curate = AsyncMock(
+            return_value={"fetched": 1, "approved": 0, "final": 0, "products": []}
+        )
+        edit = mock_telegram_update.callback_query.edit_message_text
+        edit.side_effect = [TimeoutError("timeout"), None, None, None]
+
+        await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        await self._finish(mock_telegram_context)
+        assert "manual_curation" not in mock_telegram_context.bot_data
+
+        await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        await self._finish(mock_telegram_context)
+
+        assert curator.curate.await_count == 2
+        assert "Nenhum produto" in edit.call_args[0][0]
+
+    @pytest.mark.telegram
+    @pytest.mark.asyncio
+    async def test_cancel_without_running_curation(
+        self, mock_telegram_update, mock_telegram_context
+    ):
+        """Cancelar sem curadoria em andamento apenas avisa."""
+        await cancel_curation_callback(mock_telegram_update, mock_telegram_context)
+
+        mock_telegram_update.callback_query.answer.assert_awaited_with(
+            "Nenhuma curadoria em andamento"
+        )
+
     @pytest.mark.telegram
     @pytest.mark.asyncio
     async def test_curate_now_error(self, mock_telegram_update, mock_telegram_context):
@@ -184,6 +321,7 @@ class TestCurateNowCallback:
         curator.curate = AsyncMock(side_effect=Exception("API error"))
 
         await curate_now_callback(mock_telegram_update, mock_telegram_context)
+        await self._finish(mock_telegram_context)
 
         call_args = mock_telegram_update.callback_query.edit_message_text.call_args
         assert "Erro" in call_args[0][0]
@@ -317,3 +455,75 @@ class TestReportHandlers:
         await report_command(mock_telegram_update, mock_telegram_context)
 
         mock_telegram_update.message.reply_text.assert_called()
+
+
+class TestProfileCommand:
+    """Testes para o comando /perfil."""
+
+    @staticmethod
+    def _message_update(update):
+        update.callback_query = None
+        update.message = MagicMock()
+        update.message.reply_text = AsyncMock()
+        return update
+
+    @pytest.mark.telegram
+    @pytest.mark.asyncio
+    async def test_profile_command_updates_field(
+        self, mock_telegram_update, mock_telegram_context, db
+    ):
+        """``/perfil campo valor`` grava o perfil e mostra o resultado."""
+        from src.core import ProfileStore
+
+        store = ProfileStore(db)
+        mock_telegram_context.bot_data["profiles"] = store
+        mock_telegram_context.args = ["keywords", "fone", "bluetooth,", "smartwatch"]
+        update = self._message_update(mock_telegram_update)
+
+        await profile_command(update, mock_telegram_context)
+
+        assert store.get().keywords == ["fone bluetooth", "smartwatch"]
+        text = update.message.reply_text.call_args[0][0]
+        assert "fone bluetooth, smartwatch" in text
+
+    @pytest.mark.telegram
+    @pytest.mark.asyncio
+    async def test_profile_command_rejects_invalid_value(
+        self, mock_telegram_update, mock_telegram_context, db
+    ):
+        """Valor inválido não altera o perfil."""
+        from src.core import CurationProfile, ProfileStore
+
+        store = ProfileStore(db)
+        mock_telegram_context.bot_data["profiles"] = store
+        mock_telegram_context.args = ["top_n", "0"]
+        update = self._message_update(mock_telegram_update)
+
+        await profile_command(update, mock_telegram_context)
+
+        assert store.get() == CurationProfile()
+        assert "inválido" in update.message.reply_text.call_args[0][0]
+
+    @pytest.mark.telegram
+    @pytest.mark.asyncio
+    async def test_profile_command_reloads_from_db(
+        self, mock_telegram_update, mock_telegram_context, db
+    ):
+        """``/perfil recarregar`` relê o perfil editado no banco e notifica os listeners."""
+        from src.core import CurationProfile, ProfileStore
+        from src.core.profiles import SETTING_PREFIX
+
+        store = ProfileStore(db)
+        assert store.get().top_n == 10  # Perfil fica em cache
+        applied = []
+        store.subscribe(lambda name, profile: applied.append(profile.top_n))
+        db.set_setting(SETTING_PREFIX + "default", CurationProfile(top_n=3).to_dict())
+        mock_telegram_context.bot_data["profiles"] = store
+        mock_telegram_context.args = ["recarregar"]
+        update = self._message_update(mock_telegram_update)
+
+        await profile_command(update, mock_telegram_context)
+
+        assert store.get().top_n == 3
+        assert applied == [3]
+        assert "top_n: 3" in update.message.reply_text.call_args[0][0]
@@ -0,0 +1,164 @@
+"""Testes unitários para a coordenação de execuções de curadoria."""
+
+import asyncio
+
+import pytest
+
+from src.core import RunCoordinator
+
+
+def _run_fn(events: list, name: str, gate: asyncio.Event | None = None, error: bool = False):
+    """Execução falsa que registra início e fim e pode esperar um evento."""
+
+    async def fn():
+        events.append(f"start {name}")
+        if gate is not None:
+            await gate.wait()
+        events.append(f"end {name}")
+        if error:
+            raise RuntimeError(name)
+        return name
+
+    return fn
+
+
+class TestRunCoordinator:
+    """Testes para RunCoordinator."""
+
+    @pytest.mark.unit
+    async def test_covered_request_reuses_running_result(self):
+        """Pedido coberto por execução em andamento aguarda o resultado dela."""
+        runs = RunCoordinator()
+        events: list[str] = []
+        gate = asyncio.Event()
+
+        first = asyncio.create_task(runs.run(["-1", "-2"], _run_fn(events, "a", gate)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(runs.run(["-1"], _run_fn(events, "b")))
+        await asyncio.sleep(0)
+        gate.set()
+
+        outcomes = await asyncio.gather(first, second)
+
+        assert events == ["start a", "end a"]
+        assert [o.result for o in outcomes] == ["a", "a"]
+        assert [o.coalesced for o in outcomes] == [False, True]
+        assert not runs.running("-1")
+
+    @pytest.mark.unit
+    async def test_partial_overlap_runs_after(self):
+        """Sobreposição parcial espera a execução em andamento e então roda."""
+        runs = RunCoordinator()
+        events: list[str] = []
+        gate = asyncio.Event()
+
+        first = asyncio.create_task(runs.run(["-1"], _run_fn(events, "a", gate)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(runs.run(["-1", "-2"], _run_fn(events, "b")))
+        await asyncio.sleep(0)
+        assert runs.running("-1") and not runs.running("-2")
+        gate.set()
+
+        outcomes = await asyncio.gather(first, second)
+
+        assert events == ["start a", "end a", "start b", "end b"]
+        assert [o.result for o in outcomes] == ["a", "b"]
+        assert not any(o.coalesced for o in outcomes)
+
+    @pytest.mark.unit
+    async def test_independent_groups_run_concurrently(self):
+        """Grupos distintos não se bloqueiam."""
+        runs = RunCoordinator()
+        events: list[str] = []
+        gate = asyncio.Event()
+
+        first = asyncio.create_task(runs.run(["-1"], _run_fn(events, "a", gate)))
+        await asyncio.sleep(0)
+        second = await runs.run(["-2"], _run_fn(events, "b"))
+        gate.set()
+        await first
+
+        assert second.result == "b"
+        assert events == ["start a", "start b", "end b", "end a"]
+
+    @pytest.mark.unit
+    async def test_error_is_shared_and_released(self):
+        """Quem reaproveitou recebe o mesmo erro e o grupo fica livre."""
+        runs = RunCoordinator()
+        events: list[str] = []
+        gate = asyncio.Event()
+
+        first = asyncio.create_task(runs.run(["-1"], _run_fn(events, "a", gate, error=True)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(runs.run(["-1"], _run_fn(events, "b")))
+        await asyncio.sleep(0)
+        gate.set()
+
+        results = await asyncio.gather(first, second, return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert (await runs.run(["-1"], _run_fn(events, "c"))).result == "c"
+
+    @pytest.mark.unit
+    async def test_cancelled_caller_does_not_cancel_run(self):
+        """Cancelar quem espera não interrompe a execução em andamento."""
+        runs = RunCoordinator()
+        events: list[str] = []
+        gate = asyncio.Event()
+
+        caller = asyncio.create_task(runs.run(["-1"], _run_fn(events, "a", gate)))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0)
+        assert runs.running("-1")
+
+        gate.set()
+        outcome = await runs.run(["-1"], _run_fn(events, "b"))
+
+        assert outcome.coalesced and outcome.result == "a"
+        assert events == ["start a", "end a"]
+
+    @pytest.mark.unit
+    async def test_merged_caller_runs_own_after_cancel(self):
+        """Manual cancelada com a agendada aguardando: a agendada roda a própria."""
+        runs = RunCoordinator()
+        events: list[str] = []
+        gate = asyncio.Event()
+
+        manual = asyncio.create_task(
+            runs.run(["-1"], _run_fn(events, "manual", gate), kind="manual")
+        )
+        await asyncio.sleep(0)
+        scheduled = asyncio.create_task(
+            runs.run(["-1"], _run_fn(events, "scheduled"), kind="scheduled")
+        )
+        await asyncio.sleep(0)
+
+        assert runs.cancel("-1", kind="manual")
+        with pytest.raises(asyncio.CancelledError):
+            await manual
+        outcome = await scheduled
+
+        assert outcome.result == "scheduled" and not outcome.coalesced
+        assert events == ["start manual", "start scheduled", "end scheduled"]
+        assert not runs.running("-1")
+
+    @pytest.mark.unit
+    async def test_cancelled_merged_caller_still_cancelled(self):
+        """Quem aguardava e também foi cancelado não inicia outra execução."""
+        runs = RunCoordinator()
+        events: list[str] = []
+        gate = asyncio.Event()
+
+        asyncio.create_task(runs.run(["-1"], _run_fn(events, "a", gate), kind="manual"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(runs.run(["-1"], _run_fn(events, "b")))
+        await asyncio.sleep(0)
+
+        runs.cancel("-1")
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert events == ["start a"]
+        assert not runs.running("-1")
@@ -0,0 +1,494 @@
+"""Testes unitários para a camada de banco de dados."""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+
+def _insert_sent(db, item_id: int, group_id: str, days_ago: int) -> None:
+    """Insere um envio com sent_at no passado (UTC, como CURRENT_TIMESTAMP)."""
+    sent_at = (datetime.now(UTC) - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+    db.conn.execute(
+        """INSERT INTO sent_messages (item_id, group_id, short_link, batch_id, sent_at)
+           VALUES (?, ?, ?, ?, ?)""",
+        (item_id, group_id, "https://test.link", "batch", sent_at),
+    )
+    db.conn.commit()
+
+
+class TestSentMessages:
+    """Testes para consultas em sent_messages."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_recent_query_uses_covering_index(self, db):
+        """Checagem de duplicata usa o índice (group_id, item_id, sent_at)."""
+        from src.database.schema import SQL_SELECT_SENT_RECENT
+
+        plan = db.conn.execute(
+            "EXPLAIN QUERY PLAN " + SQL_SELECT_SENT_RECENT, ("-100", 1, "-7 days")
+        ).fetchall()
+        details = " ".join(row["detail"] for row in plan)
+
+        assert "idx_sent_group_item_sent" in details
+        assert "COVERING INDEX" in details
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_was_sent_recently_respects_window(self, db):
+        """Janela de dias é aplicada via parâmetro."""
+        db.upsert_product({"itemId": "10"})
+        _insert_sent(db, 10, "-100", days_ago=5)
+
+        assert db.was_sent_recently(10, "-100", days=7) is True
+        assert db.was_sent_recently(10, "-100", days=3) is False
+        assert db.was_sent_recently(10, "-200", days=7) is False
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_purge_sent_messages(self, db):
+        """Remove apenas envios mais antigos que o limite."""
+        db.upsert_product({"itemId": "1"})
+        _insert_sent(db, 1, "-100", days_ago=40)
+        _insert_sent(db, 1, "-100", days_ago=2)
+
+        removed = db.purge_sent_messages(28)
+
+        assert removed == 1
+        remaining = db.conn.execute("SELECT COUNT(*) AS n FROM sent_messages").fetchone()
+        assert remaining["n"] == 1
+
+
+class TestTransactions:
+    """Testes para Database.transaction e escritas em lote."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_mark_as_sent_batch_single_commit(self, db):
+        """Lote inteiro é gravado com um único commit."""
+        from unittest.mock import patch
+
+        for item_id in (1, 2, 3):
+            db.upsert_product({"itemId": str(item_id)})
+
+        with patch.object(db, "_commit", wraps=db._commit) as commit:
+            db.mark_as_sent_batch([(1, "l1"), (2, "l2"), (3, "l3")], "-100", "batch")
+            assert commit.call_count == 1
+
+        count = db.conn.execute("SELECT COUNT(*) AS n FROM sent_messages").fetchone()
+        assert count["n"] == 3
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_transaction_rolls_back_everything(self, db):
+        """Erro dentro da transação desfaz envios e fim da run."""
+        db.upsert_product({"itemId": "1"})
+        run_id = db.start_run("manual")
+        callbacks = []
+
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.mark_as_sent_batch([(1, "l1")], "-100", "batch")
+                db.end_run(run_id, 10, 5, 1)
+                db.call_after_commit(lambda: callbacks.append("done"))
+                raise RuntimeError("falha no envio")
+
+        count = db.conn.execute("SELECT COUNT(*) AS n FROM sent_messages").fetchone()
+        assert count["n"] == 0
+        assert db.get_last_run().ended_at is None
+        assert callbacks == []
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_transaction_commits_and_runs_callbacks(self, db):
+        """Transação bem-sucedida grava tudo e executa callbacks."""
+        db.upsert_product({"itemId": "1"})
+        run_id = db.start_run("manual")
+        callbacks = []
+
+        with db.transaction():
+            with db.transaction():
+                db.mark_as_sent_batch([(1, "l1")], "-100", "batch")
+            db.end_run(run_id, 10, 5, 1)
+            db.call_after_commit(lambda: callbacks.append("done"))
+            assert callbacks == []
+
+        assert callbacks == ["done"]
+        assert db.was_sent_recently(1, "-100") is True
+        assert db.get_last_run().items_sent == 1
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_callback_from_other_thread_not_deferred(self, db):
+        """Transação aberta em outra thread não adia o callback desta."""
+        callbacks = []
+        with db.transaction():
+            worker = threading.Thread(
+                target=db.call_after_commit, args=(lambda: callbacks.append("outra"),)
+            )
+            worker.start()
+            worker.join()
+            assert callbacks == ["outra"]
+
+
+class TestRawJsonStorage:
+    """Testes para o armazenamento de raw_json."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_raw_json_stored_compressed(self, db):
+        """raw_json é gravado como BLOB e lido como texto JSON."""
+        product = {"itemId": 1, "productName": "Fone Bluetooth " * 20, "priceMin": 99.9}
+        db.upsert_product(product)
+
+        row = db.conn.execute(
+            "SELECT typeof(raw_json) AS kind, length(raw_json) AS size FROM products_seen"
+        ).fetchone()
+        assert row["kind"] == "blob"
+        assert row["size"] < len(json.dumps(product))
+        assert json.loads(db.get_product(1).raw_json) == product
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_raw_json_uncompressed_option(self, temp_db_path):
+        """Com compress_raw_json=False o texto é gravado como antes."""
+        from src.database import Database
+
+        db = Database(temp_db_path, compress_raw_json=False)
+        db.upsert_products([{"itemId": 1}, {"itemId": 2}])
+
+        kinds = {r[0] for r in db.conn.execute("SELECT typeof(raw_json) FROM products_seen")}
+        assert kinds == {"text"}
+        assert json.loads(db.get_product(2).raw_json) == {"itemId": 2}
+        db.close()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_compress_existing_raw_json(self, temp_db_path):
+        """Migração converte linhas em texto e preserva o conteúdo."""
+        from src.database import Database
+
+        plain = Database(temp_db_path, compress_raw_json=False)
+        plain.upsert_products([{"itemId": i, "name": f"produto {i}"} for i in range(5)])
+        plain.close()
+
+        db = Database(temp_db_path)
+        assert db.compress_existing_raw_json(batch_size=2) == 5
+        assert db.compress_existing_raw_json() == 0
+
+        kinds = {r[0] for r in db.conn.execute("SELECT typeof(raw_json) FROM products_seen")}
+        assert kinds == {"blob"}
+        assert json.loads(db.get_product(3).raw_json) == {"itemId": 3, "name": "produto 3"}
+        db.close()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_compress_existing_raw_json_runs_once(self, temp_db_path):
+        """Após concluir, a migração não varre a tabela até a marca ser limpa."""
+        from src.database import Database
+        from src.database.models import RAW_JSON_COMPRESSED_SETTING
+
+        db = Database(temp_db_path)
+        assert db.compress_existing_raw_json() == 0
+        assert db.get_setting(RAW_JSON_COMPRESSED_SETTING) == "true"
+
+        plain = Database(temp_db_path, compress_raw_json=False)
+        plain.upsert_products([{"itemId": 1}])
+        plain.close()
+
+        assert db.compress_existing_raw_json() == 0
+        db.set_setting(RAW_JSON_COMPRESSED_SETTING, False)
+        assert db.compress_existing_raw_json() == 1
+        db.close()
+
+
+class TestPriceHistory:
+    """Testes para o histórico de preços."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_history_only_records_changes(self, db):
+        """Upserts sem mudança de preço/comissão/desconto não geram pontos."""
+        product = {"itemId": 1, "priceMin": 100.0, "commission": 10.0, "priceDiscountRate": 20}
+        db.upsert_products([product])
+        db.upsert_products([dict(product)])
+        db.upsert_product(dict(product))
+        assert len(db.get_price_history(1)) == 1
+
+        db.conn.execute("UPDATE price_history SET ts = ts - 10")
+        db.upsert_products([{**product, "priceMin": 80.0}])
+
+        history = db.get_price_history(1)
+        assert [point.price for point in history] == [100.0, 80.0]
+        assert history[-1].commission == 10.0
+        assert history[-1].discount == 20
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_reference_price_includes_price_in_effect(self, db):
+        """Referência usa a janela e o preço vigente no início dela."""
+        now = int(time.time())
+        day = 86400
+        db.conn.executemany(
+            "INSERT INTO price_history (item_id, ts, price) VALUES (?, ?, ?)",
+            [
+                (1, now - 90 * day, 50.0),  # Substituído antes da janela
+                (1, now - 60 * day, 120.0),  # Vigente no início da janela
+                (1, now - 5 * day, 150.0),
+                (2, now - 1 * day, 30.0),
+            ],
+        )
+        db.conn.commit()
+
+        prices = {1: 150.0, 2: 25.0, 3: 10.0}
+        assert db.get_reference_prices(prices, days=30) == {1: 120.0, 2: 30.0}
+        assert db.get_reference_prices({}) == {}
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_reference_price_ignores_current_price_points(self, db):
+        """Pontos do preço atual (já gravados por outra busca) não viram referência."""
+        now = int(time.time())
+        db.conn.executemany(
+            "INSERT INTO price_history (item_id, ts, price, commission) VALUES (?, ?, ?, ?)",
+            [
+                (1, now - 3600, 10.0, 1.0),
+                (1, now - 600, 8.0, 1.0),  # Queda gravada pelo pré-aquecimento
+                (1, now - 60, 8.0, 2.0),  # Só a comissão mudou
+                (2, now - 3600, 10.0, 1.0),  # Preço estável
+            ],
+        )
+        db.conn.commit()
+
+        assert db.get_reference_prices({1: 8.0, 2: 10.0}) == {1: 10.0}
+        # Antes da queda ser gravada, o último ponto é o preço anterior
+        assert db.get_reference_prices({2: 7.0}) == {2: 10.0}
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_purge_keeps_latest_point(self, db):
+        """Poda remove pontos antigos, mas mantém o último de cada produto."""
+        now = int(time.time())
+        day = 86400
+        db.conn.executemany(
+            "INSERT INTO price_history (item_id, ts, price) VALUES (?, ?, ?)",
+            [(1, now - 200 * day, 10.0), (1, now - 100 * day, 9.0), (2, now - 200 * day, 5.0)],
+        )
+        db.conn.commit()
+
+        assert db.purge_price_history(90) == 1
+        assert [p.price for p in db.get_price_history(1)] == [9.0]
+        assert [p.price for p in db.get_price_history(2)] == [5.0]
+
+
+class TestMigrations:
+    """Testes para o controle de versão do schema."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_init_db_sets_version_and_skips_applied(self, temp_db_path):
+        """Banco novo fica na última versão e reinicializar não aplica nada."""
+        from src.database.schema import SCHEMA_VERSION, get_schema_version, init_db, migrate
+
+        conn = init_db(temp_db_path)
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert migrate(conn) == []
+        conn.close()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_legacy_database_is_upgraded(self, db_conn):
+        """Banco sem user_version passa pelos passos idempotentes."""
+        from src.database.schema import SCHEMA_VERSION, get_schema_version, migrate
+
+        db_conn.execute("PRAGMA user_version = 0")
+        db_conn.execute("CREATE INDEX idx_sent_item_group ON sent_messages(item_id, group_id)")
+        db_conn.commit()
+
+        applied = migrate(db_conn)
+
+        assert [version for version, _, _ in applied] == list(range(1, SCHEMA_VERSION + 1))
+        assert get_schema_version(db_conn) == SCHEMA_VERSION
+        indexes = {
+            row[0] for row in db_conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        assert "idx_sent_item_group" not in indexes
+        assert "idx_sent_group_item_sent" in indexes
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_failed_step_rolls_back(self, db_conn):
+        """Passo com erro não deixa alterações nem avança a versão."""
+        from src.database.schema import Migration, get_schema_version, migrate
+
+        version = get_schema_version(db_conn)
+        broken = Migration(
+            version + 1,
+            "quebrada",
+            ("CREATE TABLE tmp_migration (id INTEGER)", "SELECT * FROM tabela_inexistente"),
+        )
+
+        with pytest.raises(sqlite3.OperationalError):
+            migrate(db_conn, [broken])
+
+        assert get_schema_version(db_conn) == version
+        assert (
+            db_conn.execute(
+                "SELECT name FROM sqlite_master WHERE name = 'tmp_migration'"
+            ).fetchone()
+            is None
+        )
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_links_become_per_group(self, tmp_path):
+        """Links existentes recebem o group_hash dos subIds e deixam de ser únicos por URL."""
+        from src.database.schema import MIGRATIONS, get_connection, migrate
+
+        conn = get_connection(str(tmp_path / "legacy.db"))
+        migrate(conn, [m for m in MIGRATIONS if m.version < 5])
+        conn.execute(
+            "INSERT INTO links (origin_url, short_link, sub_ids_json) VALUES (?, ?, ?)",
+            ("https://a", "https://s/a", json.dumps(["tg", "grupog1", "curadoria", "1"])),
+        )
+        conn.execute(
+            "INSERT INTO links (origin_url, short_link, sub_ids_json) VALUES (?, ?, ?)",
+            ("https://b", "https://s/b", "inválido"),
+        )
+        conn.commit()
+
+        migrate(conn)
+
+        rows = dict(conn.execute("SELECT origin_url, group_hash FROM links").fetchall())
+        assert rows == {"https://a": "g1", "https://b": "default"}
+        conn.execute(
+            "INSERT INTO links (origin_url, group_hash, short_link) VALUES (?, ?, ?)",
+            ("https://a", "g2", "https://s/a2"),
+        )
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute(
+                "INSERT INTO links (origin_url, group_hash, short_link) VALUES (?, ?, ?)",
+                ("https://a", "g1", "https://s/a3"),
+            )
+        conn.close()
+
+
+class TestConnectionPool:
+    """Testes para as conexões de escrita e leitura."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_file_database_uses_wal_and_thread_readers(self, db):
+        """Leituras usam uma conexão por thread, separada da de escrita."""
+        db.set_setting("k", "v")
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.reader is not db.conn
+        assert db.reader is db.reader
+
+        seen = {}
+
+        def read_in_thread():
+            seen["reader"] = db.reader
+            seen["value"] = db.get_setting("k")
+
+        thread = threading.Thread(target=read_in_thread)
+        thread.start()
+        thread.join()
+
+        assert seen["value"] == "v"
+        assert seen["reader"] is not db.reader
+        with pytest.raises(sqlite3.OperationalError):
+            db.reader.execute("DELETE FROM settings")
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_reads_inside_transaction_see_pending_writes(self, db):
+        """Dentro da transação, leituras usam a conexão de escrita."""
+        with db.transaction():
+            db.set_setting("k", "pendente")
+            assert db.reader is db.conn
+            assert db.get_setting("k") == "pendente"
+
+        assert db.reader is not db.conn
+        assert db.get_setting("k") == "pendente"
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_memory_database_falls_back_to_single_connection(self):
+        """Em :memory: leitura e escrita compartilham a mesma conexão."""
+        from src.database import Database
+        from src.database.schema import migrate
+
+        db = Database(":memory:")
+        migrate(db.conn)
+        db.set_setting("k", "v")
+
+        assert db.reader is db.conn
+        assert db.get_setting("k") == "v"
+        db.close()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_concurrent_writes_are_serialized(self, db):
+        """Escritas de várias threads não se perdem."""
+
+        def write(offset):
+            for i in range(20):
+                db.upsert_product({"itemId": offset + i, "priceMin": 1.0})
+
+        threads = [threading.Thread(target=write, args=(n * 100,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert db.get_stats()["unique_products"] == 80
+
+
+class TestRunStages:
+    """Testes para as etapas gravadas por execução."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_record_and_read_run_stages(self, db):
+        """Etapas são gravadas e lidas por run_id."""
+        run_id = db.start_run("manual")
+        db.record_run_stages(run_id, [("fetch", 120.5, 3, 1, 0), ("upsert", 4.2, 0, 0, 1)])
+
+        stages = {s.stage: s for s in db.get_run_stages(run_id)}
+        assert stages["fetch"].wall_ms == 120.5
+        assert stages["fetch"].api_retries == 1
+        assert stages["upsert"].db_queries == 1
+        assert db.get_run_stages(run_id + 1) == []
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_query_count_tracks_operations(self, db):
+        """query_count soma leituras e escritas."""
+        before = db.query_count
+        db.set_setting("k", "v")
+        db.get_setting("k")
+        assert db.query_count == before + 2
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_query_count_concurrent_reads(self, db):
+        """Leituras em várias threads não perdem incrementos de query_count."""
+        db.set_setting("k", "v")
+        before = db.query_count
+
+        def read_many():
+            for _ in range(500):
+                db.get_setting("k")
+
+        workers = [threading.Thread(target=read_many) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert db.query_count == before + 2000
@@ -198,3 +198,67 @@ class TestDeduplicator:
 
         # Agora é duplicata
         assert dedup.is_duplicate(item_id, group_id) is True
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_is_duplicate_uses_memory_index(self, db):
+        """Após aquecer o índice, checagens não consultam o banco."""
+        from unittest.mock import patch
+
+        group_id = "-1001234567890"
+        db.upsert_product({"itemId": "321"})
+        db.mark_as_sent(321, group_id, "https://test.link", "batch1")
+
+        dedup = Deduplicator(db, dedup_days=7)
+        assert dedup.warm() == 1
+
+        with patch.object(db, "was_sent_recently") as was_sent:
+            assert dedup.is_duplicate("321", group_id) is True
+            assert dedup.is_duplicate("999", group_id) is False
+            was_sent.assert_not_called()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_bloom_positive_is_confirmed_in_db(self, db):
+        """Com Bloom filter, positivos são confirmados no banco."""
+        group_id = "-1001234567890"
+        for item_id in (1, 2, 3):
+            db.upsert_product({"itemId": str(item_id)})
+            db.mark_as_sent(item_id, group_id, "https://test.link", "batch1")
+
+        dedup = Deduplicator(db, dedup_days=7, bloom_threshold=2)
+        dedup.warm()
+
+        assert dedup.is_duplicate("2", group_id) is True
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_without_index_queries_db(self, db):
+        """use_index=False mantém a checagem direta no banco."""
+        dedup = Deduplicator(db, dedup_days=7, use_index=False)
+        assert dedup.index is None
+        assert dedup.is_duplicate(1, "-1001234567890") is False
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_mark_sent_batch(self, db):
+        """Marca lote, ignorando produtos sem shortLink, e atualiza o índice."""
+        dedup = Deduplicator(db, dedup_days=7)
+        group_id = "-1001234567890"
+        for item_id in ("1", "2", "3"):
+            db.upsert_product({"itemId": item_id})
+
+        marked = dedup.mark_sent_batch(
+            [
+                {"itemId": "1", "shortLink": "https://shope.ee/1"},
+                {"itemId": "2", "shortLink": ""},
+                {"itemId": "3", "shortLink": "https://shope.ee/3"},
+            ],
+            group_id,
+            "batch1",
+        )
+
+        assert marked == 2
+        assert dedup.is_duplicate("1", group_id) is True
+        assert dedup.is_duplicate("2", group_id) is False
+        assert db.was_sent_recently(3, group_id, 7) is True
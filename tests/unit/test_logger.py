@@ -0,0 +1,202 @@
+"""Testes unitários para o logging estruturado."""
+
+import asyncio
+import io
+import json
+import logging
+
+import pytest
+
+from src.utils.logger import (
+    LogContext,
+    LogSampler,
+    bind_log_context,
+    build_queue_logging,
+    get_log_context,
+    lazy,
+    reset_log_context,
+)
+
+
+def _make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+class TestQueueLogging:
+    """Testes para o pipeline QueueHandler/QueueListener."""
+
+    @pytest.mark.unit
+    def test_listener_writes_json(self):
+        """Listener formata em JSON e escreve no stream."""
+        stream = io.StringIO()
+        handler, listener = build_queue_logging(stream, logging.INFO)
+        logger = _make_logger("test_queue_json", handler)
+
+        listener.start()
+        try:
+            logger.info("Buscou %d produtos", 50, extra={"component": "curator"})
+            logger.debug("ignorado")
+        finally:
+            listener.stop()
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 1
+        record = json.loads(lines[0])
+        assert record["message"] == "Buscou 50 produtos"
+        assert record["component"] == "curator"
+
+    @pytest.mark.unit
+    def test_message_is_interpolated_before_enqueue(self):
+        """Args mutáveis são interpolados no momento do log."""
+        stream = io.StringIO()
+        handler, listener = build_queue_logging(stream, logging.INFO)
+        logger = _make_logger("test_queue_args", handler)
+
+        items = [1]
+        logger.info("itens: %s", items)
+        items.append(2)
+
+        listener.start()
+        listener.stop()
+        assert json.loads(stream.getvalue())["message"] == "itens: [1]"
+
+    @pytest.mark.unit
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Com a fila cheia os registros são descartados e contados."""
+        stream = io.StringIO()
+        handler, listener = build_queue_logging(stream, logging.INFO, maxsize=2)
+        logger = _make_logger("test_queue_full", handler)
+
+        for i in range(5):
+            logger.info("log %d", i)
+
+        assert handler.dropped == 3
+        listener.start()
+        listener.stop()
+        assert len(stream.getvalue().splitlines()) == 2
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+class TestLazyAndSampling:
+    """Testes de formatação adiada e amostragem."""
+
+    @pytest.mark.unit
+    def test_lazy_skipped_when_level_disabled(self):
+        """A função só é chamada se a mensagem for formatada."""
+        handler = _ListHandler()
+        logger = _make_logger("test_lazy", handler)
+        logger.setLevel(logging.INFO)
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "resumo"
+
+        logger.debug("valor: %s", lazy(expensive))
+        assert calls == []
+
+        logger.info("valor: %s", lazy(expensive))
+        assert calls == [1]
+        assert handler.messages == ["valor: resumo"]
+
+    @pytest.mark.unit
+    def test_sampler_emits_one_of_n_with_count(self):
+        """Emite a 1ª chamada e depois uma a cada N, com o total acumulado."""
+        handler = _ListHandler()
+        logger = _make_logger("test_sampler", handler)
+        sampler = LogSampler(logger, every=10, level=logging.INFO)
+
+        for i in range(25):
+            sampler("rejeitado %d", i)
+
+        assert sampler.count == 25
+        assert handler.messages == [
+            "rejeitado 0 [1 ocorrência(s)]",
+            "rejeitado 10 [11 ocorrência(s)]",
+            "rejeitado 20 [21 ocorrência(s)]",
+        ]
+
+    @pytest.mark.unit
+    def test_sampler_counts_when_level_disabled(self):
+        """Com o nível desabilitado nada é emitido, mas a contagem continua."""
+        handler = _ListHandler()
+        logger = _make_logger("test_sampler_off", handler)
+        logger.setLevel(logging.INFO)
+        sampler = LogSampler(logger, every=2)
+
+        for i in range(5):
+            sampler("rejeitado %d", i)
+
+        assert sampler.count == 5
+        assert handler.messages == []
+
+
+class TestLogContext:
+    """Testes do contexto de correlação."""
+
+    @pytest.mark.unit
+    def test_context_is_serialized(self):
+        """Campos do LogContext aparecem em ``context`` no JSON."""
+        stream = io.StringIO()
+        handler, listener = build_queue_logging(stream, logging.INFO)
+        logger = _make_logger("test_context_json", handler)
+
+        with LogContext(run_id=7, batch_id="b1"):
+            logger.info("dentro")
+        logger.info("fora")
+
+        listener.start()
+        listener.stop()
+        inside, outside = (json.loads(line) for line in stream.getvalue().splitlines())
+        assert inside["context"] == {"run_id": 7, "batch_id": "b1"}
+        assert "context" not in outside
+
+    @pytest.mark.unit
+    def test_explicit_context_wins(self):
+        """``extra={"context": ...}`` é mesclado por cima do contexto atual."""
+        stream = io.StringIO()
+        handler, listener = build_queue_logging(stream, logging.INFO)
+        logger = _make_logger("test_context_extra", handler)
+
+        with LogContext(run_id=1, update_id=5):
+            logger.info("msg", extra={"context": {"run_id": 2}})
+
+        listener.start()
+        listener.stop()
+        assert json.loads(stream.getvalue())["context"] == {"run_id": 2, "update_id": 5}
+
+    @pytest.mark.unit
+    def test_nested_bind_and_reset(self):
+        """Blocos aninhados acumulam campos e restauram ao sair."""
+        with LogContext(run_id=1):
+            token = bind_log_context(batch_id="x")
+            assert get_log_context() == {"run_id": 1, "batch_id": "x"}
+            reset_log_context(token)
+            assert get_log_context() == {"run_id": 1}
+        assert get_log_context() == {}
+
+    @pytest.mark.unit
+    async def test_context_isolated_between_tasks(self):
+        """Cada task herda o contexto de quem a criou, sem vazar para as outras."""
+
+        async def run(run_id: int) -> dict:
+            with LogContext(run_id=run_id):
+                await asyncio.sleep(0)
+                child = asyncio.create_task(asyncio.sleep(0, result=get_log_context()))
+                return await child
+
+        results = await asyncio.gather(run(1), run(2))
+        assert results == [{"run_id": 1}, {"run_id": 2}]
+        assert get_log_context() == {}
@@ -0,0 +1,139 @@
+"""Testes unitários para o registro de métricas."""
+
+import asyncio
+import logging
+
+import pytest
+
+from src.utils.metrics import (
+    RECENT_ERRORS,
+    MetricsLogHandler,
+    MetricsRegistry,
+    SlidingWindowCounter,
+    start_metrics_server,
+)
+
+
+class TestMetricsRegistry:
+    """Testes para contadores, gauges e histogramas."""
+
+    @pytest.mark.unit
+    def test_render_text_exposition(self):
+        """Renderiza HELP/TYPE e séries com labels."""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requisições", ("outcome",))
+        requests.inc(outcome="ok")
+        requests.inc(2, outcome="ok")
+        registry.gauge("queue_size", "Fila").set(3)
+
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{outcome="ok"} 3' in text
+        assert "queue_size 3" in text
+        assert registry.counter("requests_total", "Requisições", ("outcome",)) is requests
+
+    @pytest.mark.unit
+    def test_metric_base_requires_samples(self):
+        """A base das métricas é abstrata: subclasses precisam de samples()."""
+        from src.utils.metrics import _Metric
+
+        with pytest.raises(TypeError):
+            _Metric("x", "X")
+
+    @pytest.mark.unit
+    def test_histogram_buckets_are_cumulative(self):
+        """Buckets acumulam e trazem _sum/_count."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latência", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+        assert "latency_seconds_sum 5.55" in text
+
+    @pytest.mark.unit
+    def test_labels_are_validated_and_escaped(self):
+        """Labels errados falham; valores são escapados."""
+        registry = MetricsRegistry()
+        counter = registry.counter("events_total", "Eventos", ("name",))
+
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+        with pytest.raises(ValueError):
+            registry.gauge("events_total", "Eventos")
+
+        counter.inc(name='a"b')
+        assert 'events_total{name="a\\"b"} 1' in registry.render()
+
+
+class TestSlidingWindowCounter:
+    """Testes para a janela móvel."""
+
+    @pytest.mark.unit
+    def test_counts_only_inside_window(self):
+        """Eventos fora da janela expiram."""
+        window = SlidingWindowCounter(3600, bucket_seconds=60)
+        window.add(now=0)
+        window.add(2, now=30)
+        window.add(now=1800)
+
+        assert window.total(now=1800) == 4
+        assert window.total(now=3700) == 1
+        assert window.total(now=6000) == 0
+
+
+class TestMetricsLogHandler:
+    """Testes para a contagem de erros logados."""
+
+    @pytest.mark.unit
+    def test_counts_error_records(self):
+        """Só logs de nível ERROR ou acima entram na janela."""
+        logger = logging.getLogger("test_metrics_handler")
+        logger.propagate = False
+        handler = MetricsLogHandler()
+        logger.addHandler(handler)
+        try:
+            before = RECENT_ERRORS.total()
+            logger.warning("aviso")
+            logger.error("falha")
+            assert RECENT_ERRORS.total() == before + 1
+        finally:
+            logger.removeHandler(handler)
+
+
+class TestMetricsServer:
+    """Testes para o endpoint HTTP."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_serves_metrics(self):
+        """GET /metrics devolve a exposição; outros caminhos, 404."""
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits").inc()
+        server = await start_metrics_server("127.0.0.1", 0, registry)
+        port = server.sockets[0].getsockname()[1]
+
+        async def get(path: str) -> bytes:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        try:
+            ok = await get("/metrics")
+            missing = await get("/")
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        assert ok.startswith(b"HTTP/1.1 200 OK")
+        assert b"hits_total 1" in ok
+        assert missing.startswith(b"HTTP/1.1 404")
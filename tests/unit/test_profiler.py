@@ -0,0 +1,74 @@
+"""Testes unitários para o RunProfiler."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.profiler import RunProfiler
+
+
+class TestRunProfiler:
+    """Testes para RunProfiler."""
+
+    @pytest.mark.unit
+    def test_counts_calls_and_queries_per_stage(self):
+        """Contadores são atribuídos à etapa em que mudaram."""
+        shopee = SimpleNamespace(request_count=0, retry_count=0)
+        db = SimpleNamespace(query_count=0)
+        profiler = RunProfiler(shopee, db)
+
+        with profiler.stage("fetch"):
+            shopee.request_count += 3
+            shopee.retry_count += 1
+        with profiler.stage("upsert"):
+            db.query_count += 2
+        with profiler.stage("fetch"):
+            shopee.request_count += 1
+
+        rows = {row[0]: row for row in profiler.rows()}
+        assert rows["fetch"][2:] == (4, 1, 0)
+        assert rows["upsert"][2:] == (0, 0, 2)
+
+    @pytest.mark.unit
+    def test_nested_stage_is_exclusive(self):
+        """Etapa interna pausa a externa e os contadores não são somados duas vezes."""
+        db = SimpleNamespace(query_count=0)
+        profiler = RunProfiler(db=db)
+
+        with profiler.stage("filter"):
+            db.query_count += 1
+            with profiler.stage("dedup"):
+                db.query_count += 5
+            db.query_count += 1
+
+        stats = {s.stage: s for s in profiler.stages()}
+        assert stats["filter"].db_queries == 2
+        assert stats["dedup"].db_queries == 5
+
+    @pytest.mark.unit
+    def test_stages_follow_pipeline_order(self):
+        """Etapas saem na ordem do pipeline, independente da ordem de medição."""
+        profiler = RunProfiler()
+        for name in ("send", "fetch", "rank", "custom"):
+            with profiler.stage(name):
+                pass
+
+        assert [s.stage for s in profiler.stages()] == ["fetch", "rank", "send", "custom"]
+
+    @pytest.mark.unit
+    def test_current_stage_and_entries(self):
+        """Etapa atual e aberturas por etapa alimentam o progresso."""
+        profiler = RunProfiler()
+        assert profiler.current_stage is None
+
+        for _ in range(3):
+            with profiler.stage("fetch"):
+                pass
+        with profiler.stage("filter"):
+            with profiler.stage("dedup"):
+                assert profiler.current_stage == "dedup"
+            assert profiler.current_stage == "filter"
+
+        assert profiler.entries("fetch") == 3
+        assert profiler.entries("send") == 0
+        assert profiler.current_stage is None
@@ -0,0 +1,157 @@
+"""Testes unitários para os perfis de curadoria."""
+
+import json
+
+import pytest
+
+from src.core import CurationProfile, FilterThresholds, ProfileStore, ScoreWeights
+from src.core.profiles import SETTING_PREFIX, parse_field
+
+
+class TestParseField:
+    """Testes para a edição de campos a partir de texto."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("path", "raw", "check"),
+        [
+            ("top_n", "15", lambda p: p.top_n == 15),
+            ("keywords", "fone, smartwatch ,", lambda p: p.keywords == ["fone", "smartwatch"]),
+            ("categories", "100, 200", lambda p: p.categories == [100, 200]),
+            ("categories", "-", lambda p: p.categories is None),
+            ("weights.commission", "1,5", lambda p: p.weights.commission == 1.5),
+            ("thresholds.sales_min", "50", lambda p: p.thresholds.sales_min == 50),
+            ("thresholds.price_max_brl", "none", lambda p: p.thresholds.price_max_brl is None),
+            ("thresholds.price_max_brl", "200", lambda p: p.thresholds.price_max_brl == 200.0),
+        ],
+    )
+    def test_valid_values(self, path, raw, check):
+        """Converte o texto para o tipo do campo sem alterar o original."""
+        original = CurationProfile()
+        updated = parse_field(original, path, raw)
+
+        assert check(updated)
+        assert original == CurationProfile()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("path", "raw"),
+        [
+            ("top_n", "0"),
+            ("top_n", "dez"),
+            ("keywords", " , "),
+            ("weights.inexistente", "1"),
+            ("desconhecido", "1"),
+        ],
+    )
+    def test_invalid_values(self, path, raw):
+        """Campo desconhecido ou valor inválido gera ValueError."""
+        with pytest.raises(ValueError):
+            parse_field(CurationProfile(), path, raw)
+
+
+class TestProfileStore:
+    """Testes para o armazenamento dos perfis na tabela settings."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_default_when_not_saved(self, db):
+        """Sem perfil salvo retorna o default do código."""
+        assert ProfileStore(db).get() == CurationProfile()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_save_persists_and_notifies(self, db):
+        """Alterações são gravadas, ficam em cache e chegam aos listeners."""
+        store = ProfileStore(db)
+        received = []
+        store.subscribe(lambda name, profile: received.append((name, profile.top_n)))
+
+        store.set_field("top_n", "7")
+
+        assert received == [("default", 7)]
+        assert store.get().top_n == 7
+        assert ProfileStore(db).get().top_n == 7
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_get_is_cached_until_reload(self, db):
+        """Edição direta no banco só é vista após reload."""
+        store = ProfileStore(db)
+        store.save(CurationProfile(keywords=["a"]))
+        db.set_setting(SETTING_PREFIX + "default", CurationProfile(keywords=["b"]).to_dict())
+
+        assert store.get().keywords == ["a"]
+        assert store.reload().keywords == ["b"]
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_tolerates_old_and_invalid_data(self, db):
+        """Campos desconhecidos são ignorados e JSON inválido cai no default."""
+        db.set_setting(
+            SETTING_PREFIX + "antigo",
+            {"top_n": 3, "removido": 1, "weights": {"commission": 2, "velho": 1}},
+        )
+        db.set_setting(SETTING_PREFIX + "quebrado", "{não é json")
+        store = ProfileStore(db)
+
+        old = store.get("antigo")
+        assert old.top_n == 3
+        assert old.weights == ScoreWeights(commission=2)
+        assert old.thresholds == FilterThresholds()
+        assert store.get("quebrado") == CurationProfile()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"keywords": "fone"},
+            {"keywords": ["fone", 1]},
+            {"categories": "100"},
+            {"top_n": "5"},
+            {"top_n": 0},
+            {"max_pages": True},
+            {"weights": [1, 2]},
+            {"weights": {"commission": "2"}},
+            {"thresholds": {"sales_min": 1.5}},
+            ["fone"],
+            42,
+        ],
+    )
+    def test_wrong_types_fall_back_to_default(self, db, data):
+        """Valores com tipo errado (ex: editados à mão) invalidam o perfil salvo."""
+        db.set_setting(SETTING_PREFIX + "default", json.dumps(data))
+
+        assert ProfileStore(db).get() == CurationProfile()
+
+    @pytest.mark.unit
+    def test_from_dict_accepts_valid_types(self):
+        """Inteiros valem para campos float e None para campos opcionais."""
+        profile = CurationProfile.from_dict(
+            {
+                "keywords": ["fone"],
+                "categories": [100],
+                "weights": {"commission": 2},
+                "thresholds": {"price_max_brl": None, "rating_min": 4.5},
+            }
+        )
+
+        assert profile.keywords == ["fone"]
+        assert profile.categories == [100]
+        assert profile.weights.commission == 2
+        assert profile.thresholds.rating_min == 4.5
+        assert CurationProfile.from_dict(CurationProfile().to_dict()) == CurationProfile()
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_curator_applies_profile(self, db, curator):
+        """Listener aplica o perfil ao curador sem recriá-lo."""
+        store = ProfileStore(db)
+        store.subscribe(lambda name, profile: curator.apply_profile(profile))
+
+        store.set_field("max_pages", "2")
+        store.set_field("thresholds.sales_min", "100")
+
+        assert curator.max_pages == 2
+        assert curator.thresholds.sales_min == 100
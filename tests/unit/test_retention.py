@@ -0,0 +1,66 @@
+"""Testes unitários para retenção e compactação do banco."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database import RetentionPolicy, run_retention
+
+
+class TestRetention:
+    """Testes para run_retention."""
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_prunes_old_data(self, db):
+        """Poda raw_json antigo, links expirados e envios fora da janela."""
+        old_seen = (datetime.now() - timedelta(days=60)).isoformat()
+        db.upsert_product({"itemId": "1", "first_seen_at": old_seen, "productName": "x" * 500})
+        db.upsert_product({"itemId": "2", "productName": "recente"})
+        db.conn.execute("UPDATE products_seen SET last_seen_at = ? WHERE item_id = 1", (old_seen,))
+        db.conn.execute(
+            """INSERT INTO links (origin_url, short_link, sub_ids_json, created_at)
+               VALUES ('https://a', 'https://s/a', '[]', datetime('now', '-40 days')),
+                      ('https://b', 'https://s/b', '[]', CURRENT_TIMESTAMP)"""
+        )
+        db.conn.execute(
+            """INSERT INTO sent_messages (item_id, group_id, short_link, sent_at)
+               VALUES (1, '-100', 'l', datetime('now', '-60 days')),
+                      (2, '-100', 'l', CURRENT_TIMESTAMP)"""
+        )
+        db.conn.commit()
+
+        report = run_retention(db, RetentionPolicy(), dedup_days=7)
+
+        assert report["raw_json_pruned"] == 1
+        assert report["links_deleted"] == 1
+        assert report["sent_deleted"] == 1
+        assert db.get_product(1).raw_json is None
+        assert db.get_product(2).raw_json is not None
+        assert db.get_cached_link("https://b") is not None
+        assert report["bytes_reclaimed"] == report["bytes_before"] - report["bytes_after"]
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_compact_reclaims_space(self, db):
+        """Compactação devolve páginas livres após remoções."""
+        db.compress_raw_json = False  # Linhas grandes o bastante para ocupar páginas
+        db.upsert_products([{"itemId": str(i), "productName": "x" * 10000} for i in range(1, 100)])
+        db.conn.execute("UPDATE products_seen SET raw_json = NULL")
+        db.conn.commit()
+
+        report = run_retention(db, RetentionPolicy(), dedup_days=7)
+
+        assert report["bytes_reclaimed"] > 0
+        assert db.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    def test_enable_incremental_vacuum_once(self, db):
+        """Conversão para auto_vacuum incremental acontece uma única vez."""
+        db.conn.execute("PRAGMA auto_vacuum = NONE")
+        db.vacuum()
+
+        assert db.enable_incremental_vacuum() is True
+        assert db.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert db.enable_incremental_vacuum() is False
@@ -0,0 +1,234 @@
+"""Testes unitários para triggers, job store e jobs do scheduler."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from src.utils.scheduling import (
+    DatabaseJobStore,
+    LeadTrigger,
+    cron_trigger,
+    ensure_job,
+    register_application,
+    run_with_application,
+)
+
+TZ = ZoneInfo("America/Sao_Paulo")
+
+
+class TestLeadTrigger:
+    """Testes para LeadTrigger."""
+
+    @pytest.fixture
+    def trigger(self):
+        cron = CronTrigger.from_crontab("0 */12 * * *", timezone=TZ)
+        return LeadTrigger(cron, timedelta(minutes=5))
+
+    @pytest.mark.unit
+    def test_fires_before_each_cron_firing(self, trigger):
+        """Dispara ``lead`` antes de cada disparo do cron."""
+        now = datetime(2026, 1, 10, 9, 0, tzinfo=TZ)
+
+        first = trigger.get_next_fire_time(None, now)
+        second = trigger.get_next_fire_time(first, first)
+
+        assert first == datetime(2026, 1, 10, 11, 55, tzinfo=TZ)
+        assert second == datetime(2026, 1, 10, 23, 55, tzinfo=TZ)
+
+    @pytest.mark.unit
+    def test_skips_firing_closer_than_lead(self, trigger):
+        """Disparo a menos de ``lead`` de agora fica para o próximo."""
+        now = datetime(2026, 1, 10, 11, 58, tzinfo=TZ)
+
+        assert trigger.get_next_fire_time(None, now) == datetime(2026, 1, 10, 23, 55, tzinfo=TZ)
+
+    @pytest.mark.unit
+    def test_ends_with_base_trigger(self):
+        """Sem próximo disparo no trigger base, não há pré-disparo."""
+        cron = CronTrigger.from_crontab("0 12 * * *", timezone=TZ)
+        cron.end_date = datetime(2026, 1, 10, 13, 0, tzinfo=TZ)
+        trigger = LeadTrigger(cron, timedelta(minutes=5))
+
+        assert trigger.get_next_fire_time(None, datetime(2026, 1, 10, 12, 0, tzinfo=TZ)) is None
+
+
+async def _noop_job() -> None:
+    """Job sem efeito usado nos testes do job store."""
+
+
+class TestCronTrigger:
+    """Testes para cron_trigger."""
+
+    @pytest.mark.unit
+    def test_matches_crontab_with_jitter(self):
+        """Mesmos disparos de ``from_crontab``, com jitter configurável."""
+        trigger = cron_trigger("0 */12 * * *", "America/Sao_Paulo", jitter=30)
+        reference = CronTrigger.from_crontab("0 */12 * * *", timezone=TZ)
+        now = datetime(2026, 1, 10, 9, 0, tzinfo=TZ)
+
+        fire_time = trigger.get_next_fire_time(None, now)
+
+        assert trigger.jitter == 30
+        expected = reference.get_next_fire_time(None, now)
+        assert expected <= fire_time <= expected + timedelta(seconds=30)
+
+    @pytest.mark.unit
+    def test_rejects_invalid_expression(self):
+        """Expressão sem 5 campos é rejeitada."""
+        with pytest.raises(ValueError):
+            cron_trigger("0 */12 * *", "America/Sao_Paulo")
+
+
+class TestDatabaseJobStore:
+    """Testes para DatabaseJobStore."""
+
+    @staticmethod
+    def _scheduler(db) -> tuple[AsyncIOScheduler, DatabaseJobStore]:
+        store = DatabaseJobStore(db)
+        scheduler = AsyncIOScheduler(timezone=TZ, jobstores={"default": store})
+        return scheduler, store
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    async def test_jobs_survive_restart(self, db):
+        """Jobs gravados são lidos por um novo scheduler no mesmo banco."""
+        scheduler, _ = self._scheduler(db)
+        scheduler.start(paused=True)
+        scheduler.add_job(_noop_job, "interval", minutes=5, id="a", name="A")
+        scheduler.add_job(_noop_job, "interval", minutes=1, id="b")
+        scheduler.pause_job("b")
+        scheduler.shutdown(wait=False)
+
+        restarted, store = self._scheduler(db)
+        restarted.start(paused=True)
+        try:
+            jobs = store.get_all_jobs()
+            assert [job.id for job in jobs] == ["a", "b"]  # pausados por último
+            assert jobs[0].name == "A"
+            assert jobs[1].next_run_time is None
+            assert store.get_next_run_time() == jobs[0].next_run_time
+            assert store.get_due_jobs(jobs[0].next_run_time)[0].id == "a"
+        finally:
+            restarted.shutdown(wait=False)
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    async def test_conflicts_and_missing_jobs(self, db):
+        """Id repetido e job inexistente seguem os erros do APScheduler."""
+        scheduler, store = self._scheduler(db)
+        scheduler.start(paused=True)
+        try:
+            job = scheduler.add_job(_noop_job, "interval", minutes=5, id="a")
+            with pytest.raises(ConflictingIdError):
+                store.add_job(job)
+            with pytest.raises(JobLookupError):
+                store.remove_job("missing")
+            store.remove_job("a")
+            with pytest.raises(JobLookupError):
+                store.update_job(job)
+            assert store.lookup_job("a") is None
+        finally:
+            scheduler.shutdown(wait=False)
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_unrestorable_job_is_removed(self, db):
+        """Job que não pode ser restaurado é descartado."""
+        store = DatabaseJobStore(db)
+        db.insert_scheduler_job("broken", 0.0, b"not a pickle")
+
+        assert store.get_due_jobs(datetime.now(TZ)) == []
+        assert db.get_scheduler_job("broken") is None
+
+
+class TestEnsureJob:
+    """Testes para ensure_job e run_with_application."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    async def test_restart_keeps_saved_run_time(self, db):
+        """Mesmo agendamento após reinício mantém o horário salvo (até atrasado)."""
+        store = DatabaseJobStore(db)
+        scheduler = AsyncIOScheduler(timezone=TZ, jobstores={"default": store})
+        trigger = cron_trigger("0 */12 * * *", "America/Sao_Paulo")
+        ensure_job(scheduler, store, "curation_job", "src.main:scheduled_curation", trigger)
+        scheduler.start(paused=True)
+        scheduler.shutdown(wait=False)
+
+        # Simula um disparo perdido enquanto o bot estava parado
+        missed = datetime.now(TZ) - timedelta(minutes=10)
+        job = store.lookup_job("curation_job")
+        job.next_run_time = missed
+        store.update_job(job)
+
+        restarted = AsyncIOScheduler(timezone=TZ, jobstores={"default": store})
+        ensure_job(
+            restarted,
+            store,
+            "curation_job",
+            "src.main:scheduled_curation",
+            cron_trigger("0 */12 * * *", "America/Sao_Paulo"),
+            misfire_grace_time=3600,
+        )
+        restarted.start(paused=True)
+        try:
+            job = store.lookup_job("curation_job")
+            assert job.next_run_time == missed
+            assert job.misfire_grace_time == 3600
+        finally:
+            restarted.shutdown(wait=False)
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    async def test_changed_trigger_is_rescheduled(self, db):
+        """Agendamento alterado recalcula a próxima execução."""
+        store = DatabaseJobStore(db)
+        scheduler = AsyncIOScheduler(timezone=TZ, jobstores={"default": store})
+        ensure_job(
+            scheduler,
+            store,
+            "curation_job",
+            "src.main:scheduled_curation",
+            cron_trigger("0 */12 * * *", "America/Sao_Paulo"),
+        )
+        ensure_job(
+            scheduler,
+            store,
+            "curation_job",
+            "src.main:scheduled_curation",
+            cron_trigger("30 9 * * *", "America/Sao_Paulo"),
+        )
+        scheduler.start(paused=True)
+        try:
+            next_run = store.lookup_job("curation_job").next_run_time
+            assert (next_run.hour, next_run.minute) == (9, 30)
+        finally:
+            scheduler.shutdown(wait=False)
+
+    @pytest.mark.unit
+    async def test_run_with_application_passes_context(self):
+        """O job recebe um contexto com o bot_data da aplicação registrada."""
+        from telegram.ext import ApplicationBuilder
+
+        application = ApplicationBuilder().token("123456:" + "A" * 30).build()
+        application.bot_data["db"] = "db"
+        register_application(application, name="test")
+        job = AsyncMock()
+
+        with patch("src.utils.scheduling.ref_to_obj", return_value=job) as ref_to_obj:
+            await run_with_application("src.main:scheduled_curation", name="test")
+
+        ref_to_obj.assert_called_once_with("src.main:scheduled_curation")
+        context = job.await_args.args[0]
+        assert context.bot_data["db"] == "db"
+
+    @pytest.mark.unit
+    async def test_unregistered_application(self):
+        """Sem aplicação registrada o job falha com LookupError."""
+        with pytest.raises(LookupError):
+            await run_with_application("src.main:scheduled_curation", name="missing")
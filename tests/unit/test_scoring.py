@@ -9,11 +9,16 @@ import pytest
 
 from src.core.scoring import (
     FilterThresholds,
+    RejectReason,
     ScoreWeights,
     _get_commission,
     calculate_score,
+    check_filters,
+    compile_filter,
+    compile_pipeline,
     passes_filters,
     rank_products,
+    real_discount_pct,
 )
 
 
@@ -233,6 +238,135 @@ class TestPassesFilters:
         assert passes_filters(product) is True
 
 
+class TestCheckFilters:
+    """Testes para função check_filters (motivo de reprovação)."""
+
+    @pytest.mark.smoke
+    @pytest.mark.unit
+    def test_approved_returns_none(self):
+        """Produto aprovado não tem motivo de reprovação."""
+        product = {"commissionRate": 0.10, "commission": 10.0, "priceDiscountRate": 20}
+        assert check_filters(product, FilterThresholds()) is None
+
+    @pytest.mark.unit
+    def test_reason_per_threshold(self):
+        """Retorna o motivo correspondente a cada threshold."""
+        base = {
+            "commissionRate": 0.10,
+            "commission": 10.0,
+            "priceDiscountRate": 20,
+            "priceMin": 100,
+            "sales": 100,
+            "rating": 4.8,
+        }
+        thresholds = FilterThresholds(price_max_brl=250, sales_min=50, rating_min=4.5)
+
+        assert check_filters({**base, "commissionRate": 0.01}, thresholds) == (
+            RejectReason.COMMISSION
+        )
+        assert check_filters({**base, "commission": 1.0}, thresholds) == RejectReason.COMMISSION
+        assert check_filters({**base, "priceDiscountRate": 1}, thresholds) == (
+            RejectReason.DISCOUNT
+        )
+        assert check_filters({**base, "priceMin": 300}, thresholds) == RejectReason.PRICE
+        assert check_filters({**base, "sales": 10}, thresholds) == RejectReason.SALES
+        assert check_filters({**base, "rating": 4.0}, thresholds) == RejectReason.RATING
+        assert check_filters(base, thresholds) is None
+
+    @pytest.mark.unit
+    def test_sales_and_rating_disabled_by_default(self):
+        """Thresholds padrão de vendas/avaliação não reprovam produtos sem esses campos."""
+        product = {"commissionRate": 0.10, "commission": 10.0, "priceDiscountRate": 20}
+        assert check_filters(product) is None
+
+    @pytest.mark.unit
+    def test_explicit_thresholds_compiled_once(self, monkeypatch):
+        """Thresholds explícitos iguais reutilizam o filtro compilado."""
+        from src.core import scoring
+
+        scoring._cached_filter.cache_clear()
+        scoring._cached_scorer.cache_clear()
+        compiled = []
+        original = scoring.compile_filter
+        monkeypatch.setattr(scoring, "compile_filter", lambda t: compiled.append(t) or original(t))
+        product = {"commissionRate": 0.01, "commission": 1.0, "priceDiscountRate": 20}
+
+        for _ in range(3):
+            assert check_filters(product, FilterThresholds(sales_min=5)) == (
+                RejectReason.COMMISSION
+            )
+            calculate_score(product, ScoreWeights(price=0.2))
+
+        assert compiled == [FilterThresholds(sales_min=5)]
+        assert scoring._cached_scorer.cache_info()[:2] == (2, 1)  # hits, misses
+
+
+class TestCompiledPipeline:
+    """Testes para filtro/score compilados."""
+
+    @pytest.mark.unit
+    def test_compiled_filter_matches_check_filters(self):
+        """Predicado compilado retorna os mesmos motivos de check_filters."""
+        thresholds = FilterThresholds(price_max_brl=250, sales_min=50, rating_min=4.5)
+        check = compile_filter(thresholds)
+        products = [
+            {"commissionRate": 0.10, "commission": 10.0, "priceDiscountRate": 20},
+            {"commissionRate": 0.01, "commission": 10.0, "priceDiscountRate": 20},
+            {"commissionRate": 0.10, "commission": 10.0, "priceDiscountRate": 20, "sales": 60},
+            {
+                "commissionRate": 0.10,
+                "commission": 10.0,
+                "priceDiscountRate": 20,
+                "sales": 60,
+                "rating": 4.9,
+                "priceMin": 300,
+            },
+        ]
+        for product in products:
+            assert check(product) == check_filters(product, thresholds)
+
+    @pytest.mark.unit
+    def test_disabled_rules_accept_everything(self):
+        """Sem regras ativas o predicado aprova qualquer produto."""
+        thresholds = FilterThresholds(
+            commission_rate_min=0, commission_min_brl=0, discount_min_pct=0
+        )
+        check = compile_filter(thresholds)
+        assert check({}) is None
+
+    @pytest.mark.unit
+    def test_compiled_score_and_rank(self):
+        """Score compilado equivale a calculate_score e rank ordena."""
+        weights = ScoreWeights(commission=2.0, discount=0.3, price=0.01)
+        pipeline = compile_pipeline(weights=weights)
+        product = {"commission": 10.0, "priceDiscountRate": 20, "priceMin": 100}
+
+        assert pipeline.score(product) == calculate_score(product, weights) == 25.0
+        assert pipeline.thresholds == FilterThresholds()
+
+        ranked = pipeline.rank([{"commission": 1}, dict(product)])
+        assert ranked[0]["score"] == 25.0
+
+    @pytest.mark.unit
+    def test_real_discount_weight(self):
+        """Queda real frente ao preço de referência soma ao score quando ativa."""
+        product = {
+            "commission": 10.0,
+            "priceDiscountRate": 0,
+            "priceMin": 80,
+            "referencePrice": 100,
+        }
+        assert real_discount_pct(product) == 20.0
+        assert real_discount_pct({"priceMin": 120, "referencePrice": 100}) == 0.0
+        assert real_discount_pct({"priceMin": 80}) == 0.0
+
+        base = compile_pipeline(weights=ScoreWeights(price=0))
+        with_history = compile_pipeline(weights=ScoreWeights(price=0, real_discount=0.5))
+        assert base.score(product) == 10.0
+        assert with_history.score(product) == 20.0
+        assert with_history.score({"commission": 10.0, "priceMin": 80}) == 10.0
+
+
 class TestRankProducts:
     """Testes para função rank_products."""
 
@@ -0,0 +1,140 @@
+"""Testes unitários para o cache de buscas."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.shopee import SearchCache
+
+
+def _fetcher(*responses):
+    """Corrotina de busca que devolve as respostas em ordem e conta as chamadas."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        response = responses[len(calls) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return fetch, calls
+
+
+class TestSearchCache:
+    """Testes para SearchCache."""
+
+    @pytest.mark.unit
+    def test_key_ignores_variable_order(self):
+        """A chave depende apenas do conteúdo das variáveis."""
+        assert SearchCache.key({"keyword": "a", "page": 1}) == SearchCache.key(
+            {"page": 1, "keyword": "a"}
+        )
+        assert SearchCache.key({"keyword": "a", "page": 1}) != SearchCache.key(
+            {"keyword": "a", "page": 2}
+        )
+
+    @pytest.mark.unit
+    async def test_fresh_entry_is_reused(self):
+        """Dentro do TTL a API não é chamada de novo."""
+        cache = SearchCache(ttl=60)
+        fetch, calls = _fetcher([{"itemId": 1}], [{"itemId": 2}])
+
+        first = await cache.get_or_fetch("k", fetch)
+        second = await cache.get_or_fetch("k", fetch)
+
+        assert first == second == [{"itemId": 1}]
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    async def test_refresh_bypasses_cache(self):
+        """``refresh=True`` busca de novo e atualiza a entrada."""
+        cache = SearchCache(ttl=60)
+        fetch, calls = _fetcher([{"itemId": 1}], [{"itemId": 2}])
+
+        await cache.get_or_fetch("k", fetch)
+        assert await cache.get_or_fetch("k", fetch, refresh=True) == [{"itemId": 2}]
+        assert await cache.get_or_fetch("k", fetch) == [{"itemId": 2}]
+        assert len(calls) == 2
+
+    @pytest.mark.unit
+    async def test_expired_entry_is_fetched(self):
+        """Sem stale_ttl uma entrada vencida espera a API."""
+        cache = SearchCache(ttl=60)
+        cache._remember("k", (time.time() - 61, [{"itemId": 1}]))
+        fetch, calls = _fetcher([{"itemId": 2}])
+
+        assert await cache.get_or_fetch("k", fetch) == [{"itemId": 2}]
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    async def test_stale_entry_served_while_revalidating(self):
+        """Entrada vencida dentro do stale_ttl é servida e atualizada em segundo plano."""
+        cache = SearchCache(ttl=60, stale_ttl=600)
+        cache._remember("k", (time.time() - 120, [{"itemId": 1}]))
+        fetch, calls = _fetcher([{"itemId": 2}])
+
+        assert await cache.get_or_fetch("k", fetch) == [{"itemId": 1}]
+        assert await cache.get_or_fetch("k", fetch) == [{"itemId": 1}]
+        await asyncio.gather(*cache._inflight.values())
+
+        assert len(calls) == 1
+        assert await cache.get_or_fetch("k", fetch) == [{"itemId": 2}]
+
+    @pytest.mark.unit
+    async def test_failed_revalidation_keeps_stale_entry(self):
+        """Falha na atualização em segundo plano não descarta a entrada."""
+        cache = SearchCache(ttl=60, stale_ttl=600)
+        cache._remember("k", (time.time() - 120, [{"itemId": 1}]))
+        fetch, _ = _fetcher(RuntimeError("api"))
+
+        await cache.get_or_fetch("k", fetch)
+        await asyncio.gather(*cache._inflight.values(), return_exceptions=True)
+
+        assert cache._lookup("k")[1] == [{"itemId": 1}]
+
+    @pytest.mark.unit
+    async def test_concurrent_misses_share_request(self):
+        """Buscas simultâneas da mesma chave fazem uma única chamada."""
+        cache = SearchCache(ttl=60)
+        fetch, calls = _fetcher([{"itemId": 1}])
+
+        results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(3)))
+
+        assert results == [[{"itemId": 1}]] * 3
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    async def test_errors_are_not_cached(self):
+        """Erro da API é propagado e a próxima busca tenta de novo."""
+        cache = SearchCache(ttl=60)
+        fetch, calls = _fetcher(RuntimeError("api"), [{"itemId": 1}])
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("k", fetch)
+        assert await cache.get_or_fetch("k", fetch) == [{"itemId": 1}]
+        assert len(calls) == 2
+
+    @pytest.mark.unit
+    async def test_memory_is_bounded(self):
+        """Acima de max_entries a entrada menos usada sai da memória."""
+        cache = SearchCache(ttl=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            fetch, _ = _fetcher([{"itemId": key}])
+            await cache.get_or_fetch(key, fetch)
+
+        assert list(cache._entries) == ["b", "c"]
+
+    @pytest.mark.database
+    @pytest.mark.unit
+    async def test_persists_across_instances(self, db):
+        """Com banco, uma nova instância (ex: após reinício) reaproveita a resposta."""
+        fetch, calls = _fetcher([{"itemId": 1, "productName": "Fone"}])
+        await SearchCache(ttl=60, db=db).get_or_fetch("k", fetch)
+
+        restarted = SearchCache(ttl=60, db=db)
+        assert await restarted.get_or_fetch("k", fetch) == [{"itemId": 1, "productName": "Fone"}]
+        assert len(calls) == 1
+        assert db.purge_search_cache(0) == 1
@@ -0,0 +1,64 @@
+"""Testes unitários para o índice de envios recentes."""
+
+import pytest
+
+from src.core.sent_index import BloomFilter, RecentSendsIndex
+
+
+class TestBloomFilter:
+    """Testes para BloomFilter."""
+
+    @pytest.mark.unit
+    def test_no_false_negatives(self):
+        """Chaves adicionadas sempre são encontradas."""
+        bloom = BloomFilter(1000)
+        keys = [str(i) for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+
+    @pytest.mark.unit
+    def test_false_positive_rate_is_low(self):
+        """Taxa de falso positivo fica próxima da configurada."""
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(str(i))
+        false_positives = sum(str(i) in bloom for i in range(1000, 11000))
+        assert false_positives < 300
+
+
+class TestRecentSendsIndex:
+    """Testes para RecentSendsIndex."""
+
+    @pytest.mark.smoke
+    @pytest.mark.unit
+    def test_add_and_contains_with_expiry(self):
+        """Envio é duplicata até expirar a janela."""
+        index = RecentSendsIndex(window_seconds=100)
+        index.add("-1", "42", sent_ts=1000)
+
+        assert index.contains("-1", "42", now=1050) is True
+        assert index.contains("-2", "42", now=1050) is False
+        assert index.contains("-1", "42", now=1100) is False
+        assert len(index) == 0
+
+    @pytest.mark.unit
+    def test_load_normalizes_ids(self):
+        """IDs vindos do banco (int) casam com IDs de produtos (str)."""
+        index = RecentSendsIndex(window_seconds=100)
+        index.load([(-100, 42, 1000)])
+
+        assert index.contains("-100", "42", now=1010) is True
+
+    @pytest.mark.unit
+    def test_bloom_for_large_groups(self):
+        """Grupos grandes usam Bloom filter e retornam None para "talvez"."""
+        index = RecentSendsIndex(window_seconds=100, bloom_threshold=2)
+        index.load([("-1", i, 1000) for i in range(10)] + [("-2", 1, 1000)])
+
+        assert index.contains("-1", "5", now=1010) is None
+        assert index.contains("-1", "999", now=1010) in (False, None)
+        assert index.contains("-2", "1", now=1010) is True
+
+        index.add("-1", "777")
+        assert index.contains("-1", "777") is None
@@ -0,0 +1,69 @@
+"""Testes unitários para o ranking incremental TopK."""
+
+import pytest
+
+from src.core.topk import TopK
+
+
+def _product(item_id: str, score: float, keyword: str = "kw") -> dict:
+    return {"itemId": item_id, "score": score, "keyword": keyword}
+
+
+class TestTopK:
+    """Testes para TopK."""
+
+    @pytest.mark.smoke
+    @pytest.mark.unit
+    def test_keeps_best_k_in_order(self):
+        """Mantém apenas os K maiores scores, em ordem decrescente."""
+        top = TopK(3)
+        for i, score in enumerate([5, 1, 9, 3, 7, 2]):
+            top.offer(_product(str(i), score))
+
+        assert [p["score"] for p in top.items()] == [9, 7, 5]
+        assert len(top) == 3
+
+    @pytest.mark.unit
+    def test_threshold_and_accepts(self):
+        """Threshold só existe com o ranking cheio."""
+        top = TopK(2)
+        assert top.threshold() is None
+        assert top.accepts(-100)
+
+        top.offer(_product("a", 4))
+        top.offer(_product("b", 6))
+
+        assert top.threshold() == 4
+        assert top.accepts(5)
+        assert not top.accepts(4)
+
+    @pytest.mark.unit
+    def test_ties_keep_first_arrival(self):
+        """Em empate, o produto que chegou antes permanece."""
+        top = TopK(2)
+        top.offer(_product("first", 5))
+        top.offer(_product("second", 5))
+        top.offer(_product("third", 5))
+
+        assert [p["itemId"] for p in top.items()] == ["first", "second"]
+
+    @pytest.mark.unit
+    def test_same_item_is_merged(self):
+        """Mesmo itemId mantém a melhor cópia e acumula keywords."""
+        top = TopK(2)
+        top.offer(_product("x", 3, "fone bluetooth"))
+        top.offer(_product("y", 4))
+        top.offer(_product("x", 8, "fone ouvido"))
+
+        items = top.items()
+        assert [p["itemId"] for p in items] == ["x", "y"]
+        assert items[0]["score"] == 8
+        assert items[0]["keywords"] == ["fone bluetooth", "fone ouvido"]
+        assert top.threshold() == 4
+
+    @pytest.mark.unit
+    def test_zero_k(self):
+        """K=0 não aceita produtos."""
+        top = TopK(0)
+        assert top.offer(_product("a", 1)) is False
+        assert top.items() == []